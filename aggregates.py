@@ -0,0 +1,365 @@
+# aggregates.py
+#
+# This file defines the pre-aggregated results store of the sweeps.
+# While a sweep writes its passenger rows, the store keeps per configuration and per stage
+# (the duration columns) running aggregates: count, sum and sum of squares for the mean and the
+# variance, min and max, a histogram of the durations and the minimum total processing time for
+# every duration, plus pairwise co-moment sums for the correlation matrix. Durations are integer
+# minutes, so the sums are exact and the histogram has one bin per minute (exact quantiles below
+# BINS minutes, an overflow bin above). Every aggregate can be merged with another one, so new
+# runs update the SQLite store instead of forcing a rescan of the CSV, and the analysis notebook
+# reads the summary of the whole sweep, or of any subset of configurations, in milliseconds.
+# The accumulators are stored compressed, as most histogram bins of a configuration are empty.
+
+import sqlite3
+import zlib
+
+import numpy as np
+
+from records import DURATION_COLUMNS, MISSING
+
+# Durations from 0 to BINS - 1 minutes have their own histogram bin, longer ones share the last bin
+BINS = 128
+
+# Index of the total processing time in the aggregated columns
+TOTAL = DURATION_COLUMNS.index('Total Processing Time')
+
+
+class Aggregate:
+    def __init__(self, bins=BINS):
+        """Initialize empty accumulators for the DURATION_COLUMNS.
+
+        Pairwise sums only count the rows where both columns are present, like pandas' corr(),
+        and their diagonal holds the statistics of each column alone.
+
+        Args:
+            bins (int): Number of one-minute histogram bins, before the overflow bin
+        """
+        stages = len(DURATION_COLUMNS)
+        self.bins = bins
+        self.rows = 0
+        # count[a, b]: rows with both a and b, sums[a, b] and squares[a, b]: sum of a and of a² over them
+        self.count = np.zeros((stages, stages))
+        self.sums = np.zeros((stages, stages))
+        self.squares = np.zeros((stages, stages))
+        # products[a, b]: sum of a * b over the rows with both a and b
+        self.products = np.zeros((stages, stages))
+        self.minimum = np.full(stages, np.inf)
+        self.maximum = np.full(stages, -np.inf)
+        self.histogram = np.zeros((stages, bins + 1))
+        # min_total[a, d]: smallest total processing time of the passengers whose duration a is d minutes
+        self.min_total = np.full((stages, bins + 1), np.inf)
+
+    def add(self, durations):
+        """Add passengers to the accumulators.
+
+        Args:
+            durations (np.ndarray): (passengers, len(DURATION_COLUMNS)) integer array, MISSING when missing
+        """
+        durations = np.asarray(durations)
+        if not len(durations):
+            return
+        present = durations != MISSING
+        mask = present.astype(float)
+        values = np.where(present, durations, 0).astype(float)
+        self.rows += len(durations)
+        self.count += mask.T @ mask
+        self.sums += values.T @ mask
+        self.squares += (values * values).T @ mask
+        self.products += values.T @ values
+
+        bins = np.minimum(np.where(present, durations, 0), self.bins)
+        for stage in range(len(DURATION_COLUMNS)):
+            column = present[:, stage]
+            if not column.any():
+                continue
+            self.minimum[stage] = min(self.minimum[stage], durations[column, stage].min())
+            self.maximum[stage] = max(self.maximum[stage], durations[column, stage].max())
+            self.histogram[stage] += np.bincount(bins[column, stage], minlength=self.bins + 1)
+            finished = column & present[:, TOTAL]
+            np.minimum.at(self.min_total[stage], bins[finished, stage], durations[finished, TOTAL])
+
+    def merge(self, other):
+        """Add the accumulators of another aggregate, as if its passengers had been added.
+
+        Args:
+            other (Aggregate): Aggregate with the same number of bins
+
+        Returns:
+            Aggregate: self
+        """
+        if other.bins != self.bins:
+            raise ValueError(f"Cannot merge aggregates with {other.bins} and {self.bins} bins")
+        self.rows += other.rows
+        for name in ['count', 'sums', 'squares', 'products', 'histogram']:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        self.min_total = np.minimum(self.min_total, other.min_total)
+        return self
+
+    def to_bytes(self):
+        """Serialize the accumulators, see from_bytes."""
+        arrays = [self.count, self.sums, self.squares, self.products, self.minimum, self.maximum,
+                  self.histogram, self.min_total]
+        return zlib.compress(np.concatenate([array.ravel() for array in arrays]).tobytes(), 1)
+
+    @classmethod
+    def from_bytes(cls, data, rows, bins=BINS):
+        """Rebuild an aggregate serialized by to_bytes.
+
+        Args:
+            data (bytes): Serialized accumulators
+            rows (int): Number of passengers of the aggregate
+            bins (int): Number of histogram bins of the aggregate
+
+        Returns:
+            Aggregate: The aggregate
+        """
+        aggregate = cls(bins)
+        aggregate.rows = rows
+        values = np.frombuffer(zlib.decompress(data), dtype=float)
+        offset = 0
+        for name in ['count', 'sums', 'squares', 'products', 'minimum', 'maximum', 'histogram', 'min_total']:
+            array = getattr(aggregate, name)
+            setattr(aggregate, name, values[offset:offset + array.size].reshape(array.shape).copy())
+            offset += array.size
+        return aggregate
+
+    def quantiles(self, qs):
+        """Quantiles of every stage with pandas' linear interpolation, inf if they fall in the overflow bin.
+
+        Args:
+            qs (list[float]): Quantiles, between 0 and 1
+
+        Returns:
+            np.ndarray: (stages, len(qs)) array, NaN for the stages without values
+        """
+        n = np.diag(self.count)[:, None]
+        position = np.asarray(qs, dtype=float)[None, :] * np.maximum(n - 1, 0)
+        lower = np.floor(position)
+        upper = np.minimum(lower + 1, np.maximum(n - 1, 0))
+        # Duration of the passenger at a given rank in sorted order: the number of bins ending at or before it
+        cumulative = np.cumsum(self.histogram, axis=1)[:, :, None]
+        below = (cumulative <= lower[:, None, :]).sum(axis=1).astype(float)
+        above = (cumulative <= upper[:, None, :]).sum(axis=1).astype(float)
+        quantiles = below + (above - below) * (position - lower)
+        quantiles[np.maximum(below, above) >= self.bins] = np.inf
+        quantiles[n[:, 0] == 0] = np.nan
+        return quantiles
+
+    def statistics(self):
+        """Summary statistics of every stage, the same as pandas' describe().
+
+        Returns:
+            dict: Count, mean, standard deviation, min, quartiles, P90, P99 and max, arrays over the stages
+        """
+        n = np.diag(self.count)
+        total = np.diag(self.sums)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, total / n, np.nan)
+            variance = np.where(n > 1, (np.diag(self.squares) - total * mean) / (n - 1), np.nan)
+        quantiles = self.quantiles([0.25, 0.5, 0.75, 0.9, 0.99])
+        return {
+            'Count': n.astype(int),
+            'Mean': mean,
+            'Std': np.sqrt(np.maximum(variance, 0.0)),
+            'Min': np.where(n > 0, self.minimum, np.nan),
+            'P25': quantiles[:, 0],
+            'P50': quantiles[:, 1],
+            'P75': quantiles[:, 2],
+            'P90': quantiles[:, 3],
+            'P99': quantiles[:, 4],
+            'Max': np.where(n > 0, self.maximum, np.nan),
+        }
+
+    def correlation(self):
+        """Pearson correlation matrix of the stages over pairwise complete rows, like pandas' corr().
+
+        Returns:
+            np.ndarray: (stages, stages) matrix, NaN where a pair has fewer than two rows or no variance
+        """
+        n = self.count
+        covariance = n * self.products - self.sums * self.sums.T
+        spread = n * self.squares - self.sums * self.sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = covariance / np.sqrt(spread * spread.T)
+        correlation[(n < 2) | ~np.isfinite(correlation)] = np.nan
+        return np.clip(correlation, -1.0, 1.0)
+
+
+class AggregateStore:
+    def __init__(self, path, bins=BINS):
+        """Open the store, creating it if needed.
+
+        Aggregates are accumulated in memory and merged into the store by flush(), in one transaction.
+
+        Args:
+            path (str): SQLite file of the store
+            bins (int): Number of one-minute histogram bins of new aggregates
+        """
+        self.path = path
+        self.bins = bins
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS aggregates (configuration TEXT PRIMARY KEY, rows INTEGER, "
+                "bins INTEGER, data BLOB)")
+        self._pending = {}
+
+    def _aggregate(self, configuration):
+        if configuration not in self._pending:
+            self._pending[configuration] = Aggregate(self.bins)
+        return self._pending[configuration]
+
+    def write_columns(self, columns):
+        """Add the passengers of a ResultColumns buffer to the aggregates of their configurations.
+
+        Args:
+            columns (ResultColumns): Results in columnar form
+        """
+        if not len(columns):
+            return
+        durations = np.column_stack([np.frombuffer(columns.durations[name], dtype=np.int32)
+                                     for name in DURATION_COLUMNS])
+        codes = np.frombuffer(columns.codes['Simulation Parameters'], dtype=np.int32)
+        configurations = columns.categories['Simulation Parameters']
+        if len(configurations) == 1:
+            self._aggregate(configurations[0]).add(durations)
+            return
+        for code, configuration in enumerate(configurations):
+            self._aggregate(configuration).add(durations[codes == code])
+
+    def write(self, rows):
+        """Add rows, as returned by run_simulation, to the aggregates of their configurations.
+
+        Args:
+            rows (list[dict]): Passenger rows
+        """
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row['Simulation Parameters'], []).append(
+                [MISSING if row[name] is None else row[name] for name in DURATION_COLUMNS])
+        for configuration, durations in grouped.items():
+            self._aggregate(configuration).add(np.array(durations, dtype=np.int64))
+
+    def flush(self):
+        """Merge the aggregates accumulated in memory into the store."""
+        if not self._pending:
+            return
+        with self.connection:
+            for configuration, aggregate in self._pending.items():
+                row = self.connection.execute("SELECT rows, bins, data FROM aggregates WHERE configuration = ?",
+                                              (configuration,)).fetchone()
+                if row is not None:
+                    aggregate = Aggregate.from_bytes(row[2], row[0], row[1]).merge(aggregate)
+                self.connection.execute("INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?, ?)",
+                                        (configuration, aggregate.rows, aggregate.bins, aggregate.to_bytes()))
+        self._pending = {}
+
+    def discard(self):
+        """Drop the aggregates accumulated in memory since the last flush, e.g. of runs that will be run again."""
+        self._pending = {}
+
+    def clear(self):
+        """Remove every aggregate, stored or in memory."""
+        self._pending = {}
+        with self.connection:
+            self.connection.execute("DELETE FROM aggregates")
+
+    def configurations(self):
+        """Stored configurations, as their 'Simulation Parameters' text."""
+        return [row[0] for row in self.connection.execute("SELECT configuration FROM aggregates ORDER BY rowid")]
+
+    def aggregates(self, configurations=None):
+        """Stored aggregates.
+
+        Args:
+            configurations (list[str], optional): Configurations to load, all if None
+
+        Returns:
+            dict: 'Simulation Parameters' text -> Aggregate
+        """
+        rows = self.connection.execute("SELECT configuration, rows, bins, data FROM aggregates ORDER BY rowid")
+        wanted = None if configurations is None else {str(configuration) for configuration in configurations}
+        return {configuration: Aggregate.from_bytes(data, count, bins) for configuration, count, bins, data in rows
+                if wanted is None or configuration in wanted}
+
+    def total(self, configurations=None):
+        """Aggregate of the passengers of several configurations, all of them if None."""
+        aggregates = list(self.aggregates(configurations).values())
+        total = Aggregate(aggregates[0].bins if aggregates else self.bins)
+        for aggregate in aggregates:
+            total.merge(aggregate)
+        return total
+
+    def summary(self, configurations=None):
+        """Statistics of every stage of every configuration.
+
+        Args:
+            configurations (list[str], optional): Configurations to include, all if None
+
+        Returns:
+            pd.DataFrame: One row per configuration and stage
+        """
+        import pandas as pd
+
+        aggregates = self.aggregates(configurations)
+        statistics = [aggregate.statistics() for aggregate in aggregates.values()]
+        columns = {'Simulation Parameters': np.repeat(list(aggregates), len(DURATION_COLUMNS)),
+                   'Stage': DURATION_COLUMNS * len(aggregates)}
+        for name in ['Count', 'Mean', 'Std', 'Min', 'P25', 'P50', 'P75', 'P90', 'P99', 'Max']:
+            columns[name] = np.concatenate([values[name] for values in statistics]) if statistics else []
+        return pd.DataFrame(columns)
+
+    def describe(self, configurations=None):
+        """Statistics of every stage over the passengers of the configurations, like df.describe().T."""
+        import pandas as pd
+
+        return pd.DataFrame(self.total(configurations).statistics(), index=DURATION_COLUMNS)
+
+    def correlation(self, configurations=None):
+        """Correlation matrix of the stages over the passengers of the configurations, like df.corr()."""
+        import pandas as pd
+
+        return pd.DataFrame(self.total(configurations).correlation(), index=DURATION_COLUMNS,
+                            columns=DURATION_COLUMNS)
+
+    def min_total_by_duration(self, stage, configurations=None):
+        """Smallest total processing time for every duration of a stage.
+
+        Same as df.groupby(stage).min()['Total Processing Time'], durations of BINS minutes or more
+        are grouped under BINS.
+
+        Args:
+            stage (str): One of DURATION_COLUMNS
+            configurations (list[str], optional): Configurations to include, all if None
+
+        Returns:
+            pd.Series: Minimum total processing time indexed by duration
+        """
+        import pandas as pd
+
+        total = self.total(configurations)
+        minimum = total.min_total[DURATION_COLUMNS.index(stage)]
+        durations = np.flatnonzero(np.isfinite(minimum))
+        return pd.Series(minimum[durations], index=pd.Index(durations, name=stage), name='Total Processing Time')
+
+    def histogram(self, stage, configurations=None):
+        """Number of passengers for every duration of a stage, durations of BINS minutes or more under BINS."""
+        import pandas as pd
+
+        counts = self.total(configurations).histogram[DURATION_COLUMNS.index(stage)]
+        durations = np.flatnonzero(counts)
+        return pd.Series(counts[durations].astype(int), index=pd.Index(durations, name=stage), name='Passengers')
+
+    def close(self):
+        """Flush the aggregates accumulated in memory and close the store."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
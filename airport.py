@@ -1,17 +1,96 @@
 import simpy
+import random
 from .flight import Flight
-from .processes import CheckIn, Security, PassportControl, Boarding
+from .processes import CheckIn, Security, PassportControl, Boarding, Disembarking
+from .gate import Gate
+from .allocation import GateAllocator, RunwayAllocator
+from tracing import NULL_TRACER
+from monitors import StationMonitor
 
 class Airport:
-    def __init__(self, env, num_security, num_checkin, num_passport, num_gates, num_runways):
+    def __init__(self, env, num_security, num_checkin, num_passport, num_gates, num_runways, tracer=NULL_TRACER,
+                 streams=None, monitor=False):
         self.env = env
-        self.check_in_process = CheckIn(env, num_checkin)
-        self.security_process = Security(env, num_security)
+        self.tracer = tracer
+        # Every station draws its service times from its own substream of the run
+        stream = streams.stream if streams is not None else (lambda name: random)
+        self.check_in_process = CheckIn(env, num_checkin, tracer, stream('check_in'))
+        self.security_process = Security(env, num_security, tracer, stream('security'))
         self.runways = num_runways
-        self.passport_control_process = PassportControl(env, num_passport)
-        self.boarding_process = Boarding(env, num_gates)
+        # Gates and runway slots of the planes, booked without overlaps
+        self.gate_allocator = GateAllocator([Gate(chr(65 + i)) for i in range(num_gates)])
+        self.runway_allocator = RunwayAllocator(num_runways)
+        self.passport_control_process = PassportControl(env, num_passport, tracer, stream('passport'))
+        self.boarding_process = Boarding(env, num_gates, tracer, stream('boarding'))
+        self.disembarking_process = Disembarking(env, num_gates, tracer, stream('disembarking'))
         self.flights = []
 
+        # Registry of the shared stations, built once per airport and used by every passenger
+        self.stations = {
+            'check_in': self.check_in_process,
+            'security': self.security_process,
+            'passport': self.passport_control_process,
+            'boarding': self.boarding_process,
+            'disembarking': self.disembarking_process,
+        }
+
+        # Station monitors are only attached when requested, unmonitored stations skip them
+        if monitor:
+            for name, station in self.stations.items():
+                station.monitor = StationMonitor(name, station.resource.capacity)
+
+    @classmethod
+    def from_capacity(cls, env, capacity, tracer=NULL_TRACER, streams=None, monitor=False):
+        """Creates an airport from a capacity tuple as used by the simulation sweeps.
+
+        Args:
+            env (simpy.Environment): Simulation environment
+            capacity (tuple): (check-in, security, passport, runways, gates) capacities
+            tracer (Tracer): Tracer receiving the events of the stations
+            streams (RandomStreams, optional): Random streams of the run, the global random module if None
+            monitor (bool): Attach a StationMonitor to every station
+
+        Returns:
+            Airport: Airport with one shared station per process
+        """
+        num_checkin, num_security, num_passport, num_runways, num_gates = capacity
+        return cls(env, num_security, num_checkin, num_passport, num_gates, num_runways, tracer, streams, monitor)
+
+    def station_statistics(self):
+        """Returns the statistics of the monitored stations up to the current time.
+
+        Returns:
+            list[dict]: One StationMonitor summary per station, empty if the airport is not monitored
+        """
+        return [station.monitor.summary(self.env.now) for station in self.stations.values()
+                if station.monitor is not None]
+
+    def dispatch(self, plane, departure, boarding_window=30):
+        """Moves a plane through its statuses until take-off.
+
+        The plane starts boarding `boarding_window` minutes before its departure, then waits for
+        the first free runway slot at or after the departure time and takes off.
+
+        Args:
+            plane (Plane): Plane at its gate
+            departure (float): Scheduled departure time
+            boarding_window (float): Minutes of boarding before the departure
+
+        Yields:
+            simpy.events.Timeout: Waits until boarding, departure and the runway slot
+        """
+        if departure - boarding_window > self.env.now:
+            yield self.env.timeout(departure - boarding_window - self.env.now)
+        plane.start_boarding()
+        if departure > self.env.now:
+            yield self.env.timeout(departure - self.env.now)
+        _, slot = self.runway_allocator.assign(self.env.now)
+        if slot > self.env.now:
+            yield self.env.timeout(slot - self.env.now)
+        plane.finish_boarding()
+        if self.tracer.enabled:
+            self.tracer.emit(self.env.now, 'take_off', plane.flight_number, slot - departure, plane.gate)
+
     def schedule_flight(self, flight: Flight):
         """Adds a flight to the airport's schedule flight.
 
@@ -37,4 +116,4 @@ class Airport:
         yield self.env.process(self.check_in_process.process(flight))
         yield self.env.process(self.security_process.process(flight))
         yield self.env.process(self.passport_control_process.process(flight))
-        yield self.env.process(self.boarding_process.process(flight))
\ No newline at end of file
+        yield self.env.process(self.boarding_process.process(flight))
@@ -1,24 +1,182 @@
 import simpy
 import random
-import pandas as pd
 from Airport.airport import Airport
 from Airport.plane import Plane
+from Airport.allocation import GateAllocator
 from Passenger.passenger import Passenger
+from tracing import NULL_TRACER
+from streams import RandomStreams
+from records import ResultColumns
+from controller import RunController
 
-random.seed(42)
+# Simulated minutes of every run
+SIMULATION_TIME = 100
 
-def create_passenger(env, airport, flight_type, gate, capacity, flight_name):
-    # Function to create a new passenger
-    passenger_id = f"ID{random.randint(100, 999)}"
-    arrival_time = random.randint(0, 10)
-    return Passenger(env, passenger_id, airport, flight_type, gate, arrival_time, capacity), passenger_id
+AIRLINES = ["Iberia", "American Airlines", "Delta", "United Airlines", "Lufthansa"]
+PLANE_TYPES = ["Boeing 737", "Airbus A320", "Boeing 787", "Airbus A380"]
 
-def run_simulation(env, capacity):
+def generate_schedule(capacity, rng=random, num_flights=5, passengers_per_flight=20):
+    """Draws the flights and passengers of a simulation run.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        rng (random.Random): generator of the schedule, the global random module by default.
+        num_flights (int): number of flights.
+        passengers_per_flight (int): number of passengers on each flight.
+
+    Returns:
+        list[dict]: one dict per flight with 'Flight ID', 'Plane Type', 'Flight Type', 'Gate',
+            'Gate Times', the (start, end) of its gate booking, and 'Passengers', a list of
+            (passenger ID, arrival time) tuples.
+    """
+    gates = GateAllocator.for_capacity(capacity)
+    available_gates = gates.gates
+    schedule = []
+
+    for _ in range(num_flights):
+        flight_name = f"{rng.choice(AIRLINES)} {rng.randint(1000, 9999)}"
+        flight_type = rng.choice(["Domestic", "International"])
+        # A single draw whatever the number of gates, so the rest of the schedule is the same for every capacity.
+        # Every flight stays at its gate for the whole run, the drawn gate is kept unless it is already taken.
+        # With more flights than gates, a flight waits for the first gate to be free and opens from then on.
+        preferred = available_gates[int(rng.random() * len(available_gates))]
+        gate, start, end = gates.assign(flight_name, 0, SIMULATION_TIME, preferred)
+        plane_type = rng.choice(PLANE_TYPES)
+
+        passengers = []
+        for _ in range(passengers_per_flight):
+            passenger_id = f"ID{rng.randint(100, 999)}"
+            arrival_time = start + rng.randint(0, 10)
+            passengers.append((passenger_id, arrival_time))
+
+        schedule.append({
+            'Flight ID': flight_name,
+            'Plane Type': plane_type,
+            'Flight Type': flight_type,
+            'Gate': gate,
+            'Gate Times': (start, end),
+            'Passengers': passengers,
+        })
+
+    return schedule
+
+def total_processing_time(passenger):
+    # Sum of the stage durations, None if the passenger did not finish before the end of the run
+    stages = [passenger.check_in_time, passenger.security_time, passenger.boarding_time, passenger.disembark_time]
+    if passenger.flight_type == "International":
+        stages.append(passenger.passport_time)
+    if any(stage is None for stage in stages):
+        return None
+    return sum(stages)
+
+def passenger_record(passenger, flight_id, plane_type, capacity):
+    # Result row of a passenger, see run_simulation for the columns
+    return {
+        'Passenger ID': passenger.name,
+        'Flight ID': flight_id,
+        'Plane Type': plane_type,
+        'Flight Type': passenger.flight_type,
+        'Gate': passenger.gate,
+        'Check-in Duration': passenger.check_in_time,
+        'Security Duration': passenger.security_time,
+        'Passport Duration': passenger.passport_time if passenger.flight_type == "International" else None,
+        'Boarding Duration': passenger.boarding_time,
+        'Disembark Duration': passenger.disembark_time,
+        'Total Processing Time': total_processing_time(passenger),
+        'Simulation Parameters': str(capacity)
+    }
+
+def collect_results(flights, capacity, columnar=False):
+    """Collects the result rows of simulated passengers.
+
+    Args:
+        flights (list[tuple]): (flight ID, plane type, passengers) of every flight
+        capacity (tuple): contains the airport resource capacities.
+        columnar (bool): return a ResultColumns buffer instead of a list of dicts.
+
+    Returns:
+        list[dict] | ResultColumns: One row per passenger
+    """
+    if columnar:
+        columns = ResultColumns()
+        for flight_id, plane_type, passengers in flights:
+            for passenger in passengers:
+                columns.add_passenger(passenger, flight_id, plane_type, capacity)
+        return columns
+
+    return [passenger_record(passenger, flight_id, plane_type, capacity)
+            for flight_id, plane_type, passengers in flights for passenger in passengers]
+
+def station_statistics(airport, capacity):
+    # Station summaries of a monitored run, tagged with the capacities like the passenger rows
+    return [dict(summary, **{'Simulation Parameters': str(capacity)}) for summary in airport.station_statistics()]
+
+def simulate_schedule(env, capacity, schedule, streams, engine="simpy", tracer=NULL_TRACER, monitor=False,
+                      horizon=SIMULATION_TIME, bound=None):
+    """Runs the passengers of a schedule through the airport on the simpy or kernel engine.
+
+    Args:
+        env (simpy.Environment): used to manage the simulation (only used by the simpy engine).
+        capacity (tuple): contains the airport resource capacities.
+        schedule (list[dict]): flights as returned by generate_schedule for this capacity.
+        streams (RandomStreams): random streams of the run, the station streams must not have been used.
+        engine (str): "simpy" or "kernel", see run_simulation.
+        tracer (Tracer): receives the events of the simpy engine.
+        monitor (bool): attach a StationMonitor to every station.
+        horizon (int, optional): end of the run in minutes, None runs until every passenger has finished.
+        bound (float, optional): incumbent mean 'Total Processing Time', see RunController.
+
+    Returns:
+        tuple: (list of (flight ID, plane type, passengers) of every flight, airport) after the run
+
+    Raises:
+        BoundExceeded: If the run was stopped because the configuration cannot beat the bound
+    """
+    controller = RunController(horizon, bound)
+    if engine == "kernel":
+        from kernel import run_kernel_simulation
+        flights, _, airport = run_kernel_simulation(capacity, schedule, streams, monitor=monitor,
+                                                    controller=controller)
+        return [(flight['Flight ID'], flight['Plane Type'], passengers) for flight, passengers in flights], airport
+
+    airport = Airport.from_capacity(env, capacity, tracer, streams, monitor)
+    flights = []
+
+    # Create flights and passengers
+    for flight in schedule:
+        passengers = [Passenger(env, passenger_id, airport, flight['Flight Type'], flight['Gate'], arrival_time,
+                                controller.finish)
+                      for passenger_id, arrival_time in flight['Passengers']]
+        controller.watch(passengers)
+
+        plane = Plane(flight['Flight ID'], flight['Plane Type'], passengers, flight['Flight Type'], flight['Gate'], env.now)
+        flights.append(plane)
+
+    controller.run_simpy(env)
+    return [(plane.flight_number, plane.plane_type, plane.passengers) for plane in flights], airport
+
+def run_simulation(env, capacity, engine="simpy", tracer=NULL_TRACER, seed=None, num_flights=5,
+                   passengers_per_flight=20, columnar=False, monitor=False, horizon=SIMULATION_TIME, bound=None):
     """Runs an airport simulation function of the workflow of passengers and flights.
 
     Args:
-        env (simpy.Environment): used to manage the simulation.
+        env (simpy.Environment): used to manage the simulation (only used by the simpy engine).
         capacity (tuple): contains the airport resource capacities.
+        engine (str): "simpy" steps the SimPy processes event by event, "kernel" runs the same
+            model on the lightweight event kernel of kernel.py, "numpy" computes the same
+            queueing pipeline in batch with array recursions.
+        tracer (Tracer): receives the events of the simpy engine, disabled by default.
+        seed (int, optional): seed of the run. Runs with the same seed share the schedule and the
+            per-station random streams (common random numbers); a random seed is used if None.
+        num_flights (int): number of flights.
+        passengers_per_flight (int): number of passengers on each flight.
+        columnar (bool): return a ResultColumns buffer with the same columns instead of a list of dicts.
+        monitor (bool): attach a StationMonitor to every station (simpy and kernel engines) and also
+            return the per-station statistics.
+        horizon (int, optional): end of the run in minutes, None runs until every passenger has
+            finished so no duration is missing.
+        bound (float, optional): incumbent mean 'Total Processing Time' (simpy and kernel engines),
+            the run stops as soon as it is certain to end with a larger mean.
 
     Returns:
         list[]: a list which contains the data for a single passenger.
@@ -28,52 +186,29 @@ def run_simulation(env, capacity):
             - 'Flight Type': Domestic or international.
             - 'Gate': Assigned boarding gate.
             -  Durations for check-in, security, passport control (if international), boarding, and disembarking.
-            - 'Total Processing Time': Sum of all processing durations.
+            - 'Total Processing Time': Sum of all processing durations (None if unfinished).
             - 'Simulation Parameters': capacities.
-    """
-    
-    airport = Airport(env, *capacity)
-    num_flights = 5  
-    flights = []
-    data_save = []
-    airlines = ["Iberia", "American Airlines", "Delta", "United Airlines", "Lufthansa"]
-    available_gates = [f"Gate {chr(65 + i)}" for i in range(capacity[4])]
-
-    # Create flights and passengers
-    for _ in range(num_flights):
-        flight_name = f"{random.choice(airlines)} {random.randint(1000, 9999)}"
-        flight_type = random.choice(["Domestic", "International"])
-        gate = random.choice(available_gates)
-        plane_type = random.choice(["Boeing 737", "Airbus A320", "Boeing 787", "Airbus A380"])
-
-        passengers = []
-        for _ in range(20):
-            passenger, passenger_id = create_passenger(env, airport, flight_type, gate, capacity, flight_name)
-            passengers.append(passenger)
+        When `monitor` is set, a (results, station statistics) tuple where the statistics are
+        one StationMonitor summary per station, with its 'Simulation Parameters'.
 
-        plane = Plane(flight_name, plane_type, passengers, flight_type, gate, env.now)
-        flights.append(plane)
+    Raises:
+        ValueError: If the engine is not supported, or does not support monitoring or the bound
+        BoundExceeded: If the run was stopped because the configuration cannot beat the bound
+    """
+    streams = RandomStreams(seed)
+    schedule = generate_schedule(capacity, streams.stream('schedule'), num_flights, passengers_per_flight)
 
-    env.run(until=100)
+    if engine == "numpy":
+        if monitor:
+            raise ValueError("Station monitors are not supported by the numpy engine")
+        if bound is not None:
+            raise ValueError("Bounded runs are not supported by the numpy engine")
+        from numpy_engine import run_numpy_simulation
+        return run_numpy_simulation(capacity, schedule, horizon, streams.numpy('service'), columnar)
+    if engine not in ("simpy", "kernel"):
+        raise ValueError(f"Invalid engine: {engine}. Must be one of: ['simpy', 'kernel', 'numpy']")
+    flights, airport = simulate_schedule(env, capacity, schedule, streams, engine, tracer, monitor, horizon, bound)
 
     # Collect data after simulation finishes
-    for plane in flights:
-        for passenger in plane.passengers:
-            data_save.append({
-                'Passenger ID': passenger.name,
-                'Flight ID': plane.flight_number,
-                'Plane Type': plane.plane_type,
-                'Flight Type': passenger.flight_type,
-                'Gate': passenger.gate,
-                'Check-in Duration': passenger.check_in_time,
-                'Security Duration': passenger.security_time,
-                'Passport Duration': passenger.passport_time if passenger.flight_type == "International" else None,
-                'Boarding Duration': passenger.boarding_time,
-                'Disembark Duration': passenger.disembark_time,
-                'Total Processing Time': (passenger.check_in_time + passenger.security_time + 
-                                        (passenger.passport_time if passenger.flight_type == "International" else 0) + 
-                                        passenger.boarding_time + passenger.disembark_time),
-                'Simulation Parameters': str(capacity)
-            })
-
-    return data_save
\ No newline at end of file
+    results = collect_results(flights, capacity, columnar)
+    return (results, station_statistics(airport, capacity)) if monitor else results
@@ -0,0 +1,151 @@
+import heapq
+
+from .gate import Gate
+
+
+class GateAllocator:
+    def __init__(self, gates, turnaround=0):
+        """Assigns gates to flights so that no gate is booked twice at the same time.
+
+        Requests are processed in order of start time with a sweep line: a heap of the busy gates
+        ordered by the time they become free, and a heap of the free gates. Every request costs
+        O(log g), so a timetable of n flights is allocated in O(n log n).
+
+        Args:
+            gates (list[Gate | str]): Gates of the airport
+            turnaround (float): Minutes a gate stays blocked after a flight leaves it
+        """
+        self.gates = [str(gate) for gate in gates]
+        self.turnaround = turnaround
+        self._free = list(range(len(self.gates)))
+        self._is_free = [True] * len(self.gates)
+        self._busy = []
+        self._index = {gate: i for i, gate in enumerate(self.gates)}
+        self._last_start = None
+        self.assigned = 0
+        self.conflicts = []
+
+    @classmethod
+    def for_capacity(cls, capacity, turnaround=0):
+        """Gate allocator of the gates of a capacity tuple ('Gate A', 'Gate B', ...)."""
+        return cls([Gate(chr(65 + i)) for i in range(capacity[4])], turnaround)
+
+    def _release(self, time):
+        # Gates whose flight has left by `time` become free again
+        while self._busy and self._busy[0][0] <= time:
+            _, i = heapq.heappop(self._busy)
+            self._is_free[i] = True
+            heapq.heappush(self._free, i)
+
+    def _pop_free(self):
+        while self._free:
+            i = heapq.heappop(self._free)
+            if self._is_free[i]:
+                self._is_free[i] = False
+                return i
+        return None
+
+    def assign(self, flight, start, end, preferred=None):
+        """Assigns a gate to one flight, requests must come in non-decreasing start order.
+
+        The preferred gate is used if it is free, otherwise the first free gate. When every gate
+        is busy the flight waits for the first gate to be free, and the conflict is recorded.
+
+        Args:
+            flight (str): Flight identifier
+            start (float): Time the flight needs the gate from
+            end (float): Time the flight leaves the gate
+            preferred (str, optional): Gate requested by the timetable
+
+        Returns:
+            tuple: (gate, start, end) of the booking, delayed by the time waited for a gate
+
+        Raises:
+            ValueError: If the requests are not in start order, or the airport has no gates
+        """
+        if not self.gates:
+            raise ValueError("The airport has no gates")
+        if self._last_start is not None and start < self._last_start:
+            raise ValueError(f"Gate requests must be in start order, got {start} after {self._last_start}")
+        self._last_start = start
+        self._release(start)
+
+        i = self._index.get(preferred)
+        if i is not None and self._is_free[i]:
+            # The free heap is lazy: the preferred gate is only marked as taken and skipped when popped
+            self._is_free[i] = False
+        else:
+            i = self._pop_free()
+        if i is None:
+            free_at, i = heapq.heappop(self._busy)
+            self.conflicts.append((flight, preferred, free_at - start))
+            start, end = free_at, end + free_at - start
+        heapq.heappush(self._busy, (end + self.turnaround, i))
+        self.assigned += 1
+        return self.gates[i], start, end
+
+    def allocate(self, requests):
+        """Assigns gates to a whole timetable.
+
+        Args:
+            requests (list[tuple]): (flight, start, end, preferred gate or None), in any order
+
+        Returns:
+            dict: flight -> (gate, start, end), see assign
+        """
+        return {flight: self.assign(flight, start, end, preferred)
+                for flight, start, end, preferred in sorted(requests, key=lambda request: request[1])}
+
+
+class RunwayAllocator:
+    def __init__(self, runways, separation=2):
+        """Assigns take-off and landing slots, first come first served.
+
+        Args:
+            runways (int): Number of runways
+            separation (float): Minutes between two movements on the same runway
+        """
+        if runways < 1:
+            raise ValueError(f"The airport needs at least one runway, got {runways}")
+        self.separation = separation
+        self._free_at = [(0, i) for i in range(runways)]
+        heapq.heapify(self._free_at)
+        self.delays = 0
+
+    def assign(self, time):
+        """Books the earliest slot at or after `time`, O(log r).
+
+        Args:
+            time (float): Requested movement time
+
+        Returns:
+            tuple: (runway index, slot time)
+        """
+        free_at, runway = heapq.heappop(self._free_at)
+        slot = max(time, free_at)
+        if slot > time:
+            self.delays += 1
+        heapq.heappush(self._free_at, (slot + self.separation, runway))
+        return runway, slot
+
+
+def find_conflicts(bookings):
+    """Finds overlapping bookings of the same resource with a sweep line, O(n log n + k).
+
+    Args:
+        bookings (list[tuple]): (resource, start, end, key) of every booking, end excluded
+
+    Returns:
+        list[tuple]: (resource, key, other key) of every booking overlapping an earlier one
+            (compared with the earlier booking that ends last)
+    """
+    conflicts = []
+    current = None
+    for resource, start, end, key in sorted(bookings, key=lambda booking: (booking[0], booking[1])):
+        if current is not None and current[0] == resource and start < current[1]:
+            conflicts.append((resource, key, current[2]))
+            if end > current[1]:
+                current = (resource, end, key)
+        else:
+            current = (resource, end, key)
+    return conflicts
@@ -0,0 +1,150 @@
+# arrivals.py
+#
+# This file defines the streaming scenario mode of the airport simulation.
+# Instead of creating every passenger and its SimPy process before the clock starts, flights and
+# passengers are generated lazily from an arrival process: a source process spawns each passenger
+# when it arrives, and the passenger's result row is handed to a sink as soon as the journey is
+# complete, after which nothing references it any more. Memory is bounded by the number of
+# passengers inside the airport at the same time, not by the number of passengers of the day.
+# Each flight books a gate from its opening until its departure and a runway slot to take off,
+# with the allocators of the airport, and its plane goes through its statuses as the day runs.
+
+import itertools
+
+from airport_simulation import AIRLINES, PLANE_TYPES, passenger_record, total_processing_time
+from Airport.airport import Airport
+from Airport.plane import Plane
+from Passenger.passenger import Passenger
+from streams import RandomStreams
+from tracing import NULL_TRACER
+
+
+def flight_generator(rng, capacity):
+    """Generates flights one at a time.
+
+    Args:
+        rng (random.Random): Generator of the schedule
+        capacity (tuple): contains the airport resource capacities.
+
+    Yields:
+        dict: 'Flight ID', 'Plane Type', 'Flight Type' and 'Gate' of the next flight
+    """
+    available_gates = [f"Gate {chr(65 + i)}" for i in range(capacity[4])]
+    while True:
+        yield {
+            'Flight ID': f"{rng.choice(AIRLINES)} {rng.randint(1000, 9999)}",
+            'Flight Type': rng.choice(["Domestic", "International"]),
+            'Gate': available_gates[int(rng.random() * len(available_gates))],
+            'Plane Type': rng.choice(PLANE_TYPES),
+        }
+
+
+def passenger_arrivals(rng, capacity, passengers, horizon, passengers_per_flight=150, gates=None,
+                       departure_after=120):
+    """Generates the arrivals of a day lazily, in time order.
+
+    Passengers arrive as a Poisson process with rate passengers / horizon and fill the flights
+    in order of arrival; a new flight is opened when the current one is full. Flights depart
+    `departure_after` minutes after they open, and book their gate for that time if an
+    allocator is given.
+
+    Args:
+        rng (random.Random): Generator of the arrivals and flights
+        capacity (tuple): contains the airport resource capacities.
+        passengers (int): Expected number of passengers in the horizon
+        horizon (float): Length of the arrival period in minutes
+        passengers_per_flight (int): Passengers on each flight
+        gates (GateAllocator, optional): Books the gate of every flight, the drawn gate is then
+            only a preference and double bookings are avoided
+        departure_after (float): Minutes between the opening of a flight and its departure
+
+    Yields:
+        tuple: (arrival time, passenger ID, flight dict with its 'Departure' time)
+    """
+    rate = passengers / horizon
+    flights = flight_generator(rng, capacity)
+    time = 0.0
+    for number in itertools.count():
+        time += rng.expovariate(rate)
+        if time >= horizon:
+            return
+        if number % passengers_per_flight == 0:
+            flight = next(flights)
+            flight['Departure'] = time + departure_after
+            if gates is not None:
+                flight['Gate'], _, flight['Departure'] = gates.assign(flight['Flight ID'], time, flight['Departure'],
+                                                                      flight['Gate'])
+        yield time, f"ID{number}", flight
+
+
+def passenger_source(env, airport, arrivals, on_finish):
+    """SimPy process spawning each passenger at its arrival time.
+
+    Args:
+        env (simpy.Environment): Simulation environment
+        airport (Airport): Airport with the shared stations
+        arrivals (iterator): (arrival time, passenger ID, flight dict) in time order
+        on_finish (callable): Called with (passenger, flight) when a passenger finishes
+
+    Yields:
+        simpy.events.Timeout: Wait until the next arrival
+    """
+    current = None
+    for arrival_time, passenger_id, flight in arrivals:
+        if arrival_time > env.now:
+            yield env.timeout(arrival_time - env.now)
+        if flight is not current:
+            # The plane of a new flight waits at its gate until it takes off
+            current = flight
+            plane = Plane(flight['Flight ID'], flight['Plane Type'], None, flight['Flight Type'], flight['Gate'],
+                          env.now)
+            env.process(airport.dispatch(plane, flight['Departure']))
+        Passenger(env, passenger_id, airport, flight['Flight Type'], flight['Gate'], 0,
+                  on_finish=lambda passenger, flight=flight: on_finish(passenger, flight))
+
+
+def run_scenario(env, capacity, passengers=100000, horizon=24 * 60, seed=None, sink=None,
+                 passengers_per_flight=150, until=None, tracer=NULL_TRACER):
+    """Runs a large scenario with lazily generated passengers.
+
+    Args:
+        env (simpy.Environment): used to manage the simulation.
+        capacity (tuple): contains the airport resource capacities.
+        passengers (int): Expected number of passengers arriving in the horizon
+        horizon (float): Length of the arrival period in minutes (a day by default)
+        seed (int, optional): seed of the run
+        sink (ResultSink, optional): receives the row of every finished passenger, see run_simulation
+        passengers_per_flight (int): Passengers on each flight
+        until (float, optional): Stop the simulation at this time, by default it runs until
+            every passenger has finished
+        tracer (Tracer): receives the events of the stations, disabled by default.
+
+    Returns:
+        dict: 'Passengers' finished, 'Mean Processing Time', 'Max Processing Time', 'Flights',
+            'Gate Conflicts' (flights that had to wait for a gate) and 'Runway Delays'
+            (take-offs that had to wait for a runway slot)
+    """
+    streams = RandomStreams(seed)
+    airport = Airport.from_capacity(env, capacity, tracer, streams)
+    summary = {'Passengers': 0, 'Total': 0, 'Max Processing Time': None}
+
+    def finish(passenger, flight):
+        total = total_processing_time(passenger)
+        summary['Passengers'] += 1
+        summary['Total'] += total
+        if summary['Max Processing Time'] is None or total > summary['Max Processing Time']:
+            summary['Max Processing Time'] = total
+        if sink is not None:
+            sink.write([passenger_record(passenger, flight['Flight ID'], flight['Plane Type'], capacity)])
+
+    arrivals = passenger_arrivals(streams.stream('arrivals'), capacity, passengers, horizon, passengers_per_flight,
+                                  airport.gate_allocator)
+    env.process(passenger_source(env, airport, arrivals, finish))
+    env.run(until=until)
+    summary['Flights'] = airport.gate_allocator.assigned
+    summary['Gate Conflicts'] = len(airport.gate_allocator.conflicts)
+    summary['Runway Delays'] = airport.runway_allocator.delays
+
+    total = summary.pop('Total')
+    summary['Mean Processing Time'] = total / summary['Passengers'] if summary['Passengers'] else None
+    return summary
@@ -0,0 +1,135 @@
+# batch.py
+#
+# This file defines the batched scenario API of the airport simulation.
+# run_simulation_batch simulates many capacity configurations and seeds in one call. The schedule of a
+# seed is drawn once (once per number of gates, the only capacity it depends on) and reused by every
+# configuration, whose stations get fresh streams of the same seed, so every run gives exactly the rows
+# of run_simulation(capacity, seed) under common random numbers. The text columns of the schedule are
+# dictionary-encoded once per seed and every run only appends its durations, so the whole batch is
+# returned as a single ResultColumns buffer with the row range of every run.
+
+import array
+import math
+
+import simpy
+
+from airport_simulation import SIMULATION_TIME, generate_schedule, simulate_schedule
+from records import ResultColumns, STRING_COLUMNS, DURATION_COLUMNS, MISSING, passenger_durations
+from streams import RandomStreams
+
+ENGINES = ["simpy", "kernel", "numpy"]
+
+
+def _encode_schedule(columns, schedule):
+    # Codes of the text columns of every passenger of the schedule, in the order of the results
+    texts = [(passenger_id, flight['Flight ID'], flight['Plane Type'], flight['Flight Type'], flight['Gate'])
+             for flight in schedule for passenger_id, _ in flight['Passengers']]
+    return {name: columns.encode(name, [passenger[i] for passenger in texts]) for i, name in enumerate(STRING_COLUMNS)}
+
+
+def _passenger_durations(flights):
+    # Duration columns of the simulated passengers, MISSING in place of None
+    values = [passenger_durations(passenger) for _, _, passengers in flights for passenger in passengers]
+    if not values:
+        return {name: array.array('i') for name in DURATION_COLUMNS}
+    return {name: array.array('i', [MISSING if value is None else value for value in column])
+            for name, column in zip(DURATION_COLUMNS, zip(*values))}
+
+
+def _numpy_durations(capacity, schedule, streams, horizon):
+    # Duration columns of a run of the vectorized engine, same draws as run_numpy_simulation
+    import numpy as np
+    from numpy_engine import schedule_arrays, simulate_pipeline
+
+    arrivals, international = schedule_arrays(schedule)
+    durations = simulate_pipeline(capacity, arrivals[np.newaxis], international[np.newaxis],
+                                  streams.numpy('service'), horizon)
+    return {name: array.array('i', np.where(np.isnan(durations[name][0]), MISSING,
+                                            durations[name][0]).astype(np.int32).tobytes())
+            for name in DURATION_COLUMNS}
+
+
+def run_simulation_batch(capacities, seeds, engine="kernel", num_flights=5, passengers_per_flight=20,
+                         horizon=SIMULATION_TIME):
+    """Runs every capacity configuration with every seed, sharing the schedule of each seed.
+
+    Args:
+        capacities (list[tuple]): capacity configurations to simulate.
+        seeds (list[int]): seeds of the runs, every configuration is run once with each of them.
+        engine (str): "simpy", "kernel" or "numpy", see run_simulation.
+        num_flights (int): number of flights.
+        passengers_per_flight (int): number of passengers on each flight.
+        horizon (int, optional): end of every run in minutes, None runs until every passenger has finished.
+
+    Returns:
+        tuple: (ResultColumns with the rows of every run, list of (capacity, seed, first row, end row)
+            of the runs, seed by seed and then in the order of `capacities`). The rows of a run are the
+            rows of run_simulation(capacity, seed) with the same engine.
+
+    Raises:
+        ValueError: If the engine is not supported
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Invalid engine: {engine}. Must be one of: {ENGINES}")
+    capacities = [tuple(capacity) for capacity in capacities]
+    columns = ResultColumns()
+    parameters = columns.encode('Simulation Parameters', [str(capacity) for capacity in capacities])
+    runs = []
+
+    for seed in seeds:
+        # Number of gates -> (schedule, codes of its text columns)
+        schedules = {}
+        for capacity, parameter in zip(capacities, parameters):
+            if capacity[4] not in schedules:
+                schedule = generate_schedule(capacity, RandomStreams(seed).stream('schedule'), num_flights,
+                                             passengers_per_flight)
+                schedules[capacity[4]] = (schedule, _encode_schedule(columns, schedule))
+            schedule, codes = schedules[capacity[4]]
+
+            streams = RandomStreams(seed)
+            if engine == "numpy":
+                durations = _numpy_durations(capacity, schedule, streams, horizon)
+            else:
+                env = simpy.Environment() if engine == "simpy" else None
+                flights, _ = simulate_schedule(env, capacity, schedule, streams, engine, horizon=horizon)
+                durations = _passenger_durations(flights)
+
+            start = len(columns)
+            passengers = len(codes['Passenger ID'])
+            columns.append_encoded({**codes, 'Simulation Parameters': array.array('i', [parameter]) * passengers},
+                                   durations)
+            runs.append((capacity, seed, start, len(columns)))
+
+    return columns, runs
+
+
+def split_runs(columns, runs):
+    """Yields the results of every run of a batch.
+
+    Args:
+        columns (ResultColumns): Results of run_simulation_batch
+        runs (list[tuple]): Runs of run_simulation_batch
+
+    Yields:
+        tuple: (capacity, seed, ResultColumns of the run)
+    """
+    for capacity, seed, start, stop in runs:
+        yield capacity, seed, columns.slice(start, stop)
+
+
+def mean_processing_times(columns, runs):
+    """Mean 'Total Processing Time' of the passengers that finished each run of a batch.
+
+    Args:
+        columns (ResultColumns): Results of run_simulation_batch
+        runs (list[tuple]): Runs of run_simulation_batch
+
+    Returns:
+        list[float]: Mean time of every run, inf if no passenger finished
+    """
+    totals = columns.durations['Total Processing Time']
+    means = []
+    for _, _, start, stop in runs:
+        times = [time for time in totals[start:stop] if time != MISSING]
+        means.append(sum(times) / len(times) if times else math.inf)
+    return means
@@ -0,0 +1,305 @@
+# benchmarks.py
+#
+# This file defines the performance benchmarks of the airport simulation.
+# It measures single simulation runs on every engine (simulated events/sec and passengers/sec),
+# the wall-clock of a capacity sweep, of pso_opt() and of the fuzzy satisfaction scoring, and
+# scaling curves against the number of passengers and the capacities. Every case runs in a fresh
+# process so its peak RSS is its own, all seeds are fixed, and the results are written as JSON so
+# runs on different commits can be compared with --compare. The cold import time of the entry points
+# is checked against a budget, so heavy imports do not creep back into the startup of the workers.
+#
+# Usage: python benchmarks.py [--quick] [--output bench.json] [--compare previous.json]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SEED = 0
+
+# Budget in seconds of a cold import of the entry points and of the modules loaded by the workers,
+# heavy dependencies (pandas, scikit-fuzzy, matplotlib) must stay out of their import path
+IMPORT_BUDGETS = {
+    'cli': 0.1,
+    'main': 0.1,
+    'workqueue': 0.15,
+    'sweep': 0.25,
+    'fuzzylogic': 0.25,
+    'psooptimizer': 0.4,
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def bench_run_simulation(engine, capacity, num_flights, passengers_per_flight, repeat):
+    """Best-of-repeat time of one run_simulation call, with the events processed by the simpy engine."""
+    from airport_simulation import run_simulation
+    from kernel import CountingEnvironment
+
+    best = None
+    events = None
+    for _ in range(repeat):
+        env = CountingEnvironment()
+        start = time.perf_counter()
+        run_simulation(env, capacity, engine=engine, seed=SEED, num_flights=num_flights,
+                       passengers_per_flight=passengers_per_flight, columnar=True)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+        if engine == "simpy":
+            events = env.events
+    passengers = num_flights * passengers_per_flight
+    result = {'seconds': best, 'passengers_per_second': passengers / best}
+    if events is not None:
+        result['events'] = events
+        result['events_per_second'] = events / best
+    return result
+
+
+def bench_engines(capacity, num_flights, passengers_per_flight, repeat):
+    """Events/sec of the kernel against simpy.Environment, both run to completion."""
+    from kernel import benchmark_engines
+    return benchmark_engines(capacity, num_flights, passengers_per_flight, SEED, repeat)
+
+
+def bench_scenario(capacity, passengers):
+    """Streaming scenario with `passengers` arrivals over a day, run to completion."""
+    from arrivals import run_scenario
+    from kernel import CountingEnvironment
+
+    env = CountingEnvironment()
+    start = time.perf_counter()
+    summary = run_scenario(env, capacity, passengers=passengers, seed=SEED)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'passengers': summary['Passengers'], 'events': env.events,
+            'events_per_second': env.events / seconds, 'passengers_per_second': summary['Passengers'] / seconds}
+
+
+def bench_sweep(capacities, workers, engine):
+    """Wall-clock of a capacity sweep, results are discarded."""
+    from sweep import run_sweep
+
+    start = time.perf_counter()
+    rows = 0
+    for _, data in run_sweep(capacities, workers=workers, engine=engine, seed=SEED, columnar=True):
+        rows += len(data)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'configurations': len(capacities), 'rows': rows,
+            'configurations_per_second': len(capacities) / seconds}
+
+
+def bench_pso(workers):
+    """Wall-clock of pso_opt() with an in-memory evaluation cache."""
+    from psooptimizer import pso_opt
+
+    start = time.perf_counter()
+    result = pso_opt(workers=workers, seed=SEED, cache_path=None)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'simulations': int(result['Simulations Run'][0]),
+            'best_value': float(result['Fitness Value (Avg. Time)'][0])}
+
+
+def bench_fuzzy(calls, batch):
+    """Time per evaluate_satisfaction call and of one evaluate_batch call, skipped without scikit-fuzzy."""
+    try:
+        import numpy as np
+        from fuzzylogic import AirportSatisfaction
+    except ImportError as error:
+        return {'skipped': str(error)}
+
+    rng = np.random.default_rng(SEED)
+    start = time.perf_counter()
+    satisfaction = AirportSatisfaction()
+    setup = time.perf_counter() - start
+
+    capacities = rng.uniform(0, 10, calls)
+    times = rng.uniform(0, 10, calls)
+    start = time.perf_counter()
+    for capacity, waiting_time in zip(capacities, times):
+        satisfaction.evaluate_satisfaction(capacity, waiting_time)
+    single = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    satisfaction.satisfaction_surface()
+    surface = time.perf_counter() - start
+
+    capacities = rng.uniform(0, 10, batch)
+    times = rng.uniform(0, 10, batch)
+    start = time.perf_counter()
+    satisfaction.evaluate_batch(capacities, times)
+    batched = time.perf_counter() - start
+    return {'setup_seconds': setup, 'seconds_per_call': single, 'surface_seconds': surface,
+            'batch_rows': batch, 'batch_seconds': batched, 'rows_per_second': batch / batched}
+
+
+def bench_imports(budgets, repeat):
+    """Best-of-repeat cold import time of every module, each in a fresh interpreter, against its budget.
+
+    A module that fails to import is reported with its error and counts as over budget.
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    result = {}
+    for module, budget in budgets.items():
+        best = None
+        for _ in range(repeat):
+            code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+            process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=environment)
+            if process.returncode != 0:
+                lines = process.stderr.strip().splitlines()
+                result[module] = {'error': lines[-1] if lines else f"exit code {process.returncode}",
+                                  'budget_seconds': budget, 'within_budget': False}
+                break
+            seconds = float(process.stdout)
+            best = seconds if best is None else min(best, seconds)
+        else:
+            result[module] = {'seconds': best, 'budget_seconds': budget, 'within_budget': best <= budget}
+    result['within_budget'] = all(module['within_budget'] for module in result.values())
+    return result
+
+
+def _run_case(case):
+    # Runs in a fresh worker process, so peak RSS only covers this case
+    function, kwargs = case
+    result = globals()[function](**kwargs)
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_case(function, **kwargs):
+    """Runs one benchmark case in a fresh process.
+
+    Args:
+        function (str): Name of the bench_* function
+        **kwargs: Arguments of the function
+
+    Returns:
+        dict: Measurements of the case, including 'peak_rss_mb'
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_run_case, (function, kwargs)).result()
+
+
+def build_cases(quick=False):
+    """Lists the benchmark cases.
+
+    Args:
+        quick (bool): Smaller sizes, for a smoke run
+
+    Returns:
+        dict: case name -> (bench_* function name, keyword arguments)
+    """
+    from itertools import product
+
+    repeat = 3 if quick else 5
+    grid = list(product([1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [5, 10, 20, 25]))
+    cases = {}
+    for engine in ["simpy", "kernel", "numpy"]:
+        cases[f'run_simulation/{engine}'] = ('bench_run_simulation', {
+            'engine': engine, 'capacity': (2, 2, 2, 2, 10), 'num_flights': 5, 'passengers_per_flight': 20,
+            'repeat': repeat})
+    cases['engines/kernel_vs_simpy'] = ('bench_engines', {
+        'capacity': (4, 4, 4, 4, 25), 'num_flights': 10 if quick else 50, 'passengers_per_flight': 200,
+        'repeat': repeat})
+
+    # Scaling with the number of passengers (large capacities so the airport is not overloaded)
+    for passengers in ([1000, 10000] if quick else [1000, 10000, 100000]):
+        cases[f'scaling/passengers/{passengers}'] = ('bench_scenario', {
+            'capacity': (400, 250, 150, 4, 800), 'passengers': passengers})
+    # Scaling with the capacities, same schedule
+    for level in [1, 2, 4, 8]:
+        cases[f'scaling/capacity/{level}'] = ('bench_run_simulation', {
+            'engine': "simpy", 'capacity': (level, level, level, 4, 5 * level), 'num_flights': 5,
+            'passengers_per_flight': 20, 'repeat': repeat})
+
+    workers = os.cpu_count() or 1
+    cases['sweep/simpy'] = ('bench_sweep', {
+        'capacities': grid[:64] if quick else grid, 'workers': workers, 'engine': "simpy"})
+    cases['sweep/numpy'] = ('bench_sweep', {
+        'capacities': grid[:64] if quick else grid, 'workers': workers, 'engine': "numpy"})
+    if not quick:
+        cases['pso_opt'] = ('bench_pso', {'workers': workers})
+    cases['imports'] = ('bench_imports', {'budgets': IMPORT_BUDGETS, 'repeat': repeat})
+    cases['fuzzy'] = ('bench_fuzzy', {'calls': 50 if quick else 500, 'batch': 1_000_000})
+    return cases
+
+
+def metadata():
+    """Machine and commit information of a benchmark run."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'seed': SEED,
+    }
+
+
+def compare(current, previous):
+    """Prints the change of the main metric of every case against a previous run."""
+    for name, result in current['results'].items():
+        before = previous.get('results', {}).get(name)
+        if not before or 'seconds' not in result or 'seconds' not in before:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        print(f"{name:40s} {before['seconds']:10.4f}s -> {result['seconds']:10.4f}s  ({ratio:5.2f}x)")
+
+
+def add_arguments(parser):
+    # Options of the benchmarks, shared with the `bench` command of cli.py
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke run")
+    parser.add_argument("--output", default="bench.json", help="JSON output path (default: bench.json)")
+    parser.add_argument("--compare", default=None, help="previous JSON output to compare against")
+    parser.add_argument("--only", default=None, help="only run the cases whose name starts with this prefix")
+    return parser
+
+
+def parse_args(argv=None):
+    return add_arguments(argparse.ArgumentParser(description="Airport simulation benchmarks")).parse_args(argv)
+
+
+def main(argv=None, args=None):
+    args = args or parse_args(argv)
+    cases = build_cases(args.quick)
+    report = {'meta': metadata(), 'results': {}}
+    for name, (function, kwargs) in cases.items():
+        if args.only and not name.startswith(args.only):
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        report['results'][name] = run_case(function, **kwargs)
+
+    imports = report['results'].get('imports')
+    if imports and not imports['within_budget']:
+        for module, result in imports.items():
+            if isinstance(result, dict) and 'error' in result:
+                print(f"Import of {module} failed: {result['error']}", file=sys.stderr)
+            elif isinstance(result, dict) and not result['within_budget']:
+                print(f"Import of {module} takes {result['seconds']:.3f}s, over its budget of "
+                      f"{result['budget_seconds']:.3f}s", file=sys.stderr)
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results saved to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report, json.load(file))
+    return report
+
+
+if __name__ == '__main__':
+    main()
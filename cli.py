@@ -0,0 +1,85 @@
+# cli.py
+#
+# This file defines the single command line entry point of the airport simulation.
+# Every command imports its module only when it runs, so starting the CLI (or printing its help)
+# does not load SimPy, pandas, scikit-fuzzy or matplotlib.
+#
+# Usage: python cli.py sweep [--engine numpy] [--adaptive] ...
+#        python cli.py optimize [--surrogate] [--journal pso.sqlite] ...
+#        python cli.py score [--input passenger_flight_data.csv] [--output satisfaction.csv]
+#        python cli.py bench [--quick] [--only imports] ...
+
+import argparse
+import os
+import sys
+
+
+def sweep(args):
+    import main
+    main.main(args)
+
+
+def optimize(args):
+    from psooptimizer import pso_opt
+    result = pso_opt(workers=args.workers, seed=args.seed, cache_path=args.cache, surrogate=args.surrogate,
+                     history_path=args.history, journal_path=args.journal, prune=args.prune,
+                     replications=args.replications)
+    print(result.to_string(index=False))
+
+
+def score(args):
+    from fuzzylogic import score_sweep
+    scores = score_sweep(args.input)
+    if args.output:
+        scores.to_csv(args.output, index=False)
+        print(f"Scores saved to {args.output}", file=sys.stderr)
+    print(scores.head(args.top).to_string(index=False))
+
+
+def bench(args):
+    import benchmarks
+    benchmarks.main(args=args)
+
+
+def build_parser():
+    # Option definitions are kept in main.py and benchmarks.py, which only import argparse and the sinks
+    import benchmarks
+    import main
+
+    parser = argparse.ArgumentParser(description="Airport simulation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    main.add_arguments(commands.add_parser("sweep", help="simulate a grid of capacities")).set_defaults(run=sweep)
+
+    parser_optimize = commands.add_parser("optimize", help="search the best capacities with PSO")
+    parser_optimize.add_argument("--workers", type=int, default=os.cpu_count(),
+                                 help="number of worker processes (default: number of cores)")
+    parser_optimize.add_argument("--seed", type=int, default=42, help="seed of the simulations and the swarm")
+    parser_optimize.add_argument("--cache", default="./pso_cache.sqlite",
+                                 help="SQLite evaluation cache (default: ./pso_cache.sqlite)")
+    parser_optimize.add_argument("--surrogate", action="store_true",
+                                 help="only simulate the particles the surrogate model finds promising")
+    parser_optimize.add_argument("--history", default="./passenger_flight_data.csv",
+                                 help="earlier sweep used to fit the surrogate (default: ./passenger_flight_data.csv)")
+    parser_optimize.add_argument("--journal", default=None,
+                                 help="SQLite journal of the swarm, an interrupted run resumes from it")
+    parser_optimize.add_argument("--prune", action="store_true",
+                                 help="stop the simulations that cannot beat the best value of their particle")
+    parser_optimize.add_argument("--replications", type=int, default=1,
+                                 help="runs of every configuration, the fitness is their mean (default: 1)")
+    parser_optimize.set_defaults(run=optimize)
+
+    parser_score = commands.add_parser("score", help="score the configurations of a sweep on satisfaction")
+    parser_score.add_argument("--input", default="./passenger_flight_data.csv",
+                              help="CSV written by the sweep (default: ./passenger_flight_data.csv)")
+    parser_score.add_argument("--output", default=None, help="also write the scores to this CSV")
+    parser_score.add_argument("--top", type=int, default=10, help="configurations printed (default: 10)")
+    parser_score.set_defaults(run=score)
+
+    benchmarks.add_arguments(commands.add_parser("bench", help="run the benchmarks")).set_defaults(run=bench)
+    return parser
+
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    args.run(args)
@@ -0,0 +1,201 @@
+# controller.py
+#
+# This file defines the run controller of the airport simulation.
+# Instead of always running the engine to a fixed env.run(until=SIMULATION_TIME), the controller
+# decides when a run ends: at the horizon as before, as soon as every passenger has finished when
+# there is no horizon (drain mode, so no row comes back with missing durations), or as soon as the
+# configuration is provably worse than an incumbent bound on the mean total processing time.
+# The bound is checked every few simulated minutes from the stage durations already known and the
+# minimum service time of the stages still ahead of every passenger, so a pruned run never
+# discards a configuration that could have beaten the incumbent.
+
+import math
+
+from simpy.core import StopSimulation
+
+from Airport.processes import CheckIn, Security, PassportControl, Boarding, Disembarking
+
+# (passenger attribute, station class, international only) of the stages, in journey order
+STAGES = [
+    ('check_in_time', CheckIn, False),
+    ('security_time', Security, False),
+    ('passport_time', PassportControl, True),
+    ('boarding_time', Boarding, False),
+    ('disembark_time', Disembarking, False),
+]
+
+
+class BoundExceeded(Exception):
+    def __init__(self, lower_bound, bound, time):
+        """Raised when a run is stopped because its configuration cannot beat the incumbent.
+
+        Args:
+            lower_bound (float): Smallest mean total processing time the run could still end with
+            bound (float): Incumbent mean total processing time
+            time (float): Simulated time at which the run was stopped
+        """
+        super().__init__(f"Mean processing time of at least {lower_bound:.2f} at t={time}, "
+                         f"the incumbent is {bound:.2f}")
+        self.lower_bound = lower_bound
+        self.bound = bound
+        self.time = time
+
+
+class RunController:
+    def __init__(self, horizon=None, bound=None, interval=5):
+        """Initialize the controller of one run.
+
+        Args:
+            horizon (float, optional): End of the run, the run drains (ends when every passenger has
+                finished) if None. Passengers that have not finished at the horizon have missing durations.
+            bound (float, optional): Incumbent mean 'Total Processing Time', the run stops as soon as it
+                is certain to end with a larger mean
+            interval (float): Simulated minutes between two checks of the bound
+        """
+        self.horizon = horizon
+        self.bound = bound
+        self.interval = interval
+        self.passengers = []
+        self.finished = 0
+        self.finished_total = 0
+        # Passengers still on their way -> (passenger, (attribute, minimum service time) of the stages of
+        # their route, maximum duration of the route), and the sum of those maximum durations
+        self._active = {}
+        self._active_maximum = 0
+        self.stop_reason = None
+        self.lower_bound = None
+        self.stopped_at = None
+        self._stop = None
+
+    def watch(self, passengers):
+        """Add passengers to the run, each must call finish() with itself at the end of its journey."""
+        for passenger in passengers:
+            route = [(attribute, station) for attribute, station, international_only in STAGES
+                     if not international_only or passenger.flight_type == "International"]
+            stages = [(attribute, station.service_time_range[0]) for attribute, station in route]
+            maximum = sum(station.service_time_range[1] for _, station in route)
+            self._active[id(passenger)] = (passenger, stages, maximum)
+            self._active_maximum += maximum
+        self.passengers.extend(passengers)
+
+    @property
+    def drained(self):
+        return self.finished >= len(self.passengers)
+
+    def finish(self, passenger):
+        """A passenger has gone through every stage."""
+        _, stages, maximum = self._active.pop(id(passenger))
+        self._active_maximum -= maximum
+        self.finished_total += sum(getattr(passenger, attribute) for attribute, _ in stages)
+        self.finished += 1
+        if self.horizon is None and self.drained:
+            self._halt('drained')
+
+    def _halt(self, reason):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+            if self._stop is not None:
+                self._stop()
+
+    def minimum_mean(self, now):
+        """Lower bound of the mean total processing time the run will end with.
+
+        Finished passengers count with their total. Every other passenger that can still finish
+        counts with its known durations plus the minimum service time of the stages left; before
+        the horizon only passengers that finish count, so the lower bound only adds those that
+        bring the mean down.
+
+        Args:
+            now (float): Current simulated time
+
+        Returns:
+            float: The lower bound, inf if no passenger can finish
+        """
+        total = float(self.finished_total)
+        count = self.finished
+        candidates = []
+        for passenger, stages, _ in self._active.values():
+            known = 0
+            remaining = []
+            for attribute, minimum in stages:
+                duration = getattr(passenger, attribute)
+                if duration is None:
+                    remaining.append(minimum)
+                else:
+                    known += duration
+            # The first stage left may end right now, the next ones take at least their minimum service time
+            if self.horizon is None or now + sum(remaining) - remaining[0] < self.horizon:
+                candidates.append(known + sum(remaining))
+
+        if self.horizon is None:
+            return (total + sum(candidates)) / len(self.passengers) if self.passengers else math.inf
+        for candidate in sorted(candidates):
+            if count and candidate >= total / count:
+                break
+            total += candidate
+            count += 1
+        return total / count if count else math.inf
+
+    def check(self, now):
+        """Stop the run if it can no longer beat the bound."""
+        # Cheap upper limits of the lower bound first: the mean of the finished passengers at the horizon,
+        # their total plus the longest possible journey of the others when draining
+        if self.horizon is None:
+            if (self.finished_total + self._active_maximum) / len(self.passengers) <= self.bound:
+                return
+        elif self.finished and self.finished_total / self.finished <= self.bound:
+            return
+        self.lower_bound = self.minimum_mean(now)
+        if self.lower_bound > self.bound:
+            self.stopped_at = now
+            self._halt('bound')
+
+    def _result(self):
+        if self.stop_reason == 'bound':
+            raise BoundExceeded(self.lower_bound, self.bound, self.stopped_at)
+
+    def run_simpy(self, env):
+        """Run a SimPy environment until the end of the run.
+
+        Args:
+            env (simpy.Environment): Environment with the passenger processes, which call finish()
+
+        Raises:
+            BoundExceeded: If the run was stopped by the bound
+        """
+        stop = env.event()
+        stop.callbacks.append(StopSimulation.callback)
+        self._stop = stop.succeed
+        if self.horizon is None and self.drained:
+            return
+        if self.bound is not None:
+            env.process(self._watch_simpy(env))
+        env.run(until=self.horizon)
+        self._result()
+
+    def _watch_simpy(self, env):
+        while self.stop_reason is None and not self.drained:
+            yield env.timeout(self.interval)
+            self.check(env.now)
+
+    def run_kernel(self, kernel):
+        """Run the event kernel until the end of the run.
+
+        Args:
+            kernel (Kernel): Kernel with the passenger arrivals, whose airport calls finish()
+
+        Raises:
+            BoundExceeded: If the run was stopped by the bound
+        """
+        self._stop = kernel.stop
+        if self.horizon is None and self.drained:
+            return
+        if self.bound is not None:
+            kernel.schedule(self.interval, self._watch_kernel, kernel)
+        kernel.run(until=self.horizon)
+        self._result()
+
+    def _watch_kernel(self, kernel):
+        self.check(kernel.now)
+        if self.stop_reason is None and not self.drained:
+            kernel.schedule(self.interval, self._watch_kernel, kernel)
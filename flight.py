@@ -1,4 +1,7 @@
 class Flight:
+    __slots__ = ('flight_number', 'origin', 'destination', 'gate_number', 'passengers',
+                 'check_in_time', 'security_time', 'passport_time', 'boarding_time')
+
     def __init__(self, flight_number, origin, destination, gate_number, passengers):
         self.flight_number = flight_number
         self.origin = origin
@@ -8,16 +8,21 @@
 # This allows us to evaluate airport performance in a more human-like and interpretive way,
 # rather than using only strict numerical thresholds.
 # It supports visualization and can return a final satisfaction score scaled as a percentage (0 to 100).
+# Large numbers of rows are scored with evaluate_batch, which interpolates a satisfaction surface
+# precomputed once over the 0-10 universes instead of running the fuzzy inference for every row.
+# scikit-fuzzy is imported when the system is built and matplotlib only when it is plotted,
+# so importing the module is cheap.
+
+from __future__ import annotations
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
 import numpy as np
 
 
 class AirportSatisfaction:
     def __init__(self) -> None:
+        import skfuzzy as fuzz
+        from skfuzzy import control as ctrl
+
         # Define the fuzzy variables
         self.checkin_capacity: ctrl.Antecedent = ctrl.Antecedent(np.arange(0, 11, 1), 'checkin_capacity')
         self.waiting_time: ctrl.Antecedent = ctrl.Antecedent(np.arange(0, 11, 1), 'waiting_time')
@@ -48,17 +53,110 @@ class AirportSatisfaction:
         
         self.system_ctrl: ctrl.ControlSystem = ctrl.ControlSystem([self.rule1, self.rule2, self.rule3, self.rule4, self.rule5])
 
+        # Reusable simulator, LRU cache of exact evaluations and lazily computed satisfaction surface
+        self._simulator: ctrl.ControlSystemSimulation = ctrl.ControlSystemSimulation(self.system_ctrl)
+        self._cache: dict[tuple[float, float], float] = {}
+        self._cache_size: int = 4096
+        self._grid: np.ndarray | None = None
+        self._surface: np.ndarray | None = None
+
     def evaluate_satisfaction(self, capacity: float, time: float) -> float:
-        simulator: ctrl.ControlSystemSimulation = ctrl.ControlSystemSimulation(self.system_ctrl)
-        simulator.input['checkin_capacity'] = capacity
-        simulator.input['waiting_time'] = time
-        simulator.compute()
-        return simulator.output['passenger_satisfaction']*10
+        key = (float(capacity), float(time))
+        if key in self._cache:
+            # Move the entry to the end so the least recently used one is evicted first
+            self._cache[key] = self._cache.pop(key)
+            return self._cache[key]
+        self._simulator.input['checkin_capacity'] = capacity
+        self._simulator.input['waiting_time'] = time
+        self._simulator.compute()
+        satisfaction = self._simulator.output['passenger_satisfaction']*10
+        if len(self._cache) >= self._cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = satisfaction
+        return satisfaction
+
+    def satisfaction_surface(self, resolution: float = 0.25) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Precompute the satisfaction over a regular grid of both 0-10 universes.
+
+        Args:
+            resolution (float): Grid step, shared by capacity and waiting time.
+
+        Returns:
+            tuple: (grid points, surface) where surface[i, j] is the satisfaction (0-100)
+                for capacity grid[i] and waiting time grid[j].
+        """
+        if self._surface is None or not np.isclose(self._grid[1] - self._grid[0], resolution):
+            grid = np.linspace(0, 10, int(round(10 / resolution)) + 1)
+            surface = np.empty((len(grid), len(grid)))
+            for i, capacity in enumerate(grid):
+                for j, time in enumerate(grid):
+                    surface[i, j] = self.evaluate_satisfaction(capacity, time)
+            self._grid, self._surface = grid, surface
+        return self._grid, self._surface
+
+    def evaluate_batch(self, capacities: np.ndarray, times: np.ndarray, resolution: float = 0.25) -> np.ndarray:
+        """
+        Score many (capacity, waiting time) pairs at once by bilinear interpolation of the
+        precomputed satisfaction surface. Inputs are clipped to the 0-10 universes like the
+        fuzzy simulator does, and NaN inputs give NaN.
+
+        Args:
+            capacities (np.ndarray): Check-in capacities.
+            times (np.ndarray): Waiting times, broadcast against capacities.
+            resolution (float): Grid step of the surface.
+
+        Returns:
+            np.ndarray: Satisfaction (0-100) for every pair.
+        """
+        grid, surface = self.satisfaction_surface(resolution)
+        capacities, times = np.broadcast_arrays(np.asarray(capacities, dtype=float), np.asarray(times, dtype=float))
+        missing = np.isnan(capacities) | np.isnan(times)
+
+        step = grid[1] - grid[0]
+        x = np.clip(np.nan_to_num(capacities), 0, 10) / step
+        y = np.clip(np.nan_to_num(times), 0, 10) / step
+        i = np.minimum(x.astype(int), len(grid) - 2)
+        j = np.minimum(y.astype(int), len(grid) - 2)
+        dx = x - i
+        dy = y - j
+
+        satisfaction = (surface[i, j] * (1 - dx) * (1 - dy) + surface[i + 1, j] * dx * (1 - dy) +
+                        surface[i, j + 1] * (1 - dx) * dy + surface[i + 1, j + 1] * dx * dy)
+        return np.where(missing, np.nan, satisfaction)
 
     def visualize(self, plot: bool = True) -> None:
         if plot:
+            import matplotlib.pyplot as plt
+
             self.checkin_capacity.view()
             self.waiting_time.view()
             self.passenger_satisfaction.view()
             plt.savefig("Grafic.png")
             plt.show()
+
+
+def score_sweep(path: str, satisfaction: AirportSatisfaction | None = None):
+    """
+    Score every configuration of a sweep on passenger satisfaction.
+
+    Args:
+        path (str): CSV written by main.py (one row per passenger with 'Simulation Parameters').
+        satisfaction (AirportSatisfaction | None): fuzzy system to use, a new one if None.
+
+    Returns:
+        pd.DataFrame: one row per configuration with its check-in capacity, mean check-in duration,
+            mean total processing time and satisfaction (0-100), most satisfying first.
+    """
+    import pandas as pd
+    from sinks import parse_capacity
+
+    data = pd.read_csv(path, usecols=["Check-in Duration", "Total Processing Time", "Simulation Parameters"])
+    scores = data.groupby("Simulation Parameters", sort=False).agg(
+        **{"Check-in Duration": ("Check-in Duration", "mean"),
+           "Total Processing Time": ("Total Processing Time", "mean")}).reset_index()
+    scores.insert(1, "Check-in Capacity", [parse_capacity(parameters)[0] for parameters in scores["Simulation Parameters"]])
+    satisfaction = satisfaction or AirportSatisfaction()
+    scores["Satisfaction"] = satisfaction.evaluate_batch(scores["Check-in Capacity"].to_numpy(),
+                                                         scores["Check-in Duration"].to_numpy())
+    return scores.sort_values("Satisfaction", ascending=False, ignore_index=True)
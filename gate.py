@@ -1,4 +1,6 @@
 class Gate:
+    __slots__ = ('gate_number',)
+
     def __init__(self, gate_number):
         self.gate_number = gate_number 
 
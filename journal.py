@@ -0,0 +1,99 @@
+# journal.py
+#
+# This file defines the run journal used to checkpoint and resume long runs.
+# The journal is an SQLite file that records, for every run, which (capacity, seed) simulations
+# are finished and stored in the output (with their mean processing time), and a JSON state
+# such as the swarm of an interrupted pso_opt(). A restarted run reads the journal back,
+# skips the finished configurations and continues from the last saved state.
+# Every update is its own transaction, so a crash loses at most the work that was not recorded yet.
+
+import json
+import sqlite3
+
+from sinks import parse_capacity
+
+
+def run_key(**parameters):
+    """Identifier of a run, runs with the same parameters resume each other.
+
+    Args:
+        **parameters: Parameters that change the results of the run (engine, seed, output...)
+
+    Returns:
+        str: Canonical JSON text of the parameters
+    """
+    return json.dumps(parameters, sort_keys=True, default=str)
+
+
+class RunJournal:
+    def __init__(self, path):
+        """Open the journal, creating it if needed.
+
+        Args:
+            path (str): SQLite file of the journal
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS completed (run TEXT, capacity TEXT, seed INTEGER, value REAL, "
+                "PRIMARY KEY (run, capacity, seed))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS state (run TEXT PRIMARY KEY, value TEXT)")
+
+    def completed(self, run):
+        """Simulations of a run that are already finished.
+
+        Args:
+            run (str): Run identifier, see run_key
+
+        Returns:
+            dict: (capacity, seed) -> mean processing time of the simulation (inf if nobody finished)
+        """
+        rows = self.connection.execute("SELECT capacity, seed, value FROM completed WHERE run = ?", (run,))
+        return {(parse_capacity(capacity), seed): float('inf') if value is None else value
+                for capacity, seed, value in rows}
+
+    def mark_completed(self, run, simulations):
+        """Record finished simulations, once their results are safely stored.
+
+        Args:
+            run (str): Run identifier, see run_key
+            simulations (list[tuple]): (capacity, seed, mean processing time) of each simulation
+        """
+        if not simulations:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?)",
+                [(run, str(tuple(capacity)), seed, None if value == float('inf') else value)
+                 for capacity, seed, value in simulations])
+
+    def save_state(self, run, state):
+        """Replace the saved state of a run.
+
+        Args:
+            run (str): Run identifier, see run_key
+            state (dict): JSON-serializable state
+        """
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO state VALUES (?, ?)", (run, json.dumps(state)))
+
+    def load_state(self, run):
+        """Saved state of a run, None if there is none."""
+        row = self.connection.execute("SELECT value FROM state WHERE run = ?", (run,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def clear(self, run):
+        """Forget a run, its next start begins from scratch."""
+        with self.connection:
+            self.connection.execute("DELETE FROM completed WHERE run = ?", (run,))
+            self.connection.execute("DELETE FROM state WHERE run = ?", (run,))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,289 @@
+# kernel.py
+#
+# This file defines a minimal discrete-event kernel as an alternative engine to SimPy.
+# Every stage of the passenger pipeline is a multi-server FIFO station, so instead of a generator,
+# a Process and several Event objects per stage, the kernel keeps a heap of (time, sequence, callback)
+# entries with integer timestamps and stations that start, finish and hand passengers to the next
+# stage through plain callbacks. It runs the same model as the SimPy engine: same schedule, same
+# stations and service times (taken from processes.py) and the same per-station random streams.
+
+import heapq
+import time
+
+import simpy
+
+from Airport.processes import CheckIn, Security, PassportControl, Boarding, Disembarking
+from monitors import StationMonitor
+
+# (station name, station class, index of its capacity in the capacity tuple, passenger attribute, international only)
+STAGES = [
+    ('check_in', CheckIn, 0, 'check_in_time', False),
+    ('security', Security, 1, 'security_time', False),
+    ('passport', PassportControl, 2, 'passport_time', True),
+    ('boarding', Boarding, 4, 'boarding_time', False),
+    ('disembarking', Disembarking, 4, 'disembark_time', False),
+]
+
+
+class Kernel:
+    def __init__(self):
+        """Initialize an empty event heap at time 0."""
+        self.now = 0
+        self.events = 0
+        self._queue = []
+        self._sequence = 0
+
+    def schedule(self, delay, callback, argument=None):
+        """Schedule a callback after a delay. Callbacks at the same time run in scheduling order.
+
+        Args:
+            delay (int): Delay from the current time
+            callback (callable): Called with `argument` when the event is processed
+            argument (optional): Argument of the callback
+        """
+        self._sequence += 1
+        heapq.heappush(self._queue, (self.now + delay, self._sequence, callback, argument))
+
+    def run(self, until=None):
+        """Process events in time order.
+
+        Args:
+            until (int, optional): Stop before processing events at or after this time
+        """
+        queue = self._queue
+        pop = heapq.heappop
+        while queue and (until is None or queue[0][0] < until):
+            self.now, _, callback, argument = pop(queue)
+            self.events += 1
+            callback(argument)
+        if until is not None:
+            self.now = until
+
+    def stop(self):
+        """Drop the pending events, run() returns after the current event."""
+        self._queue.clear()
+
+
+class CountingEnvironment(simpy.Environment):
+    """simpy.Environment that counts the events it processes in `events`, as Kernel does.
+
+    The event ids of SimPy count the events that were scheduled, including those still pending when
+    the run stops, so they cannot be compared with the events of the kernel.
+    """
+
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.events = 0
+
+    def step(self):
+        super().step()
+        self.events += 1
+
+
+class Station:
+    def __init__(self, kernel, capacity, service_time_range, rng, attribute, monitor=None):
+        """Multi-server FIFO station.
+
+        Args:
+            kernel (Kernel): Event kernel
+            capacity (int): Number of servers
+            service_time_range (tuple): Inclusive range of the integer service times
+            rng (random.Random): Generator of the service times
+            attribute (str): Passenger attribute receiving the service time
+            monitor (StationMonitor, optional): Accumulates queue, utilization and wait statistics
+        """
+        self.kernel = kernel
+        self.monitor = monitor
+        self.capacity = capacity
+        self.low, self.high = service_time_range
+        self.rng = rng
+        self.attribute = attribute
+        self.busy = 0
+        self.queue = []
+        self._head = 0
+
+    def request(self, job):
+        """A job (passenger, continuation) arrives at the station.
+
+        Args:
+            job (tuple): (passenger, callable called with the passenger when the service ends, arrival time)
+        """
+        if self.monitor is not None:
+            self.monitor.arrive(self.kernel.now)
+        self.queue.append(job)
+        self._grant()
+
+    def _grant(self, _=None):
+        # Same order as a simpy.Resource: waiting jobs get the free servers in FIFO order, and the
+        # service of a granted job starts in a separate event at the current time
+        queue = self.queue
+        while self.busy < self.capacity and self._head < len(queue):
+            job = queue[self._head]
+            queue[self._head] = None
+            self._head += 1
+            if self._head > 1024 and self._head * 2 > len(queue):
+                del queue[:self._head]
+                self._head = 0
+            self.busy += 1
+            self.kernel.schedule(0, self._start, job)
+
+    def _start(self, job):
+        if self.monitor is not None:
+            self.monitor.start(self.kernel.now, self.kernel.now - job[2])
+        duration = self.rng.randint(self.low, self.high)
+        self.kernel.schedule(duration, self._finish, (job, duration))
+
+    def _finish(self, event):
+        (passenger, continuation, _), duration = event
+        setattr(passenger, self.attribute, duration)
+        self.busy -= 1
+        if self.monitor is not None:
+            self.monitor.finish(self.kernel.now)
+        # Like the Release event of simpy, the freed server is handed over in a later event
+        self.kernel.schedule(0, self._grant)
+        continuation(passenger)
+
+
+class KernelPassenger:
+    # Same attributes as Passenger that are read when collecting results
+    __slots__ = ('name', 'flight_type', 'gate', 'check_in_time', 'security_time', 'passport_time',
+                 'boarding_time', 'disembark_time', 'stage')
+
+    def __init__(self, name, flight_type, gate):
+        self.name = name
+        self.flight_type = flight_type
+        self.gate = gate
+        self.check_in_time = None
+        self.security_time = None
+        self.passport_time = None
+        self.boarding_time = None
+        self.disembark_time = None
+        self.stage = 0
+
+
+class KernelAirport:
+    def __init__(self, kernel, capacity, streams, monitor=False, on_finish=None):
+        """Stations of the airport on the kernel, drawing from the run's per-station streams.
+
+        Args:
+            kernel (Kernel): Event kernel
+            capacity (tuple): contains the airport resource capacities.
+            streams (RandomStreams): Random streams of the run
+            monitor (bool): Attach a StationMonitor to every station
+            on_finish (callable, optional): Called with every passenger at the end of its journey
+        """
+        self.kernel = kernel
+        self.on_finish = on_finish
+        self.stations = {name: Station(kernel, capacity[index], station.service_time_range, streams.stream(name),
+                                       attribute, StationMonitor(name, capacity[index]) if monitor else None)
+                         for name, station, index, attribute, _ in STAGES}
+        self.route = [(self.stations[name], international_only) for name, _, _, _, international_only in STAGES]
+
+    def station_statistics(self):
+        """Returns the statistics of the monitored stations up to the current time, as Airport.station_statistics."""
+        return [station.monitor.summary(self.kernel.now) for station in self.stations.values()
+                if station.monitor is not None]
+
+    def arrive(self, passenger):
+        """Start the journey of a passenger at the current time."""
+        self._next(passenger)
+
+    def _next(self, passenger):
+        # Send the passenger to its next station, skipping passport control for domestic flights
+        route = self.route
+        while passenger.stage < len(route):
+            station, international_only = route[passenger.stage]
+            passenger.stage += 1
+            if international_only and passenger.flight_type != "International":
+                continue
+            station.request((passenger, self._next, self.kernel.now))
+            return
+        if self.on_finish is not None:
+            self.on_finish(passenger)
+
+
+def run_kernel_simulation(capacity, schedule, streams, horizon=None, monitor=False, controller=None):
+    """Runs the passenger pipeline of a schedule on the kernel.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        schedule (list[dict]): Flights as returned by generate_schedule
+        streams (RandomStreams): Random streams of the run
+        horizon (int, optional): End of the simulation, ignored when a controller is given
+        monitor (bool): Attach a StationMonitor to every station
+        controller (RunController, optional): Decides when the run ends
+
+    Returns:
+        tuple: (list of (flight dict, passengers), kernel, airport) after the run
+
+    Raises:
+        BoundExceeded: If the controller stopped the run on its bound
+    """
+    kernel = Kernel()
+    airport = KernelAirport(kernel, capacity, streams, monitor, controller.finish if controller else None)
+    flights = []
+    for flight in schedule:
+        passengers = []
+        for passenger_id, arrival_time in flight['Passengers']:
+            passenger = KernelPassenger(passenger_id, flight['Flight Type'], flight['Gate'])
+            kernel.schedule(arrival_time, airport.arrive, passenger)
+            passengers.append(passenger)
+        flights.append((flight, passengers))
+    if controller is None:
+        kernel.run(until=horizon)
+    else:
+        for _, passengers in flights:
+            controller.watch(passengers)
+        controller.run_kernel(kernel)
+    return flights, kernel, airport
+
+
+def benchmark_engines(capacity=(4, 4, 4, 4, 25), num_flights=50, passengers_per_flight=200, seed=0, repeat=3):
+    """Measures events per second of the kernel and of simpy.Environment on the same model.
+
+    Both engines run the same schedule to completion (no horizon). Both count the events they
+    process, see CountingEnvironment.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        num_flights (int): Number of flights of the schedule
+        passengers_per_flight (int): Passengers on each flight
+        seed (int): Seed of the run
+        repeat (int): Runs of each engine, the fastest is reported
+
+    Returns:
+        dict: per engine, 'events', 'seconds' and 'events_per_second'
+    """
+    from airport_simulation import generate_schedule
+    from Airport.airport import Airport
+    from Passenger.passenger import Passenger
+    from streams import RandomStreams
+
+    def simpy_run():
+        streams = RandomStreams(seed)
+        schedule = generate_schedule(capacity, streams.stream('schedule'), num_flights, passengers_per_flight)
+        env = CountingEnvironment()
+        airport = Airport.from_capacity(env, capacity, streams=streams)
+        for flight in schedule:
+            for passenger_id, arrival_time in flight['Passengers']:
+                Passenger(env, passenger_id, airport, flight['Flight Type'], flight['Gate'], arrival_time)
+        env.run()
+        return env.events
+
+    def kernel_run():
+        streams = RandomStreams(seed)
+        schedule = generate_schedule(capacity, streams.stream('schedule'), num_flights, passengers_per_flight)
+        _, kernel, _ = run_kernel_simulation(capacity, schedule, streams)
+        return kernel.events
+
+    report = {}
+    for name, run in [('simpy', simpy_run), ('kernel', kernel_run)]:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            events = run()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        report[name] = {'events': events, 'seconds': best, 'events_per_second': events / best}
+    report['speedup'] = report['simpy']['seconds'] / report['kernel']['seconds']
+    return report
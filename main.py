@@ -6,35 +6,57 @@
 # Ingeniería Informática y ADE
 # CUNEF Universidad
 
-import simpy
-import pandas as pd
-from tqdm.contrib.itertools import product
-from tqdm import tqdm
-import contextlib
-import io
-
-from Simulation.airport_simulation import run_simulation
-
-def silent(func):
-    def wrapper(*args, **kwargs):
-        with contextlib.redirect_stdout(io.StringIO()):
-            return func(*args, **kwargs)
-    return wrapper
-
-@silent
-def run_silent_simulation(env, capacity):
-    """Run simulation with cartesian product of the available capacities.
-    
-    Args:
-        env (simpy.Environment): simulation environment
-        capacity (tuple): contains the airport resource capacities.
-        
-    Returns:
-        list: Simulation results data
-    """
-    return run_simulation(env, capacity)
+import argparse
+import os
+from itertools import product
+
+from sinks import open_sink, CSVSink, SINKS, DEFAULT_OUTPUTS
+
+def add_arguments(parser):
+    # Options of the sweep, shared with the `sweep` command of cli.py
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: number of cores)")
+    parser.add_argument("--engine", choices=["simpy", "kernel", "numpy"], default="simpy",
+                        help="simulation engine (default: simpy)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed shared by every configuration (default: 42)")
+    parser.add_argument("--format", choices=list(SINKS), default="csv",
+                        help="output format (default: csv)")
+    parser.add_argument("--output", default=None,
+                        help="output path (default: ./passenger_flight_data with the format's extension)")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="rows buffered before they are written (default: 10000)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="successive halving search instead of the exhaustive grid")
+    parser.add_argument("--eta", type=int, default=3,
+                        help="adaptive search: 1/eta of the configurations survive each round (default: 3)")
+    parser.add_argument("--max-replications", type=int, default=9,
+                        help="adaptive search: replications of the final configurations, "
+                             "--target-half-width: replication budget of every configuration (default: 9)")
+    parser.add_argument("--target-half-width", type=float, default=None,
+                        help="replicate every configuration until the 95%% confidence interval on its mean "
+                             "processing time is narrower than this many minutes")
+    parser.add_argument("--station-stats", default=None,
+                        help="also write per-station queue, utilization and wait statistics to this CSV")
+    parser.add_argument("--journal", default=None,
+                        help="SQLite journal of the finished configurations, an interrupted run resumes from it")
+    parser.add_argument("--drain", action="store_true",
+                        help="run every configuration until all passengers finish instead of a fixed horizon, "
+                             "so no duration is missing")
+    parser.add_argument("--aggregates", default=None,
+                        help="also keep per-configuration and per-stage aggregates in this SQLite store")
+    return parser
+
+def parse_args(argv=None):
+    return add_arguments(argparse.ArgumentParser(description="Airport capacity sweep")).parse_args(argv)
+
+def main(args):
+    # Imported here so that building the parser stays cheap
+    from sweep import run_sweep, AdaptiveSweep, ReplicatedSweep, mean_processing_time
+    from journal import RunJournal, run_key
+    from aggregates import AggregateStore
+    from airport_simulation import SIMULATION_TIME
 
-if __name__ == '__main__':
     # Setting the capacities parameter's range 
     check_in_capacities = [1, 2, 3, 4]
     security_capacities = [1, 2, 3, 4]
@@ -42,19 +64,115 @@ if __name__ == '__main__':
     runways_capacities = [1, 2, 3, 4]
     gates_capacities = [5, 10, 20, 25]
     
-    all_data = []
-    total_simulations = len(check_in_capacities) * len(security_capacities) * \
-                       len(passport_capacities) * len(runways_capacities) * len(gates_capacities)
-
-    # Main progress bar for simulations
-    for capacity in tqdm(product(check_in_capacities, security_capacities, 
-                               passport_capacities, runways_capacities, gates_capacities),
-                        total=total_simulations):
-        env = simpy.Environment()
-        simulation_data = run_silent_simulation(env, capacity)
-        all_data.extend(simulation_data)
-        
-        # Save accumulated results
-        pd.DataFrame(all_data).to_csv('./passenger_flight_data.csv', index=False)
-
-    print("\nAll simulations completed. Data saved to passenger_flight_data.csv")
\ No newline at end of file
+    output = args.output or DEFAULT_OUTPUTS[args.format]
+    capacities = list(product(check_in_capacities, security_capacities,
+                              passport_capacities, runways_capacities, gates_capacities))
+
+    if args.journal and args.format == "parquet":
+        # Resuming appends to the output, a single Parquet file cannot be appended to
+        raise SystemExit("--journal is not supported with --format parquet, use csv or parquet-partitioned")
+    # Finished configurations of an interrupted run with the same parameters are skipped
+    journal = RunJournal(args.journal) if args.journal else None
+    # Drained runs get their own key, the key of a run with the default horizon is unchanged
+    horizon = None if args.drain else SIMULATION_TIME
+    replicated = args.target_half_width is not None
+    key = run_key(engine=args.engine, seed=args.seed, output=os.path.abspath(output), format=args.format,
+                  adaptive=args.adaptive and (args.eta, args.max_replications),
+                  **({'horizon': None} if args.drain else {}),
+                  **({'replicated': (args.target_half_width, args.max_replications)} if replicated else {}))
+    completed = journal.completed(key) if journal else {}
+    if completed:
+        print(f"Resuming from {args.journal}: {len(completed)} simulations already done")
+
+    monitor = args.station_stats is not None
+    if monitor and args.engine == "numpy":
+        # The vectorized engine has no per-event timeline to monitor
+        raise SystemExit("--station-stats is not supported with --engine numpy")
+    if args.adaptive and replicated:
+        raise SystemExit("--target-half-width is not supported with --adaptive")
+    if args.adaptive or replicated:
+        if monitor:
+            raise SystemExit("--station-stats is not supported with --adaptive or --target-half-width")
+    if args.adaptive:
+        sweep = AdaptiveSweep(capacities, eta=args.eta, max_replications=args.max_replications,
+                              workers=args.workers, engine=args.engine, seed=args.seed, columnar=True,
+                              completed=completed, horizon=horizon)
+    elif replicated:
+        sweep = ReplicatedSweep(capacities, target_half_width=args.target_half_width,
+                                max_replications=args.max_replications, workers=args.workers, engine=args.engine,
+                                seed=args.seed, columnar=True, completed=completed, horizon=horizon)
+    else:
+        remaining = [capacity for capacity in capacities if (capacity, args.seed) not in completed]
+        sweep = run_sweep(remaining, workers=args.workers, engine=args.engine, seed=args.seed,
+                          columnar=True, monitor=monitor, horizon=horizon)
+
+    # Main progress bar for simulations, results are appended to the output in batches.
+    # Simulations are only journaled once the sink has written their rows to the output.
+    append = bool(completed)
+    stats_sink = CSVSink(args.station_stats, batch_size=args.batch_size, append=append) if monitor else None
+    aggregates = AggregateStore(args.aggregates) if args.aggregates else None
+    if aggregates and not append:
+        aggregates.clear()
+    unrecorded = []
+    # Set once the buffered rows of the unrecorded simulations are written to the outputs
+    written = False
+    try:
+        sink = open_sink(output, args.format, batch_size=args.batch_size, append=append)
+        try:
+            for capacity, simulation_data in sweep:
+                if monitor:
+                    simulation_data, station_stats = simulation_data
+                    stats_sink.write(station_stats)
+                sink.write_columns(simulation_data)
+                if aggregates:
+                    aggregates.write_columns(simulation_data)
+                seed = sweep.current[1] if args.adaptive or replicated else args.seed
+                unrecorded.append((capacity, seed, mean_processing_time(simulation_data, columnar=True)))
+                if not sink.buffered:
+                    if aggregates:
+                        aggregates.flush()
+                    if journal:
+                        if monitor:
+                            stats_sink.flush()
+                        journal.mark_completed(key, unrecorded)
+                        unrecorded = []
+        finally:
+            # Closing the sink writes the buffered rows, also when the run is interrupted
+            sink.close()
+            if monitor:
+                stats_sink.flush()
+            written = True
+    finally:
+        if monitor:
+            stats_sink.close()
+        if aggregates:
+            if journal and not written:
+                # The unrecorded simulations are run again on resume, their aggregates would be counted twice
+                aggregates.discard()
+            aggregates.close()
+        if journal:
+            # Simulations whose rows may not have been written are run again on resume
+            if written:
+                journal.mark_completed(key, unrecorded)
+            journal.close()
+    if monitor:
+        print(f"Station statistics saved to {args.station_stats}")
+    if aggregates:
+        print(f"Aggregates saved to {args.aggregates}")
+
+    print(f"\nAll simulations completed. Data saved to {output}")
+    if args.adaptive:
+        print(f"{sweep.runs} runs instead of {len(capacities) * args.max_replications} for the full grid. "
+              f"Best configurations:")
+        for capacity, score, replications in sweep.ranking()[:5]:
+            print(f"  {capacity}: {score:.2f} min over {replications} replications")
+    if replicated:
+        converged = sum(summary['converged'] for summary in sweep.summaries.values())
+        print(f"{sweep.runs} runs, {converged} of {len(capacities)} configurations reached the target "
+              f"half-width. Best configurations:")
+        for summary in sweep.ranking()[:5]:
+            print(f"  {summary['capacity']}: {summary['mean']:.2f} ± {summary['half_width']:.2f} min over "
+                  f"{summary['replications']} replications")
+
+if __name__ == '__main__':
+    main(parse_args())
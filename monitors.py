@@ -0,0 +1,116 @@
+# monitors.py
+#
+# This file defines the station monitors of the airport simulation.
+# A monitor is attached to a station (check-in, security, passport control, boarding, disembarking)
+# and records, in fixed-size accumulators instead of per-event lists, the time-weighted queue length,
+# the server utilization and the distribution of the waiting time in the queue (a histogram with
+# fixed bins plus an overflow bin). The queueing delay is what sizes the counters, and it is not
+# part of the per-passenger service durations. Summaries are exported per configuration.
+
+import array
+import math
+
+
+class StationMonitor:
+    def __init__(self, name, capacity, bin_width=1, bins=60):
+        """Initialize the accumulators of a station.
+
+        Args:
+            name (str): Station name
+            capacity (int): Number of servers of the station
+            bin_width (float): Width of the wait-time histogram bins, in minutes
+            bins (int): Number of bins, waits beyond bins * bin_width go to an overflow bin
+        """
+        self.name = name
+        self.capacity = capacity
+        self.bin_width = bin_width
+        self.histogram = array.array('q', [0] * (bins + 1))
+        self.arrivals = 0
+        self.served = 0
+        self.wait_sum = 0.0
+        self.wait_squares = 0.0
+        self.wait_max = 0.0
+        self.queue_length = 0
+        self.queue_max = 0
+        self.busy = 0
+        self.queue_area = 0.0
+        self.busy_area = 0.0
+        self.last_time = 0.0
+
+    def _advance(self, now):
+        elapsed = now - self.last_time
+        if elapsed:
+            self.queue_area += self.queue_length * elapsed
+            self.busy_area += self.busy * elapsed
+            self.last_time = now
+
+    def arrive(self, now):
+        """A passenger joins the queue of the station."""
+        self._advance(now)
+        self.arrivals += 1
+        self.queue_length += 1
+        if self.queue_length > self.queue_max:
+            self.queue_max = self.queue_length
+
+    def start(self, now, wait):
+        """A passenger leaves the queue and starts service after waiting `wait` minutes."""
+        self._advance(now)
+        self.queue_length -= 1
+        self.busy += 1
+        self.wait_sum += wait
+        self.wait_squares += wait * wait
+        if wait > self.wait_max:
+            self.wait_max = wait
+        self.histogram[min(int(wait / self.bin_width), len(self.histogram) - 1)] += 1
+
+    def finish(self, now):
+        """A passenger ends service and releases its server."""
+        self._advance(now)
+        self.busy -= 1
+        self.served += 1
+
+    def wait_quantile(self, q):
+        """Lower edge of the histogram bin holding the q-quantile of the wait, inf if in the overflow bin.
+
+        The waits are whole minutes, so with the default bin_width of 1 this is the exact quantile.
+        """
+        started = sum(self.histogram)
+        if not started:
+            return None
+        target = q * started
+        cumulative = 0
+        for i, count in enumerate(self.histogram):
+            cumulative += count
+            if cumulative >= target:
+                return i * self.bin_width if i < len(self.histogram) - 1 else math.inf
+        return math.inf
+
+    def summary(self, now):
+        """Statistics of the station from time 0 to `now`.
+
+        Args:
+            now (float): End of the observation period
+
+        Returns:
+            dict: Station statistics
+        """
+        self._advance(now)
+        started = sum(self.histogram)
+        mean_wait = self.wait_sum / started if started else None
+        return {
+            'Station': self.name,
+            'Capacity': self.capacity,
+            'Arrivals': self.arrivals,
+            'Served': self.served,
+            'Mean Queue Length': self.queue_area / now if now else 0.0,
+            'Max Queue Length': self.queue_max,
+            'Utilization': self.busy_area / (self.capacity * now) if now else 0.0,
+            'Mean Wait': mean_wait,
+            'Wait Std': (math.sqrt(max(self.wait_squares / started - mean_wait ** 2, 0.0))
+                         if started else None),
+            'Max Wait': self.wait_max if started else None,
+            'Wait P50': self.wait_quantile(0.5),
+            'Wait P90': self.wait_quantile(0.9),
+            'Wait P95': self.wait_quantile(0.95),
+            'Wait Histogram': ' '.join(str(count) for count in self.histogram),
+        }
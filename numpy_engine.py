@@ -0,0 +1,205 @@
+# numpy_engine.py
+#
+# This file defines a vectorized engine for the passenger pipeline of the airport simulation.
+# Check-in -> security -> passport control -> boarding -> disembarking is a feed-forward chain of
+# multi-server FIFO queues with integer service times, so the departure times of every station
+# can be computed with array recursions (Lindley-style) instead of stepping SimPy generators
+# one event at a time. Whole batches of passengers and replications are computed at once.
+# The engine reproduces the SimPy model statistically, not draw by draw: cross_check compares both.
+
+import heapq
+import random
+import numpy as np
+from Airport.processes import CheckIn, Security, PassportControl, Boarding, Disembarking
+from records import ResultColumns, DURATION_COLUMNS
+
+# (result column, station class, index of its capacity in the capacity tuple, international only)
+STAGES = [
+    ('Check-in Duration', CheckIn, 0, False),
+    ('Security Duration', Security, 1, False),
+    ('Passport Duration', PassportControl, 2, True),
+    ('Boarding Duration', Boarding, 4, False),
+    ('Disembark Duration', Disembarking, 4, False),
+]
+
+def station_departures(ready, service, servers, active):
+    """Computes the departure times of a multi-server FIFO station.
+
+    Passengers are served in order of their ready time (ties by passenger index). With a
+    single server this is the Lindley recursion D_k = max(A_k, D_{k-1}) + S_k, computed in
+    closed form with cumulative sums; with several servers every passenger takes the server
+    that becomes free first, iterating over queue positions and vectorizing over replications
+    (or over a heap of free times when there is a single replication).
+
+    Args:
+        ready (np.ndarray): (replications, passengers) times at which passengers reach the station
+        service (np.ndarray): (replications, passengers) service times
+        servers (int): Number of servers of the station
+        active (np.ndarray): (replications, passengers) mask of passengers that use the station
+
+    Returns:
+        np.ndarray: (replications, passengers) departure times, equal to `ready` for inactive passengers
+    """
+    order = np.argsort(ready, axis=1, kind='stable')
+    arrivals = np.take_along_axis(ready, order, axis=1)
+    service = np.where(active, service, 0)
+    service = np.take_along_axis(service, order, axis=1)
+    is_active = np.take_along_axis(active, order, axis=1)
+
+    if servers == 1:
+        cumulative = np.cumsum(service, axis=1)
+        previous = cumulative - service
+        offset = np.where(is_active, arrivals - previous, -np.inf)
+        departures = cumulative + np.maximum.accumulate(offset, axis=1)
+    elif ready.shape[0] == 1:
+        # A single replication: a heap of server free times is cheaper than per-position array operations
+        free = [0.0] * servers
+        departures = np.empty(ready.shape)
+        for k, (arrival, duration, used) in enumerate(zip(arrivals[0].tolist(), service[0].tolist(),
+                                                           is_active[0].tolist())):
+            if used:
+                end = max(arrival, free[0]) + duration
+                heapq.heapreplace(free, end)
+            else:
+                end = arrival
+            departures[0, k] = end
+    else:
+        replications, passengers = ready.shape
+        rows = np.arange(replications)
+        free = np.zeros((replications, servers))
+        departures = np.empty((replications, passengers))
+        for k in range(passengers):
+            server = np.argmin(free, axis=1)
+            start = np.maximum(arrivals[:, k], free[rows, server])
+            end = start + service[:, k]
+            free[rows, server] = np.where(is_active[:, k], end, free[rows, server])
+            departures[:, k] = end
+
+    departures = np.where(is_active, departures, arrivals)
+    result = np.empty_like(departures)
+    np.put_along_axis(result, order, departures, axis=1)
+    return result
+
+def simulate_pipeline(capacity, arrivals, international, rng, horizon=None):
+    """Simulates the passenger pipeline for a batch of replications.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        arrivals (np.ndarray): (replications, passengers) arrival times at the airport
+        international (np.ndarray): (replications, passengers) mask of international passengers
+        rng (np.random.Generator): Random generator for the service times
+        horizon (float, optional): End of the simulation; stages finishing at or after it are not recorded
+
+    Returns:
+        dict: result column -> (replications, passengers) float array of durations, NaN when the
+            stage was skipped or did not finish, plus 'Total Processing Time' (NaN if unfinished).
+    """
+    arrivals = np.asarray(arrivals, dtype=float)
+    international = np.broadcast_to(np.asarray(international, dtype=bool), arrivals.shape)
+    everyone = np.ones(arrivals.shape, dtype=bool)
+
+    durations = {}
+    finished = everyone.copy()
+    total = np.zeros(arrivals.shape)
+    ready = arrivals
+    for column, station, index, international_only in STAGES:
+        active = international if international_only else everyone
+        low, high = station.service_time_range
+        service = rng.integers(low, high + 1, size=arrivals.shape)
+        departures = station_departures(ready, service, capacity[index], active)
+
+        done = active if horizon is None else active & (departures < horizon)
+        durations[column] = np.where(done, service, np.nan)
+        finished &= done | ~active
+        total += np.where(active, service, 0)
+        ready = departures
+
+    durations['Total Processing Time'] = np.where(finished, total, np.nan)
+    return durations
+
+def schedule_arrays(schedule):
+    """Flattens a schedule from generate_schedule into passenger arrays.
+
+    Args:
+        schedule (list[dict]): Flights as returned by generate_schedule
+
+    Returns:
+        tuple: (arrival times, international mask) as 1-D arrays in schedule order
+    """
+    arrivals = [arrival for flight in schedule for _, arrival in flight['Passengers']]
+    international = [flight['Flight Type'] == "International"
+                     for flight in schedule for _ in flight['Passengers']]
+    return np.array(arrivals, dtype=float), np.array(international, dtype=bool)
+
+def run_numpy_simulation(capacity, schedule, horizon=None, rng=None, columnar=False):
+    """Runs one simulation with the vectorized engine, returning the same rows as run_simulation.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        schedule (list[dict]): Flights as returned by generate_schedule
+        horizon (float, optional): End of the simulation
+        rng (np.random.Generator, optional): Random generator for the service times
+        columnar (bool): return a ResultColumns buffer instead of a list of dicts
+
+    Returns:
+        list[dict] | ResultColumns: One row per passenger, with the columns of run_simulation
+    """
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    arrivals, international = schedule_arrays(schedule)
+    durations = simulate_pipeline(capacity, arrivals[np.newaxis], international[np.newaxis], rng, horizon)
+    values = [[None if np.isnan(value) else int(value) for value in durations[column][0]]
+              for column in DURATION_COLUMNS]
+
+    columns = ResultColumns()
+    parameters = str(capacity)
+    i = 0
+    for flight in schedule:
+        texts = (flight['Flight ID'], flight['Plane Type'], flight['Flight Type'], flight['Gate'])
+        for passenger_id, _ in flight['Passengers']:
+            columns.append((passenger_id,) + texts, tuple(column[i] for column in values), parameters)
+            i += 1
+
+    return columns if columnar else list(columns.rows())
+
+def cross_check(capacity, replications=200, seed=0):
+    """Compares the numpy engine against the SimPy engine on the same capacity.
+
+    Both engines are run `replications` times on independent seeds and the mean
+    'Total Processing Time' of finished passengers and the fraction of finished passengers are
+    compared with a two-sample z statistic on the per-replication values.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        replications (int): Number of replications of each engine
+        seed (int): Seed of the first replication
+
+    Returns:
+        dict: per metric, the mean of each engine and the z statistic of their difference
+    """
+    import simpy
+    from airport_simulation import run_simulation
+
+    samples = {'simpy': {'mean': [], 'finished': []}, 'numpy': {'mean': [], 'finished': []}}
+    for replication in range(replications):
+        runs = {
+            'simpy': run_simulation(simpy.Environment(), capacity, seed=seed + 2 * replication),
+            'numpy': run_simulation(None, capacity, engine="numpy", seed=seed + 2 * replication + 1),
+        }
+        for engine, rows in runs.items():
+            totals = [row['Total Processing Time'] for row in rows if row['Total Processing Time'] is not None]
+            samples[engine]['mean'].append(np.mean(totals) if totals else np.nan)
+            samples[engine]['finished'].append(len(totals) / len(rows))
+
+    report = {}
+    for metric in ['mean', 'finished']:
+        a = np.array(samples['simpy'][metric])
+        b = np.array(samples['numpy'][metric])
+        a, b = a[~np.isnan(a)], b[~np.isnan(b)]
+        standard_error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+        report[metric] = {
+            'simpy': a.mean(),
+            'numpy': b.mean(),
+            'z': (a.mean() - b.mean()) / standard_error if standard_error > 0 else 0.0,
+        }
+    return report
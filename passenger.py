@@ -1,14 +1,20 @@
 import simpy
-from Airport.processes import CheckIn, Security, PassportControl, Boarding, Disembarking
+from tracing import DEBUG
 
 class Passenger:
-    def __init__(self, env, name, airport, flight_type, gate, arrival_time, capacity):
+    # Fixed attributes instead of a per-instance dict, there can be many passengers alive at once
+    __slots__ = ('env', 'name', 'airport', 'flight_type', 'gate', 'arrival_time', 'on_finish',
+                 'check_in_time', 'security_time', 'passport_time', 'boarding_time', 'disembark_time')
+
+    def __init__(self, env, name, airport, flight_type, gate, arrival_time, on_finish=None):
         self.env = env
         self.name = name
         self.airport = airport
         self.flight_type = flight_type
         self.gate = gate
         self.arrival_time = arrival_time
+        # Optional callback called with the passenger once the journey is complete
+        self.on_finish = on_finish
 
         # Initialize time attributes for analysis
         self.check_in_time = None
@@ -18,9 +24,9 @@ class Passenger:
         self.disembark_time = None
 
         # Start the passenger process
-        env.process(self.process_passenger(capacity))  
+        env.process(self.process_passenger())  
 
-    def process_passenger(self, capacity):
+    def process_passenger(self):
         """Simulate the complete passenger journey through the airport.
         
         Process flow:
@@ -31,33 +37,29 @@ class Passenger:
         5. Boarding
         6. Disembarking
 
-        Args:
-            capacity (tuple): Airport resource capacities
+        Every stage goes through the airport's shared, capacity-limited station,
+        so passengers queue behind each other when all counters are busy.
 
         Yields:
-            simpy.events.Process: Sequence of airport processes
+            simpy.events.Event: Events of the airport processes
         """
         yield self.env.timeout(self.arrival_time) 
-        print(f'[t={self.env.now}] {self.name} arrives at the airport.')
+        tracer = self.airport.tracer
+        if tracer.enabled:
+            tracer.emit(self.env.now, 'arrive', self.name, level=DEBUG)
+
+        stations = self.airport.stations
 
-        # Extract specific capacities from tuple
-        check_in_capacity = capacity[0]
-        security_capacity = capacity[1]
-        passport_capacity = capacity[2] if len(capacity) > 2 else None  
-        boarding_capacity = capacity[4]
+        yield from stations['check_in'].process(self)
 
-        check_in_process = CheckIn(self.env, check_in_capacity)  
-        yield self.env.process(check_in_process.process(self))
+        yield from stations['security'].process(self)
 
-        security_process = Security(self.env, security_capacity)  
-        yield self.env.process(security_process.process(self))
+        if self.flight_type == "International":
+            yield from stations['passport'].process(self)
 
-        if self.flight_type == "International" and passport_capacity is not None:
-            passport_process = PassportControl(self.env, passport_capacity)  
-            yield self.env.process(passport_process.process(self))  
+        yield from stations['boarding'].process(self, self.gate)
 
-        boarding_process = Boarding(self.env, boarding_capacity)  
-        yield self.env.process(boarding_process.process(self, self.gate))
+        yield from stations['disembarking'].process(self)
 
-        disembarking_process = Disembarking(self.env, boarding_capacity)  
-        yield self.env.process(disembarking_process.process(self))
\ No newline at end of file
+        if self.on_finish is not None:
+            self.on_finish(self)
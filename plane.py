@@ -1,4 +1,6 @@
 class Plane:
+    __slots__ = ('flight_number', 'plane_type', 'passengers', 'flight_type', 'gate', 'boarding_start', 'status')
+
     def __init__(self, flight_number, plane_type, passengers=None, flight_type=None, gate=None, boarding_start=None):
         self.flight_number = flight_number
         self.plane_type = plane_type
@@ -1,10 +1,16 @@
 import simpy
 import random
+from tracing import NULL_TRACER
 
 class CheckIn:
-    def __init__(self, env, capacity):
-        self
+    # Range of the service time in minutes (inclusive)
+    service_time_range = (2, 8)
+
+    def __init__(self, env, capacity, tracer=NULL_TRACER, rng=random, monitor=None):
         self.env = env
+        self.tracer = tracer
+        self.rng = rng
+        self.monitor = monitor
         self.resource = simpy.Resource(env, capacity=capacity)
 
     def process(self, passenger):
@@ -16,22 +22,39 @@ class CheckIn:
         Yields:
             simpy.events.process: Check-in process events
         """
+        monitor = self.monitor
+        if monitor is not None:
+            arrival = self.env.now
+            monitor.arrive(arrival)
         with self.resource.request() as request:
             yield request
-            check_in_time = random.randint(2, 8) 
+            if monitor is not None:
+                monitor.start(self.env.now, self.env.now - arrival)
+            check_in_time = self.rng.randint(*self.service_time_range) 
             yield self.env.timeout(check_in_time)
+            if monitor is not None:
+                monitor.finish(self.env.now)
             passenger.check_in_time = check_in_time 
-            print(f'[t={self.env.now}] {passenger.name} has completed check-in in {check_in_time} minutes.')
+            if self.tracer.enabled:
+                self.tracer.emit(self.env.now, 'check_in', passenger.name, check_in_time)
 
 class Security:
-    def __init__(self, env, capacity):
+    service_time_range = (2, 5)
+
+    def __init__(self, env, capacity, tracer=NULL_TRACER, rng=random, monitor=None):
         """Initialize security check
         
         Args:
             env (simpy.Environment): Simulation environment
             capacity (int): Number of security counters available
+            tracer (Tracer): Tracer receiving the events of the station
+            rng (random.Random): Generator of the service times, the global random module by default
+            monitor (StationMonitor, optional): Accumulates queue, utilization and wait statistics
         """
         self.env = env
+        self.tracer = tracer
+        self.rng = rng
+        self.monitor = monitor
         self.resource = simpy.Resource(env, capacity=capacity)
 
     def process(self, passenger):
@@ -43,22 +66,39 @@ class Security:
         Yields:
             simpy.events.Process: Security process events
         """
+        monitor = self.monitor
+        if monitor is not None:
+            arrival = self.env.now
+            monitor.arrive(arrival)
         with self.resource.request() as request:
             yield request
-            security_time = random.randint(2, 5)  
+            if monitor is not None:
+                monitor.start(self.env.now, self.env.now - arrival)
+            security_time = self.rng.randint(*self.service_time_range)  
             yield self.env.timeout(security_time)
+            if monitor is not None:
+                monitor.finish(self.env.now)
             passenger.security_time = security_time 
-            print(f'[t={self.env.now}] {passenger.name} has passed security check in {security_time} minutes.')
+            if self.tracer.enabled:
+                self.tracer.emit(self.env.now, 'security', passenger.name, security_time)
 
 class PassportControl:
-    def __init__(self, env, capacity):
+    service_time_range = (1, 3)
+
+    def __init__(self, env, capacity, tracer=NULL_TRACER, rng=random, monitor=None):
         """Initialize passport control
         
         Args:
             env (simpy.Environment): Simulation environment
             capacity (int): Number of passport control counters available
+            tracer (Tracer): Tracer receiving the events of the station
+            rng (random.Random): Generator of the service times, the global random module by default
+            monitor (StationMonitor, optional): Accumulates queue, utilization and wait statistics
         """
         self.env = env
+        self.tracer = tracer
+        self.rng = rng
+        self.monitor = monitor
         self.resource = simpy.Resource(env, capacity=capacity)
 
     def process(self, passenger):
@@ -70,22 +110,39 @@ class PassportControl:
         Yields:
             simpy.events.Process: Passport control process events
         """
+        monitor = self.monitor
+        if monitor is not None:
+            arrival = self.env.now
+            monitor.arrive(arrival)
         with self.resource.request() as request:
             yield request
-            passport_time = random.randint(1, 3)  
+            if monitor is not None:
+                monitor.start(self.env.now, self.env.now - arrival)
+            passport_time = self.rng.randint(*self.service_time_range)  
             yield self.env.timeout(passport_time)
+            if monitor is not None:
+                monitor.finish(self.env.now)
             passenger.passport_time = passport_time  
-            print(f'[t={self.env.now}] {passenger.name} has passed passport control in {passport_time} minutes.')
+            if self.tracer.enabled:
+                self.tracer.emit(self.env.now, 'passport', passenger.name, passport_time)
 
 class Boarding:
-    def __init__(self, env, capacity):
+    service_time_range = (5, 15)
+
+    def __init__(self, env, capacity, tracer=NULL_TRACER, rng=random, monitor=None):
         """Initialize boarding gates.
         
         Args:
             env (simpy.Environment): Simulation environment
             capacity (int): Number of available boarding gates
+            tracer (Tracer): Tracer receiving the events of the station
+            rng (random.Random): Generator of the service times, the global random module by default
+            monitor (StationMonitor, optional): Accumulates queue, utilization and wait statistics
         """
         self.env = env
+        self.tracer = tracer
+        self.rng = rng
+        self.monitor = monitor
         self.resource = simpy.Resource(env, capacity=capacity)
 
     def process(self, passenger, gate):
@@ -98,22 +155,39 @@ class Boarding:
         Yields:
             simpy.events.Process: Boarding process events
         """
+        monitor = self.monitor
+        if monitor is not None:
+            arrival = self.env.now
+            monitor.arrive(arrival)
         with self.resource.request() as request:
             yield request
-            boarding_time = random.randint(5, 15)  
+            if monitor is not None:
+                monitor.start(self.env.now, self.env.now - arrival)
+            boarding_time = self.rng.randint(*self.service_time_range)  
             yield self.env.timeout(boarding_time)
+            if monitor is not None:
+                monitor.finish(self.env.now)
             passenger.boarding_time = boarding_time 
-            print(f'[t={self.env.now}] {passenger.name} has boarded the plane at gate {gate} in {boarding_time} minutes.')
+            if self.tracer.enabled:
+                self.tracer.emit(self.env.now, 'boarding', passenger.name, boarding_time, gate)
 
 class Disembarking:
-    def __init__(self, env, capacity):
+    service_time_range = (1, 5)
+
+    def __init__(self, env, capacity, tracer=NULL_TRACER, rng=random, monitor=None):
         """Initialize disembarkation resources.
         
         Args:
             env (simpy.Environment): Simulation environment
             capacity (int): Number of parallel disembarkation points
+            tracer (Tracer): Tracer receiving the events of the station
+            rng (random.Random): Generator of the service times, the global random module by default
+            monitor (StationMonitor, optional): Accumulates queue, utilization and wait statistics
         """
         self.env = env
+        self.tracer = tracer
+        self.rng = rng
+        self.monitor = monitor
         self.resource = simpy.Resource(env, capacity=capacity)
 
     def process(self, passenger):
@@ -125,9 +199,18 @@ class Disembarking:
         Yields:
             simpy.events.Process: Disembarkation process events
         """
+        monitor = self.monitor
+        if monitor is not None:
+            arrival = self.env.now
+            monitor.arrive(arrival)
         with self.resource.request() as request:
             yield request
-            disembark_time = random.randint(1, 5)  
+            if monitor is not None:
+                monitor.start(self.env.now, self.env.now - arrival)
+            disembark_time = self.rng.randint(*self.service_time_range)  
             yield self.env.timeout(disembark_time)
+            if monitor is not None:
+                monitor.finish(self.env.now)
             passenger.disembark_time = disembark_time  
-            print(f'[t={self.env.now}] {passenger.name} has disembarked in {disembark_time} minutes.')
\ No newline at end of file
+            if self.tracer.enabled:
+                self.tracer.emit(self.env.now, 'disembark', passenger.name, disembark_time)
\ No newline at end of file
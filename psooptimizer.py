@@ -5,63 +5,369 @@
 # passport control booths, runways, and boarding gates—in order to minimize the average passenger processing time.
 # The simulation runs silently for each configuration, and the PSO algorithm finds the best setup within the defined bounds.
 # The result is returned as a DataFrame showing the best resource combination and the corresponding performance score.
+#
+# Particles are rounded to integer capacities, so many of them land on configurations that were already simulated.
+# Evaluations are memoized in an SQLite cache keyed on (capacity, seed) that persists across runs, and the
+# configurations of each iteration that are not cached yet are simulated in parallel on a process pool.
+# The cache also records the simulation parameters and a model version with every value, so results of
+# other parameters or of an older model are not reused.
+# With surrogate=True, particles are first screened on a regression model of the known results (surrogate.py)
+# and only the promising or uncertain configurations are simulated.
+# With prune=True, every simulation gets the best value its particle has found as a bound, and is stopped
+# as soon as it cannot beat it (controller.py): such a particle does not move its best position anyway,
+# so the search is the same, only cheaper.
+# Without bounds, the pending configurations are split in one chunk per worker and every chunk is simulated
+# as one batch (batch.py), which draws the schedule once for the whole chunk.
+# With replications > 1, the objective of a configuration is the mean over the runs with seeds
+# seed, seed + 1, ... (replication.py) instead of a single noisy run. Every run is cached on its own
+# (capacity, seed), so the runs are shared between searches with different numbers of replications.
+# pandas is only imported by pso_opt, so the worker processes do not pay for it.
+
+from __future__ import annotations
 
+import os
+import sqlite3
+from typing import TYPE_CHECKING
 import numpy as np
-import pandas as pd
-from pyswarm import pso
 import simpy
-import contextlib
-import io
-from simulation.airport_simulation import run_simulation
-
-def silent(func):
-    def wrapper(*args, **kwargs):
-        with contextlib.redirect_stdout(io.StringIO()):
-            return func(*args, **kwargs)
-    return wrapper
-
-@silent
-def run_silent_simulation(env: simpy.Environment, capacity: tuple[int, int, int, int, int]) -> dict:
+from concurrent.futures import ProcessPoolExecutor
+from airport_simulation import run_simulation, SIMULATION_TIME
+from controller import BoundExceeded
+from batch import run_simulation_batch, mean_processing_times
+from replication import summarize
+from sinks import parse_capacity
+from journal import RunJournal, run_key
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Version of the simulation model in the evaluation cache, to be increased whenever a change to the
+# simulation changes the result of a (capacity, seed), so that the cached values are not reused
+MODEL_VERSION = 1
+# Parameters of every simulation run by the evaluators, also part of the cache key
+EVALUATION_PARAMETERS = {'engine': "simpy", 'horizon': SIMULATION_TIME}
+
+def evaluate_capacity(capacity: tuple[int, int, int, int, int], seed: int = 42, bound: float | None = None) -> float:
     """
-    Run the airport simulation silently and return performance metrics.
+    Run the airport simulation for one configuration and return its average processing time.
 
     Args:
-        env (simpy.Environment): simPy environment.
         capacity (tuple): resource capacities [check-in, security, passport, runways, gates].
+        seed (int): seed of the simulation, the same (capacity, seed) always gives the same result.
+        bound (float | None): stop the simulation as soon as its average is certain to be above this value.
+
+    Returns:
+        float: average 'Total Processing Time' of the passengers that finished, inf if none did.
+
+    Raises:
+        BoundExceeded: if the simulation was stopped by the bound, its lower_bound is above the bound.
+    """
+    rows = run_simulation(simpy.Environment(), capacity, seed=seed, bound=bound, **EVALUATION_PARAMETERS)
+    times = [row["Total Processing Time"] for row in rows if row["Total Processing Time"] is not None]
+    if not times:
+        return float('inf')
+    return float(np.mean(times))
+
+def _evaluate_job(job: tuple[tuple[int, int, int, int, int], int, float | None]) -> tuple[float, bool]:
+    # Module-level wrapper so the (capacity, seed, bound) jobs can be sent to the worker processes.
+    # Returns (value, pruned), a pruned simulation gives the lower bound of its value.
+    capacity, seed, bound = job
+    try:
+        return evaluate_capacity(capacity, seed, bound), False
+    except BoundExceeded as exceeded:
+        return exceeded.lower_bound, True
+
+def _evaluate_batch(job: tuple[list[tuple[int, int, int, int, int]], int]) -> list[float]:
+    # Module-level wrapper so the (capacities, seed) chunks can be sent to the worker processes.
+    # Same values as evaluate_capacity, the configurations share the schedule of the seed.
+    capacities, seed = job
+    columns, runs = run_simulation_batch(capacities, [seed], **EVALUATION_PARAMETERS)
+    return [float(value) for value in mean_processing_times(columns, runs)]
+
+class EvaluationCache:
+    # Version of the table layout, a cache file with another layout is emptied when it is opened
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: str | None = "./pso_cache.sqlite", model: str | None = None) -> None:
+        """
+        Persistent cache of simulation results keyed on the model, the rounded capacity tuple and the seed.
+
+        Args:
+            path (str | None): SQLite file, None keeps the cache in memory only.
+            model (str | None): identifier of the simulation model and its parameters (see run_key), values
+                cached under another model are ignored. Defaults to MODEL_VERSION and EVALUATION_PARAMETERS.
+        """
+        self.model: str = model or run_key(version=MODEL_VERSION, **EVALUATION_PARAMETERS)
+        self.connection: sqlite3.Connection = sqlite3.connect(path or ":memory:")
+        with self.connection:
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                # Written before the model was part of the key, its values cannot be attributed to a model
+                self.connection.execute("DROP TABLE IF EXISTS evaluations")
+                self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations (model TEXT, capacity TEXT, seed INTEGER, value REAL, "
+                "PRIMARY KEY (model, capacity, seed))")
+
+    def get(self, capacity: tuple[int, ...], seed: int) -> float | None:
+        row = self.connection.execute(
+            "SELECT value FROM evaluations WHERE model = ? AND capacity = ? AND seed = ?",
+            (self.model, str(capacity), seed)).fetchone()
+        return None if row is None else row[0]
+
+    def values(self, seed: int) -> dict[tuple[int, ...], float]:
+        rows = self.connection.execute("SELECT capacity, value FROM evaluations WHERE model = ? AND seed = ?",
+                                       (self.model, seed))
+        return {parse_capacity(capacity): value for capacity, value in rows}
+
+    def put_many(self, values: dict[tuple[int, ...], float], seed: int) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)",
+                [(self.model, str(capacity), seed, value) for capacity, value in values.items()])
+
+    def close(self) -> None:
+        self.connection.close()
+
+def replicated_value(values: list[float]) -> float:
+    """
+    Objective value of a configuration from the values of its replications.
+
+    Args:
+        values (list[float]): average processing time of every replication, inf if nobody finished.
+
+    Returns:
+        float: mean of the replications where somebody finished, inf if there is none.
+    """
+    finished = [value for value in values if not np.isinf(value)]
+    return summarize(finished)['mean'] if finished else float('inf')
+
+class SwarmEvaluator:
+    def __init__(self, cache: EvaluationCache, seed: int = 42, workers: int | None = None,
+                 replications: int = 1) -> None:
+        """
+        Evaluates a whole swarm at once: particles are rounded, duplicates and cached
+        configurations are skipped, and the rest are simulated on a process pool.
+
+        Args:
+            cache (EvaluationCache): cache of previous evaluations.
+            seed (int): simulation seed used for every configuration.
+            workers (int | None): worker processes, defaults to the core count. 1 runs in-process.
+            replications (int): runs of every configuration, with seeds seed, seed + 1, ...; the
+                objective is the mean of their values (see replicated_value).
+        """
+        self.cache = cache
+        self.seed = seed
+        self.seeds = [seed + i for i in range(replications)]
+        self.workers = workers or os.cpu_count() or 1
+        self.executor: ProcessPoolExecutor | None = None
+        self.simulations: int = 0
+        self.pruned: int = 0
+        self.last_pruned: set[tuple[int, ...]] = set()
+
+    def __call__(self, positions: np.ndarray, bounds: np.ndarray | None = None) -> np.ndarray:
+        """
+        Objective values of a swarm.
+
+        Args:
+            positions (np.ndarray): (particles, dimensions) positions.
+            bounds (np.ndarray | None): value each particle has to beat. A simulation is stopped as soon as
+                it cannot beat the bounds of all its particles, and its lower bound is returned instead
+                of its value (it is not cached, its configurations are kept in `last_pruned`).
+
+        Returns:
+            np.ndarray: objective value of every particle.
+
+        Raises:
+            ValueError: if bounds are given with more than one replication.
+        """
+        if bounds is not None and len(self.seeds) > 1:
+            raise ValueError("Simulations can only be pruned with a single replication")
+        capacities = [tuple(int(round(i)) for i in x) for x in positions]
+        limits: dict[tuple[int, ...], float] = {}
+        if bounds is not None:
+            for capacity, bound in zip(capacities, bounds):
+                limits[capacity] = max(limits.get(capacity, -np.inf), float(bound))
+        # (capacity, seed) -> value of the run
+        runs = {}
+        pending = []
+        for capacity in dict.fromkeys(capacities):
+            for seed in self.seeds:
+                value = self.cache.get(capacity, seed)
+                if value is None:
+                    pending.append((capacity, seed))
+                else:
+                    runs[(capacity, seed)] = value
+
+        if pending:
+            if limits:
+                jobs = [(capacity, seed, limits[capacity] if np.isfinite(limits.get(capacity, np.inf)) else None)
+                        for capacity, seed in pending]
+                results = self._map(_evaluate_job, jobs)
+            else:
+                # Unbounded simulations are batched, one chunk per worker and seed
+                chunks = []
+                for seed in self.seeds:
+                    group = [capacity for capacity, run_seed in pending if run_seed == seed]
+                    size = -(-len(group) // self.workers)
+                    chunks += [(group[i:i + size], seed) for i in range(0, len(group), size)]
+                pending = [(capacity, seed) for group, seed in chunks for capacity in group]
+                results = [(value, False) for values in self._map(_evaluate_batch, chunks) for value in values]
+            self.last_pruned = {capacity for (capacity, _), (_, pruned) in zip(pending, results) if pruned}
+            for seed in self.seeds:
+                self.cache.put_many({capacity: value for (capacity, run_seed), (value, pruned) in zip(pending, results)
+                                     if run_seed == seed and not pruned}, seed)
+            runs.update((run, value) for run, (value, _) in zip(pending, results))
+            self.simulations += len(pending)
+            self.pruned += len(self.last_pruned)
+        else:
+            self.last_pruned = set()
+
+        values = {capacity: replicated_value([runs[(capacity, seed)] for seed in self.seeds])
+                  for capacity in set(capacities)}
+        return np.array([values[capacity] for capacity in capacities])
+
+    def cached_values(self) -> dict[tuple[int, ...], float]:
+        """
+        Objective values of the configurations whose replications are all in the cache.
+
+        Returns:
+            dict: capacity tuple -> objective value.
+        """
+        per_seed = [self.cache.values(seed) for seed in self.seeds]
+        return {capacity: replicated_value([values[capacity] for values in per_seed]) for capacity in per_seed[0]
+                if all(capacity in values for values in per_seed)}
+
+    def _map(self, function, jobs: list) -> list:
+        if self.workers == 1 or len(jobs) == 1:
+            return list(map(function, jobs))
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return list(self.executor.map(function, jobs))
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+def particle_swarm(evaluate, lb: list[float], ub: list[float], swarmsize: int = 30, omega: float = 0.5,
+                   phip: float = 0.5, phig: float = 0.5, maxiter: int = 100, minstep: float = 1e-8,
+                   minfunc: float = 1e-8, seed: int | None = None, state: dict | None = None,
+                   checkpoint=None, bounded: bool = False) -> tuple[np.ndarray, float]:
+    """
+    Particle swarm minimization that evaluates the whole swarm of each iteration in one call.
+    Follows the update rules and stopping criteria of pyswarm.pso.
+
+    Args:
+        evaluate (callable): maps a (swarmsize, dimensions) array of positions to their objective values.
+        lb (list[float]): lower bounds.
+        ub (list[float]): upper bounds.
+        swarmsize (int): number of particles.
+        omega (float): inertia of the particle velocity.
+        phip (float): scaling of the step towards the particle's best known position.
+        phig (float): scaling of the step towards the swarm's best known position.
+        maxiter (int): maximum number of iterations.
+        minstep (float): minimum step of the swarm's best position before stopping.
+        minfunc (float): minimum change of the swarm's best objective before stopping.
+        seed (int | None): seed of the swarm's random numbers.
+        state (dict | None): swarm saved by `checkpoint` in an interrupted run, the search resumes from it.
+        checkpoint (callable | None): called with the JSON-serializable state of the swarm after every
+            iteration, e.g. to save it in a RunJournal.
+        bounded (bool): call evaluate(positions, bounds=...) with the best value of every particle, an
+            evaluation above its bound only has to be a lower bound of the objective as the particle
+            keeps its best position either way.
 
     Returns:
-        dict: dictionary with 'average_time'.
+        tuple: best position and its objective value.
     """
-    df = run_simulation(env, capacity)
-    if df.empty:
-        return {"average_time": float('inf')}
-    avg_time = df["Total Processing Time"].mean()
-    return {"average_time": avg_time}
+    rng = np.random.default_rng(seed)
+    lb = np.array(lb, dtype=float)
+    ub = np.array(ub, dtype=float)
+    vhigh = np.abs(ub - lb)
+    vlow = -vhigh
+
+    if state is None:
+        x = lb + rng.random((swarmsize, len(lb))) * (ub - lb)
+        v = vlow + rng.random((swarmsize, len(lb))) * (vhigh - vlow)
+        p = x.copy()
+        fp = evaluate(x)
+        i_min = int(np.argmin(fp))
+        g = p[i_min].copy()
+        fg = fp[i_min]
+        start = 0
+    else:
+        x, v, p, fp, g = (np.array(state[name], dtype=float) for name in ("x", "v", "p", "fp", "g"))
+        fg = float(state["fg"])
+        start = state["iteration"]
+        rng.bit_generator.state = state["rng"]
+
+    for iteration in range(start, maxiter):
+        if checkpoint is not None:
+            checkpoint({"x": x.tolist(), "v": v.tolist(), "p": p.tolist(), "fp": fp.tolist(), "g": g.tolist(),
+                        "fg": float(fg), "iteration": iteration, "rng": rng.bit_generator.state})
+        rp = rng.random((swarmsize, len(lb)))
+        rg = rng.random((swarmsize, len(lb)))
+        v = omega * v + phip * rp * (p - x) + phig * rg * (g - x)
+        x = np.clip(x + v, lb, ub)
+        fx = evaluate(x, bounds=fp) if bounded else evaluate(x)
+
+        improved = fx < fp
+        p[improved] = x[improved]
+        fp[improved] = fx[improved]
 
-def simulation_objective(x: np.ndarray) -> float:
+        i_min = int(np.argmin(fp))
+        if fp[i_min] < fg:
+            stepsize = np.sqrt(np.sum((g - p[i_min]) ** 2))
+            if np.abs(fg - fp[i_min]) <= minfunc or stepsize <= minstep:
+                return p[i_min].copy(), fp[i_min]
+            g = p[i_min].copy()
+            fg = fp[i_min]
+
+    return g, fg
+
+def simulation_objective(x: np.ndarray, seed: int = 42) -> float:
     """
-    Objective function used in PSO, wraps the silent simulation.
+    Objective function for a single particle.
 
     Args:
         x (np.ndarray): Candidate capacities.
+        seed (int): simulation seed.
 
     Returns:
         float: Average processing time (to minimize).
     """
     capacities = tuple(int(round(i)) for i in x)
-    env = simpy.Environment()
-    result = run_silent_simulation(env, capacities)
-    return result["average_time"]
+    return evaluate_capacity(capacities, seed)
 
-def pso_opt() -> pd.DataFrame:
+def pso_opt(workers: int | None = None, seed: int = 42, cache_path: str | None = "./pso_cache.sqlite",
+            surrogate: bool = False, history_path: str | None = "./passenger_flight_data.csv",
+            journal_path: str | None = None, prune: bool = False, replications: int = 1) -> pd.DataFrame:
     """
     Run PSO to optimize airport resource.
 
+    Args:
+        workers (int | None): worker processes used to evaluate each iteration, defaults to the core count.
+        seed (int): seed of the simulations and of the swarm.
+        cache_path (str | None): SQLite file of the evaluation cache, None for an in-memory cache.
+        surrogate (bool): screen the particles on a surrogate model and only simulate the promising ones.
+        history_path (str | None): CSV of an earlier sweep used to fit the surrogate, skipped if it does not exist.
+        journal_path (str | None): SQLite run journal where the swarm is saved after every iteration, an
+            interrupted run with the same parameters resumes from the saved swarm. None disables it.
+        prune (bool): stop the simulations that cannot beat the best value of their particle, the search
+            finds the same solution with shorter simulations.
+        replications (int): runs of every configuration (seeds seed, seed + 1, ...), the fitness is
+            their mean processing time.
+
     Returns:
         pd.DataFrame: DataFrame with best found solution and its fitness value.
+
+    Raises:
+        ValueError: if prune is combined with more than one replication.
     """
-    lb = [1, 1, 1, 1, 5]   
-    ub = [4, 4, 4, 4, 25]  
+    if prune and replications > 1:
+        raise ValueError("prune needs a single replication, a bound on the mean of several runs "
+                         "cannot stop one of them")
+    lb = [1, 1, 1, 1, 5]
+    ub = [4, 4, 4, 4, 25]
 
     # PSO parameters
     swarmsize = 30
@@ -70,22 +376,51 @@ def pso_opt() -> pd.DataFrame:
     c1 = 1.5
     c2 = 1.5
 
-    # Run PSO
-    best_solution, best_value = pso(
-        simulation_objective,
-        lb,
-        ub,
-        swarmsize=swarmsize,
-        omega=w,
-        phip=c1,
-        phig=c2,
-        maxiter=maxiter,
-        debug=False
-    )
+    cache = EvaluationCache(cache_path)
+    evaluator = SwarmEvaluator(cache, seed=seed, workers=workers, replications=replications)
+    if surrogate:
+        from surrogate import SurrogateEvaluator, load_sweep_results
+        prior = load_sweep_results(history_path) if history_path and os.path.exists(history_path) else {}
+        evaluator = SurrogateEvaluator(evaluator, known=evaluator.cached_values(), prior=prior)
+    journal = RunJournal(journal_path) if journal_path else None
+    key = run_key(optimizer="pso", seed=seed, surrogate=surrogate, swarmsize=swarmsize, maxiter=maxiter,
+                  **({'replications': replications} if replications > 1 else {}))
+    state = journal.load_state(key) if journal else None
+    checkpoint = (lambda swarm: journal.save_state(key, swarm)) if journal else None
+    try:
+        # Run PSO
+        best_solution, best_value = particle_swarm(
+            evaluator,
+            lb,
+            ub,
+            swarmsize=swarmsize,
+            omega=w,
+            phip=c1,
+            phig=c2,
+            maxiter=maxiter,
+            seed=seed,
+            state=state,
+            checkpoint=checkpoint,
+            bounded=prune
+        )
+        # The run is finished, the next one starts a new swarm
+        if journal:
+            journal.clear(key)
+    finally:
+        evaluator.close()
+        cache.close()
+        if journal:
+            journal.close()
+
+    import pandas as pd
 
     df_result = pd.DataFrame({
         "Best Solution": [best_solution],
-        "Fitness Value (Avg. Time)": [best_value]
+        "Fitness Value (Avg. Time)": [best_value],
+        "Replications": [replications],
+        "Simulations Run": [evaluator.simulations],
+        "Surrogate Screened": [getattr(evaluator, "screened", 0)],
+        "Simulations Pruned": [getattr(evaluator, "evaluator", evaluator).pruned]
     })
 
     return df_result
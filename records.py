@@ -0,0 +1,257 @@
+# records.py
+#
+# This file defines the compact, column-oriented buffer of simulation results.
+# Instead of one Python dict with 12 string keys per passenger, results are stored as a
+# struct of arrays: durations in typed int arrays (with -1 for a missing value) and text
+# columns dictionary-encoded as int codes plus a list of distinct values. The buffer converts
+# to pandas or Arrow without building per-row dicts, and still yields the classic rows on demand.
+
+import array
+
+# Text columns, stored as codes into a list of distinct values
+STRING_COLUMNS = ['Passenger ID', 'Flight ID', 'Plane Type', 'Flight Type', 'Gate']
+
+# Integer columns, stored in typed arrays
+DURATION_COLUMNS = ['Check-in Duration', 'Security Duration', 'Passport Duration',
+                    'Boarding Duration', 'Disembark Duration', 'Total Processing Time']
+
+# Column order of the rows returned by run_simulation
+COLUMNS = STRING_COLUMNS + DURATION_COLUMNS + ['Simulation Parameters']
+
+# Integer column added by with_seed to the results of replicated runs
+SEED_COLUMN = 'Seed'
+
+# Stored in the integer columns in place of None
+MISSING = -1
+
+
+def passenger_durations(passenger):
+    """Values of DURATION_COLUMNS of a simulated passenger, None when missing.
+
+    Args:
+        passenger (Passenger): Passenger after the simulation
+
+    Returns:
+        tuple: Stage durations, then the total processing time (None unless every stage of its route finished)
+    """
+    international = passenger.flight_type == "International"
+    stages = (passenger.check_in_time, passenger.security_time,
+              passenger.passport_time if international else None,
+              passenger.boarding_time, passenger.disembark_time)
+    required = stages if international else stages[:2] + stages[3:]
+    total = None if None in required else sum(required)
+    return stages + (total,)
+
+
+class ResultColumns:
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.codes = {name: array.array('i') for name in STRING_COLUMNS + ['Simulation Parameters']}
+        self.categories = {name: [] for name in self.codes}
+        self._lookup = {name: {} for name in self.codes}
+        self.durations = {name: array.array('i') for name in DURATION_COLUMNS}
+        # Seed of the run of every passenger, only kept once with_seed has been called
+        self.seeds = None
+
+    def __len__(self):
+        return len(self.durations['Total Processing Time'])
+
+    @property
+    def columns(self):
+        """Column names of the rows, COLUMNS plus 'Seed' for tagged buffers."""
+        return COLUMNS + [SEED_COLUMN] if self.seeds is not None else COLUMNS
+
+    def with_seed(self, seed):
+        """Tag every passenger with the seed of its run, so replications can be told apart in the output.
+
+        Args:
+            seed (int): Seed of the run, the buffer must hold the whole run
+
+        Returns:
+            ResultColumns: This buffer, with a 'Seed' column
+        """
+        # 64-bit, as the seeds of the random streams and the 'Seed' column of the outputs
+        self.seeds = array.array('q', [seed]) * len(self)
+        return self
+
+    def encode(self, name, values):
+        """Codes of values of a text column, adding the new ones to its distinct values.
+
+        Args:
+            name (str): Text column, one of STRING_COLUMNS or 'Simulation Parameters'
+            values (iterable): Values to encode
+
+        Returns:
+            array.array: Codes of the values, see append_encoded
+        """
+        lookup = self._lookup[name]
+        categories = self.categories[name]
+        codes = array.array('i')
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(value)
+            codes.append(code)
+        return codes
+
+    def append_encoded(self, codes, durations):
+        """Append passengers whose text columns are already encoded, without looking the values up again.
+
+        Args:
+            codes (dict): Codes of every text column (STRING_COLUMNS and 'Simulation Parameters'), from encode
+            durations (dict): Array of every DURATION_COLUMNS column, MISSING when missing
+        """
+        for name in self.codes:
+            self.codes[name].extend(codes[name])
+        for name in DURATION_COLUMNS:
+            self.durations[name].extend(durations[name])
+
+    def slice(self, start, stop):
+        """Buffer of the passengers from start to stop, sharing the distinct values of this one.
+
+        Args:
+            start (int): First passenger
+            stop (int): Passenger after the last one
+
+        Returns:
+            ResultColumns: The passengers
+        """
+        columns = ResultColumns()
+        for name in self.codes:
+            columns.codes[name] = self.codes[name][start:stop]
+            columns.categories[name] = list(self.categories[name])
+            columns._lookup[name] = dict(self._lookup[name])
+        for name in DURATION_COLUMNS:
+            columns.durations[name] = self.durations[name][start:stop]
+        if self.seeds is not None:
+            columns.seeds = self.seeds[start:stop]
+        return columns
+
+    def _encode(self, name, value):
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[name])
+            self.categories[name].append(value)
+        self.codes[name].append(code)
+
+    def append(self, texts, durations, parameters):
+        """Append one passenger.
+
+        Args:
+            texts (tuple): Values of STRING_COLUMNS, in order
+            durations (tuple): Values of DURATION_COLUMNS, in order, None when missing
+            parameters (str): 'Simulation Parameters' of the run
+        """
+        for name, value in zip(STRING_COLUMNS, texts):
+            self._encode(name, value)
+        for name, value in zip(DURATION_COLUMNS, durations):
+            self.durations[name].append(MISSING if value is None else value)
+        self._encode('Simulation Parameters', parameters)
+
+    def add_passenger(self, passenger, flight_id, plane_type, capacity):
+        """Append a simulated passenger, same values as passenger_record.
+
+        Args:
+            passenger (Passenger): Passenger after the simulation
+            flight_id (str): Flight number
+            plane_type (str): Aircraft model
+            capacity (tuple): contains the airport resource capacities.
+        """
+        self.append((passenger.name, flight_id, plane_type, passenger.flight_type, passenger.gate),
+                    passenger_durations(passenger), str(capacity))
+
+    def extend(self, other):
+        """Append every passenger of another buffer.
+
+        Args:
+            other (ResultColumns): Buffer to copy
+
+        Raises:
+            ValueError: If only one of the buffers has a 'Seed' column
+        """
+        if (self.seeds is None) != (other.seeds is None) and len(self) and len(other):
+            raise ValueError("Cannot mix results with and without a 'Seed' column")
+        if other.seeds is not None:
+            if self.seeds is None:
+                self.seeds = array.array('q')
+            self.seeds.extend(other.seeds)
+        for name in self.codes:
+            remap = []
+            for value in other.categories[name]:
+                code = self._lookup[name].get(value)
+                if code is None:
+                    code = self._lookup[name][value] = len(self.categories[name])
+                    self.categories[name].append(value)
+                remap.append(code)
+            self.codes[name].extend(remap[code] for code in other.codes[name])
+        for name in DURATION_COLUMNS:
+            self.durations[name].extend(other.durations[name])
+
+    def column(self, name):
+        """Decoded values of a column, None for missing durations.
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            list: Values of the column
+        """
+        if name in self.codes:
+            categories = self.categories[name]
+            return [categories[code] for code in self.codes[name]]
+        if name == SEED_COLUMN:
+            return list(self.seeds)
+        return [None if value == MISSING else value for value in self.durations[name]]
+
+    def rows(self):
+        """Yields the rows as the dicts returned by run_simulation.
+
+        Yields:
+            dict: One row per passenger
+        """
+        names = self.columns
+        columns = {name: self.column(name) for name in names}
+        for i in range(len(self)):
+            yield {name: columns[name][i] for name in names}
+
+    def to_pandas(self):
+        """Converts the buffer to a DataFrame with categorical text and nullable integer columns.
+
+        Returns:
+            pd.DataFrame: One row per passenger
+        """
+        import numpy as np
+        import pandas as pd
+        data = {}
+        for name in self.columns:
+            if name in self.codes:
+                codes = np.frombuffer(self.codes[name], dtype=np.int32) if len(self) else np.empty(0, np.int32)
+                data[name] = pd.Categorical.from_codes(codes, categories=self.categories[name])
+            elif name == SEED_COLUMN:
+                data[name] = np.array(self.seeds, dtype=np.int64)
+            else:
+                values = np.frombuffer(self.durations[name], dtype=np.int32) if len(self) else np.empty(0, np.int32)
+                data[name] = pd.arrays.IntegerArray(values.astype(np.int64), values == MISSING)
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """Converts the buffer to an Arrow table with dictionary-encoded text columns.
+
+        Returns:
+            pa.Table: One row per passenger
+        """
+        import numpy as np
+        import pyarrow as pa
+        arrays = {}
+        for name in self.columns:
+            if name in self.codes:
+                indices = pa.array(np.frombuffer(self.codes[name], dtype=np.int32) if len(self) else [], pa.int32())
+                arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(self.categories[name], pa.string()))
+            elif name == SEED_COLUMN:
+                arrays[name] = pa.array(np.array(self.seeds, dtype=np.int64))
+            else:
+                values = np.frombuffer(self.durations[name], dtype=np.int32) if len(self) else np.empty(0, np.int32)
+                arrays[name] = pa.array(values.astype(np.int64), mask=values == MISSING)
+        return pa.table(arrays)
@@ -0,0 +1,130 @@
+# replication.py
+#
+# This file defines the replication manager of the airport simulation.
+# A single run of a configuration is a noisy sample, so a configuration is replicated with
+# consecutive seeds until the half-width of the confidence interval on the mean
+# 'Total Processing Time' falls below a target or the replication budget runs out.
+# Noisy configurations get more replications, converged ones stop early. Configurations
+# replicated with the same base seed share their seeds (common random numbers).
+# The replicated sweep (sweep.ReplicatedSweep, main.py --target-half-width) and the PSO objective
+# with replications > 1 build on these functions.
+
+import math
+import statistics
+import simpy
+
+from airport_simulation import run_simulation, SIMULATION_TIME
+from records import ResultColumns
+
+
+def t_quantile(confidence, dof):
+    """Two-sided Student t critical value.
+
+    Args:
+        confidence (float): Confidence level, e.g. 0.95
+        dof (int): Degrees of freedom
+
+    Returns:
+        float: Critical value
+    """
+    # scipy comes with scikit-fuzzy, imported here so the worker processes only load it when they summarize
+    from scipy.special import stdtrit
+    return float(stdtrit(dof, 0.5 + confidence / 2))
+
+
+def replication_mean(simulation_data):
+    """Mean 'Total Processing Time' of the passengers that finished a run, None if nobody did.
+
+    Args:
+        simulation_data (list | ResultColumns): Results of run_simulation
+
+    Returns:
+        float: The mean, None if no passenger finished
+    """
+    if isinstance(simulation_data, ResultColumns):
+        times = simulation_data.column('Total Processing Time')
+    else:
+        times = [row['Total Processing Time'] for row in simulation_data]
+    times = [time for time in times if time is not None]
+    return sum(times) / len(times) if times else None
+
+
+def summarize(samples, confidence=0.95):
+    """Summarizes per-replication means.
+
+    Args:
+        samples (list[float]): One mean per replication
+        confidence (float): Confidence level of the interval
+
+    Returns:
+        dict: 'replications', 'mean', 'variance', 'half_width' and 'ci' (low, high)
+    """
+    n = len(samples)
+    mean = statistics.fmean(samples) if n else math.nan
+    variance = statistics.variance(samples) if n > 1 else math.inf
+    half_width = t_quantile(confidence, n - 1) * math.sqrt(variance / n) if n > 1 else math.inf
+    return {
+        'replications': n,
+        'mean': mean,
+        'variance': variance,
+        'half_width': half_width,
+        'ci': (mean - half_width, mean + half_width),
+    }
+
+
+def replicate(capacity, target_half_width=0.5, confidence=0.95, min_replications=5, max_replications=100,
+              seed=0, engine="simpy", columnar=False, horizon=SIMULATION_TIME, completed=None, keep_results=False):
+    """Replicates a configuration until its confidence interval is narrow enough.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        target_half_width (float): Stop when the half-width of the CI on the mean falls below this
+        confidence (float): Confidence level of the interval
+        min_replications (int): Replications run before the stopping rule is checked
+        max_replications (int): Budget of replications
+        seed (int): Seed of the first replication, replication i uses seed + i
+        engine (str): simulation engine, "simpy", "kernel" or "numpy"
+        columnar (bool): simulate into ResultColumns buffers instead of lists of dicts
+        horizon (int, optional): end of every run, None runs until every passenger has finished
+        completed (dict, optional): seed -> mean 'Total Processing Time' (None or inf if nobody
+            finished) of replications already run, they are not run again
+        keep_results (bool): also return the results of the replications that were run
+
+    Returns:
+        dict: summary of the replications (see `summarize`) plus 'capacity', 'converged'
+            and 'runs', the number of runs including those where no passenger finished.
+            With keep_results, 'results' holds the (seed, simulation data) of every replication run.
+    """
+    completed = completed or {}
+    samples = []
+    results = []
+    runs = 0
+    summary = summarize(samples, confidence)
+    while runs < max_replications:
+        if seed + runs in completed:
+            mean = completed[seed + runs]
+            mean = None if mean is None or math.isinf(mean) else mean
+        else:
+            env = simpy.Environment() if engine == "simpy" else None
+            simulation_data = run_simulation(env, capacity, engine=engine, seed=seed + runs, columnar=columnar,
+                                             horizon=horizon)
+            mean = replication_mean(simulation_data)
+            if keep_results:
+                results.append((seed + runs, simulation_data))
+        runs += 1
+        if mean is None:
+            continue
+        samples.append(mean)
+        if len(samples) >= max(min_replications, 2):
+            summary = summarize(samples, confidence)
+            if summary['half_width'] <= target_half_width:
+                break
+    else:
+        summary = summarize(samples, confidence)
+
+    summary['capacity'] = capacity
+    summary['converged'] = summary['half_width'] <= target_half_width
+    summary['runs'] = runs
+    if keep_results:
+        summary['results'] = results
+    return summary
@@ -0,0 +1,324 @@
+# sinks.py
+#
+# This file defines the result sinks used to store the output of the simulations.
+# Rows produced by run_simulation are buffered and appended to the output file in batches,
+# instead of rebuilding and rewriting the whole file after every simulation.
+# A batch is flushed when it reaches a number of rows or when enough time has passed,
+# so memory stays bounded by the batch size and not by the length of the sweep.
+# Three formats are supported: CSV, a single Parquet file, and a Parquet dataset partitioned
+# by capacity configuration with typed capacity columns (both Parquet formats require pyarrow).
+
+import ast
+import csv
+import functools
+import os
+import shutil
+import time
+import uuid
+
+# Column types of the rows returned by run_simulation
+RESULT_COLUMNS = {
+    'Passenger ID': 'string',
+    'Flight ID': 'string',
+    'Plane Type': 'string',
+    'Flight Type': 'string',
+    'Gate': 'string',
+    'Check-in Duration': 'int64',
+    'Security Duration': 'int64',
+    'Passport Duration': 'int64',
+    'Boarding Duration': 'int64',
+    'Disembark Duration': 'int64',
+    'Total Processing Time': 'int64',
+    'Simulation Parameters': 'string',
+    # Only in the output of replicated runs
+    'Seed': 'int64',
+}
+
+# Integer columns the capacity tuple is split into, in the order of the tuple
+CAPACITY_COLUMNS = ['Check-in Capacity', 'Security Capacity', 'Passport Capacity',
+                    'Runways Capacity', 'Gates Capacity']
+
+# Low-cardinality text columns stored with dictionary encoding
+CATEGORICAL_COLUMNS = ['Flight Type', 'Plane Type', 'Gate', 'Flight ID']
+
+@functools.lru_cache(maxsize=None)
+def parse_capacity(parameters):
+    """Parse the 'Simulation Parameters' text back into the capacity tuple.
+
+    Args:
+        parameters (str): Stringified capacity tuple, e.g. '(1, 2, 3, 4, 5)'
+
+    Returns:
+        tuple: Capacity tuple of integers
+    """
+    return tuple(int(value) for value in ast.literal_eval(parameters))
+
+class ResultSink:
+    def __init__(self, path, batch_size=10000, flush_interval=30.0):
+        """Initialize the sink.
+
+        Args:
+            path (str): Output file path
+            batch_size (int): Number of buffered rows that triggers a flush
+            flush_interval (float): Seconds since the last flush that trigger a flush
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._buffer = []
+        # ResultColumns written with write_columns, kept in columnar form until the flush
+        self._columns = None
+        self._last_flush = time.monotonic()
+
+    @property
+    def buffered(self):
+        """Number of rows written to the sink but not to the output yet."""
+        return len(self._buffer) + (len(self._columns) if self._columns is not None else 0)
+
+    def _flush_if_due(self):
+        if self.buffered >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def write(self, rows):
+        """Add rows to the buffer, flushing it if a threshold is reached.
+
+        Args:
+            rows (list[dict]): Rows as returned by run_simulation
+        """
+        if self._columns is not None:
+            # Keeps the output in the order of the writes
+            self.flush()
+        self._buffer.extend(rows)
+        self._flush_if_due()
+
+    def write_columns(self, columns):
+        """Add a ResultColumns buffer after the rows already buffered, flushing if a threshold is reached.
+
+        Args:
+            columns (ResultColumns): Results in columnar form
+        """
+        if self._buffer:
+            self.flush()
+        if self._columns is None:
+            self._columns = columns.slice(0, len(columns))
+        else:
+            self._columns.extend(columns)
+        self._flush_if_due()
+
+    def flush(self):
+        """Write the buffered rows to the output and empty the buffer."""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        if self._columns is not None:
+            if len(self._columns):
+                self._write_columns(self._columns)
+                self.rows_written += len(self._columns)
+            self._columns = None
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush the remaining rows and release the output file."""
+        self.flush()
+
+    def _write_batch(self, rows):
+        raise NotImplementedError
+
+    def _write_columns(self, columns):
+        self._write_batch(list(columns.rows()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSVSink(ResultSink):
+    def __init__(self, path, batch_size=10000, flush_interval=30.0, append=False):
+        """Initialize the CSV sink.
+
+        Args:
+            path (str): Output CSV path
+            batch_size (int): Number of buffered rows that triggers a flush
+            flush_interval (float): Seconds since the last flush that trigger a flush
+            append (bool): Append to an existing file instead of overwriting it
+        """
+        super().__init__(path, batch_size, flush_interval)
+        self._write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, 'a' if append else 'w', newline='')
+        self._writer = None
+
+    def _write_batch(self, rows):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()))
+            if self._write_header:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    def __init__(self, path, batch_size=10000, flush_interval=30.0, append=False):
+        """Initialize the Parquet sink. Every flushed batch becomes a row group.
+
+        Args:
+            path (str): Output Parquet path
+            batch_size (int): Number of buffered rows that triggers a flush
+            flush_interval (float): Seconds since the last flush that trigger a flush
+            append (bool): Not supported, a Parquet file cannot be appended to
+
+        Raises:
+            ValueError: If append is requested
+        """
+        if append:
+            raise ValueError("A Parquet file cannot be appended to, use the csv or parquet-partitioned format")
+        super().__init__(path, batch_size, flush_interval)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self._schema = None
+        self._writer = None
+
+    def _write_table(self, table):
+        if self._schema is None:
+            self._schema = self._pa.schema([(name, self._pa.type_for_alias(RESULT_COLUMNS.get(name, 'string')))
+                                            for name in table.column_names])
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def _write_batch(self, rows):
+        self._write_table(self._pa.Table.from_pylist(rows))
+
+    def _write_columns(self, columns):
+        # Written as is, without going through per-row dicts
+        self._write_table(columns.to_arrow())
+
+    def close(self):
+        super().close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class PartitionedParquetSink(ResultSink):
+    def __init__(self, path, batch_size=10000, flush_interval=30.0, append=False, basename=None):
+        """Initialize the partitioned Parquet sink.
+
+        The output is a directory with one hive-style partition per capacity configuration
+        (e.g. 'Check-in Capacity=1/Security Capacity=2/...'), so a single configuration can
+        be loaded without scanning the rest of the sweep.
+
+        Args:
+            path (str): Output directory
+            batch_size (int): Number of buffered rows that triggers a flush
+            flush_interval (float): Seconds since the last flush that trigger a flush
+            append (bool): Add files to an existing dataset instead of replacing the dataset
+            basename (str, optional): Prefix of the file names when appending, a sink writing the same rows
+                with the same prefix overwrites the same files instead of adding duplicates
+        """
+        super().__init__(path, batch_size, flush_interval)
+        if not append and os.path.isdir(path):
+            # Files of an earlier run would otherwise stay in the dataset next to the new ones
+            shutil.rmtree(path)
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        self._pa = pa
+        self._ds = ds
+        self._batches = 0
+        # Files of an appending run get a distinct prefix so they do not replace the existing ones
+        self._basename = basename or (f'part-{uuid.uuid4().hex[:8]}-' if append else 'part-')
+        self._partitioning = ds.partitioning(
+            pa.schema([(name, pa.int32()) for name in CAPACITY_COLUMNS]), flavor='hive')
+
+    def _write_table(self, table):
+        pa = self._pa
+        arrays = {}
+        for name in table.column_names:
+            array = table.column(name).combine_chunks()
+            if name in CATEGORICAL_COLUMNS or name == 'Simulation Parameters':
+                if not pa.types.is_dictionary(array.type):
+                    array = array.dictionary_encode()
+                array = array.cast(pa.dictionary(pa.int32(), pa.string()))
+            else:
+                array = array.cast(pa.type_for_alias(RESULT_COLUMNS.get(name, 'string')))
+            arrays[name] = array
+        capacities = [parse_capacity(text) for text in arrays['Simulation Parameters'].dictionary.to_pylist()]
+        indices = arrays['Simulation Parameters'].indices.to_pylist()
+        for i, name in enumerate(CAPACITY_COLUMNS):
+            arrays[name] = pa.array([capacities[index][i] for index in indices], type=pa.int32())
+        table = pa.table(arrays)
+
+        self._ds.write_dataset(table, self.path, format='parquet',
+                               partitioning=self._partitioning,
+                               basename_template=f'{self._basename}{self._batches}-{{i}}.parquet',
+                               existing_data_behavior='overwrite_or_ignore')
+        self._batches += 1
+
+    def _write_batch(self, rows):
+        self._write_table(self._pa.Table.from_pylist(rows))
+
+    def _write_columns(self, columns):
+        # Written as is, without going through per-row dicts
+        self._write_table(columns.to_arrow())
+
+
+def read_partitioned(path, capacity=None):
+    """Load a partitioned Parquet sweep, optionally only one capacity configuration.
+
+    Args:
+        path (str): Dataset directory written by PartitionedParquetSink
+        capacity (tuple, optional): Capacity configuration to load
+
+    Returns:
+        pd.DataFrame: Rows of the requested configuration (all rows if None)
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    partitioning = ds.partitioning(
+        pa.schema([(name, pa.int32()) for name in CAPACITY_COLUMNS]), flavor='hive')
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    expression = None
+    if capacity is not None:
+        for name, value in zip(CAPACITY_COLUMNS, capacity):
+            condition = ds.field(name) == value
+            expression = condition if expression is None else expression & condition
+    return dataset.to_table(filter=expression).to_pandas()
+
+
+SINKS = {
+    'csv': CSVSink,
+    'parquet': ParquetSink,
+    'parquet-partitioned': PartitionedParquetSink,
+}
+
+# Default output path of each format
+DEFAULT_OUTPUTS = {
+    'csv': './passenger_flight_data.csv',
+    'parquet': './passenger_flight_data.parquet',
+    'parquet-partitioned': './passenger_flight_data',
+}
+
+def open_sink(path, output_format='csv', **kwargs):
+    """Create a result sink for the given output format.
+
+    Args:
+        path (str): Output path
+        output_format (str): One of the keys of SINKS
+        **kwargs: Extra arguments for the sink
+
+    Returns:
+        ResultSink: The opened sink
+
+    Raises:
+        ValueError: If the output format is not supported
+    """
+    if output_format not in SINKS:
+        raise ValueError(f"Invalid output format: {output_format}. Must be one of: {list(SINKS)}")
+    return SINKS[output_format](path, **kwargs)
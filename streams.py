@@ -0,0 +1,61 @@
+# streams.py
+#
+# This file defines the random number streams of a simulation run.
+# Every run gets its own seeded generator instead of sharing the global `random` module,
+# and every station draws from its own substream derived from the run seed and the station name.
+# Two capacity configurations simulated with the same seed therefore see the same schedule and
+# the same sequence of service times at each station (common random numbers), and results do not
+# depend on the order in which runs are executed, in one process or in many.
+
+import hashlib
+import random
+
+
+def derive_seed(seed, name):
+    """Derives the seed of a named substream from the run seed.
+
+    Args:
+        seed (int): Run seed
+        name (str): Substream name
+
+    Returns:
+        int: 64-bit seed of the substream
+    """
+    digest = hashlib.sha256(f"{seed}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        """Initialize the streams of a run.
+
+        Args:
+            seed (int, optional): Run seed, a random one is drawn if None
+        """
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self._streams = {}
+
+    def stream(self, name):
+        """Returns the substream of a name, created on first use.
+
+        Args:
+            name (str): Substream name, e.g. 'schedule' or 'check_in'
+
+        Returns:
+            random.Random: Generator of the substream
+        """
+        if name not in self._streams:
+            self._streams[name] = random.Random(derive_seed(self.seed, name))
+        return self._streams[name]
+
+    def numpy(self, name):
+        """Returns a NumPy generator for a named substream.
+
+        Args:
+            name (str): Substream name
+
+        Returns:
+            np.random.Generator: Generator of the substream
+        """
+        import numpy as np
+        return np.random.default_rng(derive_seed(self.seed, name))
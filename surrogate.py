@@ -0,0 +1,191 @@
+# surrogate.py
+#
+# This file defines a surrogate model of the airport simulation for the PSO optimizer.
+# A bootstrap ensemble of ridge regressions on polynomial and inverse features of the capacities is
+# fitted to the mean processing times already known (simulations of the evaluation cache and earlier
+# sweeps such as passenger_flight_data.csv). Candidate particles are screened on the surrogate: only
+# the configurations whose optimistic prediction (mean - kappa * std) could beat the best simulated
+# value are simulated. The others get an infinite objective value, so a prediction never becomes the
+# best value of a particle or of the swarm.
+
+import itertools
+import numpy as np
+
+from sinks import parse_capacity
+
+def load_sweep_results(path: str) -> dict[tuple[int, ...], float]:
+    """
+    Load the mean processing time of every configuration of an earlier sweep.
+
+    Args:
+        path (str): CSV written by main.py (one row per passenger with 'Simulation Parameters').
+
+    Returns:
+        dict: capacity tuple -> mean 'Total Processing Time' of the passengers that finished,
+            configurations where nobody finished are left out.
+    """
+    import pandas as pd
+
+    data = pd.read_csv(path, usecols=["Total Processing Time", "Simulation Parameters"])
+    means = data.groupby("Simulation Parameters")["Total Processing Time"].mean().dropna()
+    return {parse_capacity(parameters): float(value) for parameters, value in means.items()}
+
+class SurrogateModel:
+    def __init__(self, ridge: float = 1e-2, ensemble: int = 16, seed: int = 0) -> None:
+        """
+        Bootstrap ensemble of ridge regressions of the mean processing time on the capacities.
+
+        Args:
+            ridge (float): L2 penalty of the standardized regression weights.
+            ensemble (int): number of bootstrap fits, their spread is the uncertainty of a prediction.
+            seed (int): seed of the bootstrap resampling.
+        """
+        self.ridge = ridge
+        self.ensemble = ensemble
+        self.rng = np.random.default_rng(seed)
+        self.weights: np.ndarray | None = None
+        self.center: np.ndarray | None = None
+        self.scale: np.ndarray | None = None
+        self.residual_std: float = 0.0
+        self.n: int = 0
+
+    @staticmethod
+    def features(capacities: np.ndarray) -> np.ndarray:
+        """
+        Regression features of capacity vectors: linear, inverse, square and pairwise product terms.
+
+        Args:
+            capacities (np.ndarray): (n, dimensions) array of capacities.
+
+        Returns:
+            np.ndarray: (n, features) array.
+        """
+        x = np.asarray(capacities, dtype=float)
+        pairs = [x[:, i] * x[:, j] for i, j in itertools.combinations(range(x.shape[1]), 2)]
+        return np.column_stack([x, 1 / x, x ** 2] + pairs)
+
+    def fit(self, capacities: list[tuple[int, ...]], values: list[float]) -> None:
+        """
+        Fit the ensemble, infinite values (no passenger finished) are left out.
+
+        Args:
+            capacities (list[tuple]): simulated configurations.
+            values (list[float]): their mean processing times.
+        """
+        values = np.asarray(values, dtype=float)
+        finite = np.isfinite(values)
+        self.n = int(finite.sum())
+        if not self.n:
+            self.weights = None
+            return
+        features = self.features(np.asarray(capacities, dtype=float)[finite])
+        y = values[finite]
+        self.center = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        X = np.column_stack([np.ones(self.n), (features - self.center) / self.scale])
+        penalty = self.ridge * np.eye(X.shape[1])
+        penalty[0, 0] = 0.0
+
+        weights = []
+        for _ in range(self.ensemble):
+            sample = self.rng.integers(0, self.n, self.n)
+            Xs, ys = X[sample], y[sample]
+            weights.append(np.linalg.solve(Xs.T @ Xs + penalty, Xs.T @ ys))
+        self.weights = np.array(weights)
+        # Noise of a single simulation around the fitted mean, the ensemble spread alone only covers the fit
+        residuals = y - X @ self.weights.mean(axis=0)
+        self.residual_std = float(np.sqrt(residuals @ residuals / max(self.n - X.shape[1], 1)))
+
+    def predict(self, capacities: list[tuple[int, ...]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Predict the mean processing time of configurations.
+
+        Args:
+            capacities (list[tuple]): configurations to predict.
+
+        Returns:
+            tuple: (mean, std) arrays, std combines the spread of the ensemble and the residual noise
+                of the fit, it is inf before the first fit.
+        """
+        if self.weights is None:
+            return np.full(len(capacities), np.nan), np.full(len(capacities), np.inf)
+        features = (self.features(np.asarray(capacities, dtype=float)) - self.center) / self.scale
+        X = np.column_stack([np.ones(len(features)), features])
+        predictions = X @ self.weights.T
+        return predictions.mean(axis=1), np.sqrt(predictions.var(axis=1) + self.residual_std ** 2)
+
+class SurrogateEvaluator:
+    def __init__(self, evaluator, known: dict[tuple[int, ...], float] | None = None,
+                 prior: dict[tuple[int, ...], float] | None = None, kappa: float = 2.0,
+                 min_points: int = 30, model: SurrogateModel | None = None) -> None:
+        """
+        Screens a swarm on the surrogate before simulating it.
+
+        Args:
+            evaluator (SwarmEvaluator): evaluates the configurations that have to be simulated.
+            known (dict | None): simulated values of the evaluator's seed, e.g. the evaluation cache.
+                They are returned as is and define the best value to beat.
+            prior (dict | None): values from earlier sweeps, only used to fit the surrogate.
+            kappa (float): width, in ensemble standard deviations, of the optimistic prediction.
+            min_points (int): simulated or prior values needed before particles are screened.
+            model (SurrogateModel | None): surrogate to use, a default SurrogateModel if None.
+        """
+        self.evaluator = evaluator
+        self.known = dict(known or {})
+        self.prior = dict(prior or {})
+        self.kappa = kappa
+        self.min_points = min_points
+        self.model = model or SurrogateModel()
+        self.screened: int = 0
+        self._refit()
+
+    def _refit(self) -> None:
+        # Simulated values of the run's seed take precedence over the prior sweeps
+        data = {**self.prior, **self.known}
+        self.model.fit(list(data), list(data.values()))
+
+    @property
+    def best(self) -> float:
+        return min(self.known.values(), default=np.inf)
+
+    def __call__(self, positions: np.ndarray, bounds: np.ndarray | None = None) -> np.ndarray:
+        capacities = [tuple(int(round(i)) for i in x) for x in positions]
+        values = {capacity: self.known[capacity] for capacity in capacities if capacity in self.known}
+        pending = [capacity for capacity in dict.fromkeys(capacities) if capacity not in values]
+
+        if pending and self.model.n >= self.min_points:
+            mean, std = self.model.predict(pending)
+            promising = mean - self.kappa * std <= self.best
+            for capacity, keep in zip(pending, promising):
+                if not keep:
+                    # Not simulated, so it must not win: the particle keeps its best simulated position
+                    values[capacity] = np.inf
+                    self.screened += 1
+            pending = [capacity for capacity, keep in zip(pending, promising) if keep]
+
+        if pending:
+            if bounds is None:
+                simulated = self.evaluator(np.array(pending, dtype=float))
+            else:
+                # Each configuration is bounded by the largest bound of its particles
+                limits: dict[tuple[int, ...], float] = {}
+                for capacity, bound in zip(capacities, bounds):
+                    limits[capacity] = max(limits.get(capacity, -np.inf), float(bound))
+                simulated = self.evaluator(np.array(pending, dtype=float),
+                                           bounds=np.array([limits[capacity] for capacity in pending]))
+            new_values = dict(zip(pending, (float(value) for value in simulated)))
+            # Pruned simulations only give a lower bound, they are not used to fit the surrogate
+            pruned = getattr(self.evaluator, "last_pruned", set())
+            self.known.update({capacity: value for capacity, value in new_values.items() if capacity not in pruned})
+            values.update(new_values)
+            self._refit()
+
+        return np.array([values[capacity] for capacity in capacities])
+
+    @property
+    def simulations(self) -> int:
+        return self.evaluator.simulations
+
+    def close(self) -> None:
+        self.evaluator.close()
@@ -0,0 +1,342 @@
+# sweep.py
+#
+# This file defines the runner for the capacity sweep of the airport simulation.
+# Every capacity configuration builds its own independent simpy.Environment, so the
+# configurations can be sent to a pool of worker processes and evaluated in parallel.
+# The results are merged back in the same order as the configurations were given,
+# so the output of a parallel sweep is identical in layout to a sequential one.
+#
+# Configurations are sent to the workers in chunks, and each chunk is simulated as one batch
+# (run_simulation_batch) that draws the schedule once and reuses it across the configurations.
+#
+# AdaptiveSweep is a cheaper alternative to the exhaustive grid: every configuration gets a few
+# replications, the worst ones are dropped, and the surviving ones get more replications
+# (successive halving), so most of the runs go to the promising configurations. Its rows carry
+# the seed of their replication in a 'Seed' column.
+#
+# ReplicatedSweep replicates every configuration with consecutive seeds until the confidence
+# interval on its mean processing time is narrow enough (replication.replicate), so the
+# configurations are compared on a mean with a known precision instead of a single noisy run.
+
+import os
+import math
+import simpy
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from airport_simulation import run_simulation, SIMULATION_TIME
+from batch import run_simulation_batch, split_runs
+from replication import replicate
+
+def run_configuration(capacity, engine="simpy", seed=42, columnar=False, monitor=False, horizon=SIMULATION_TIME):
+    """Run a single capacity configuration in a fresh simulation environment.
+
+    Defined at module level so it can be sent to the worker processes.
+
+    Args:
+        capacity (tuple): contains the airport resource capacities.
+        engine (str): simulation engine, "simpy", "kernel" or "numpy"
+        seed (int): seed of the run
+        columnar (bool): return a ResultColumns buffer instead of a list of dicts
+        monitor (bool): also return the per-station statistics of the run
+        horizon (int, optional): end of the run, None runs until every passenger has finished
+
+    Returns:
+        list | ResultColumns: Simulation results data, with the station statistics if `monitor` is set
+    """
+    env = simpy.Environment()
+    return run_simulation(env, capacity, engine=engine, seed=seed, columnar=columnar, monitor=monitor,
+                          horizon=horizon)
+
+def run_batch(capacities, engine="simpy", seed=42, columnar=False, monitor=False, horizon=SIMULATION_TIME):
+    """Run several capacity configurations as one batch, with the same results as run_configuration.
+
+    Defined at module level so it can be sent to the worker processes.
+
+    Args:
+        capacities (list[tuple]): capacity configurations to simulate.
+        engine (str): simulation engine, "simpy", "kernel" or "numpy"
+        seed (int): seed shared by every configuration
+        columnar (bool): return ResultColumns buffers instead of lists of dicts
+        monitor (bool): also return the per-station statistics, the configurations are then run one by one
+        horizon (int, optional): end of every run, None runs until every passenger has finished
+
+    Returns:
+        list: Simulation results data of every configuration, in order
+    """
+    if monitor:
+        # Station statistics need the airport of every run
+        return [run_configuration(capacity, engine, seed, columnar, monitor, horizon) for capacity in capacities]
+    columns, runs = run_simulation_batch(capacities, [seed], engine, horizon=horizon)
+    results = [simulation_data for _, _, simulation_data in split_runs(columns, runs)]
+    return results if columnar else [list(simulation_data.rows()) for simulation_data in results]
+
+def run_sweep(capacities, workers=None, chunksize=None, engine="simpy", seed=42, columnar=False, monitor=False,
+              horizon=SIMULATION_TIME):
+    """Run every capacity configuration, in parallel when more than one worker is used.
+
+    Results are yielded in the same order as `capacities`, regardless of which
+    worker finished first, and the progress bar advances as they arrive. Every
+    configuration is simulated with the same seed, so they are compared under
+    common random numbers and the results do not depend on the number of workers.
+
+    Args:
+        capacities (list[tuple]): capacity configurations to simulate.
+        workers (int, optional): number of worker processes. Defaults to the core count.
+        chunksize (int, optional): configurations sent to a worker at a time, and simulated as one batch.
+        engine (str): simulation engine, "simpy", "kernel" or "numpy"
+        seed (int): seed shared by every configuration
+        columnar (bool): yield ResultColumns buffers, which are also cheaper to send between processes
+        monitor (bool): yield (results, station statistics) as the simulation data, see run_simulation
+        horizon (int, optional): end of every run, None runs until every passenger has finished
+
+    Yields:
+        tuple: (capacity, simulation data) for each configuration.
+    """
+    from tqdm import tqdm
+
+    capacities = list(capacities)
+    workers = workers or os.cpu_count() or 1
+    run = functools.partial(run_batch, engine=engine, seed=seed, columnar=columnar, monitor=monitor,
+                            horizon=horizon)
+
+    if chunksize is None:
+        chunksize = max(1, len(capacities) // (workers * 4))
+    chunks = [capacities[i:i + chunksize] for i in range(0, len(capacities), chunksize)]
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        results = map(run, chunks) if executor is None else executor.map(run, chunks)
+        with tqdm(total=len(capacities)) as progress:
+            for chunk, chunk_results in zip(chunks, results):
+                for capacity, simulation_data in zip(chunk, chunk_results):
+                    progress.update()
+                    yield capacity, simulation_data
+    finally:
+        # An early close (Ctrl-C, a stopped consumer) drops the chunks that have not started yet
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def tag_seed(simulation_data, seed, columnar=False):
+    """Add the seed of a run to its results, as a 'Seed' column.
+
+    Args:
+        simulation_data (list | ResultColumns): Results of run_simulation
+        seed (int): Seed of the run
+        columnar (bool): whether the results are a ResultColumns buffer
+
+    Returns:
+        list | ResultColumns: The results with a 'Seed' column
+    """
+    if columnar:
+        return simulation_data.with_seed(seed)
+    return [{**row, 'Seed': seed} for row in simulation_data]
+
+def mean_processing_time(simulation_data, columnar=False):
+    """Mean 'Total Processing Time' of the passengers that finished a run.
+
+    Args:
+        simulation_data (list | ResultColumns): Results of run_simulation
+        columnar (bool): whether the results are a ResultColumns buffer
+
+    Returns:
+        float: Mean time, inf if no passenger finished
+    """
+    if columnar:
+        times = simulation_data.column('Total Processing Time')
+    else:
+        times = [row['Total Processing Time'] for row in simulation_data]
+    times = [time for time in times if time is not None]
+    return sum(times) / len(times) if times else math.inf
+
+class AdaptiveSweep:
+    def __init__(self, capacities, initial_replications=1, eta=3, max_replications=9, workers=None,
+                 engine="simpy", seed=42, columnar=False, completed=None, horizon=SIMULATION_TIME):
+        """Successive halving over capacity configurations.
+
+        Every round, the surviving configurations are replicated up to the round's number of
+        replications, ranked on their mean 'Total Processing Time' (lower is better), and only
+        the best 1/eta of them survive to the next round, where the replications are multiplied
+        by eta. Replication i of every configuration uses seed + i, so the configurations are
+        compared under common random numbers and replication 0 is the run of the exhaustive sweep.
+
+        Args:
+            capacities (list[tuple]): capacity configurations to search.
+            initial_replications (int): replications of every configuration in the first round.
+            eta (int): elimination rate, 1/eta of the configurations survive each round.
+            max_replications (int): replications after which a configuration is no longer replicated.
+            workers (int, optional): number of worker processes. Defaults to the core count.
+            engine (str): simulation engine, "simpy", "kernel" or "numpy"
+            seed (int): seed of the first replication
+            columnar (bool): yield ResultColumns buffers instead of lists of dicts
+            completed (dict, optional): (capacity, seed) -> mean processing time of the replications
+                finished by an interrupted search (see RunJournal.completed). They are not run again,
+                so the search resumes where it stopped.
+            horizon (int, optional): end of every run, None runs until every passenger has finished
+        """
+        if eta < 2:
+            raise ValueError(f"eta must be at least 2, got {eta}")
+        self.capacities = list(capacities)
+        self.initial_replications = initial_replications
+        self.eta = eta
+        self.max_replications = max_replications
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.seed = seed
+        self.columnar = columnar
+        self.completed = dict(completed or {})
+        self.horizon = horizon
+        self.current = None
+        self.samples = {capacity: [] for capacity in self.capacities}
+        self.survivors = list(self.capacities)
+        self.runs = 0
+
+    def score(self, capacity):
+        """Mean of the per-replication mean processing times of a configuration, inf if none finished."""
+        samples = [sample for sample in self.samples[capacity] if sample != math.inf]
+        return sum(samples) / len(samples) if samples else math.inf
+
+    def ranking(self):
+        """Evaluated configurations from best to worst.
+
+        Returns:
+            list[tuple]: (capacity, score, replications), most replicated first, then by score
+        """
+        return sorted(((capacity, self.score(capacity), len(samples)) for capacity, samples in self.samples.items()
+                       if samples), key=lambda item: (-item[2], item[1]))
+
+    def __iter__(self):
+        """Runs the rounds of the search.
+
+        Yields:
+            tuple: (capacity, simulation data with a 'Seed' column) for every simulated replication, in
+                the order of the jobs of each round. The (capacity, seed) of the last one is kept in `current`.
+        """
+        from tqdm import tqdm
+
+        run = functools.partial(run_configuration, engine=self.engine, columnar=self.columnar, horizon=self.horizon)
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        replications = self.initial_replications
+        try:
+            while True:
+                replications = min(replications, self.max_replications)
+                jobs = []
+                for capacity in self.survivors:
+                    for seed in range(self.seed + len(self.samples[capacity]), self.seed + replications):
+                        if (capacity, seed) in self.completed:
+                            self.samples[capacity].append(self.completed[(capacity, seed)])
+                        else:
+                            jobs.append((capacity, seed))
+                if executor is None:
+                    results = (run(capacity, seed=seed) for capacity, seed in jobs)
+                else:
+                    chunksize = max(1, len(jobs) // (self.workers * 4))
+                    results = executor.map(_run_seeded, [(run, capacity, seed) for capacity, seed in jobs],
+                                           chunksize=chunksize)
+                for (capacity, seed), simulation_data in tqdm(zip(jobs, results), total=len(jobs)):
+                    self.samples[capacity].append(mean_processing_time(simulation_data, self.columnar))
+                    self.runs += 1
+                    self.current = (capacity, seed)
+                    yield capacity, tag_seed(simulation_data, seed, self.columnar)
+
+                if replications >= self.max_replications or len(self.survivors) <= 1:
+                    return
+                ranked = sorted(self.survivors, key=self.score)
+                self.survivors = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+                replications *= self.eta
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+def _run_seeded(job):
+    # Module-level wrapper so the (run, capacity, seed) jobs can be sent to the worker processes
+    run, capacity, seed = job
+    return run(capacity, seed=seed)
+
+class ReplicatedSweep:
+    def __init__(self, capacities, target_half_width=0.5, confidence=0.95, min_replications=5,
+                 max_replications=100, workers=None, engine="simpy", seed=42, columnar=False, completed=None,
+                 horizon=SIMULATION_TIME):
+        """Sweep where every configuration is replicated until its confidence interval is narrow enough.
+
+        Replication i of every configuration uses seed + i, so the configurations are compared under
+        common random numbers and replication 0 is the run of the exhaustive sweep.
+
+        Args:
+            capacities (list[tuple]): capacity configurations to simulate.
+            target_half_width (float): half-width, in minutes, of the confidence interval on the mean
+                'Total Processing Time' at which a configuration stops being replicated
+            confidence (float): confidence level of the interval
+            min_replications (int): replications run before the stopping rule is checked
+            max_replications (int): budget of replications of every configuration
+            workers (int, optional): number of worker processes. Defaults to the core count.
+            engine (str): simulation engine, "simpy", "kernel" or "numpy"
+            seed (int): seed of the first replication
+            columnar (bool): yield ResultColumns buffers instead of lists of dicts
+            completed (dict, optional): (capacity, seed) -> mean processing time of the replications
+                finished by an interrupted sweep (see RunJournal.completed), they are not run again
+            horizon (int, optional): end of every run, None runs until every passenger has finished
+        """
+        self.capacities = list(capacities)
+        self.target_half_width = target_half_width
+        self.confidence = confidence
+        self.min_replications = min_replications
+        self.max_replications = max_replications
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.seed = seed
+        self.columnar = columnar
+        self.completed = dict(completed or {})
+        self.horizon = horizon
+        self.current = None
+        self.summaries = {}
+        self.runs = 0
+
+    def ranking(self):
+        """Replicated configurations from best to worst.
+
+        Returns:
+            list[dict]: replication summaries (see replication.replicate), by mean processing time
+        """
+        return sorted(self.summaries.values(), key=lambda summary: (math.isnan(summary['mean']), summary['mean']))
+
+    def __iter__(self):
+        """Replicates the configurations, one worker task per configuration.
+
+        Yields:
+            tuple: (capacity, simulation data with a 'Seed' column) for every replication run, the
+                replications of a configuration in seed order. The (capacity, seed) of the last one is
+                kept in `current`, the summary of a configuration is in `summaries` once all its
+                replications have been yielded.
+        """
+        from tqdm import tqdm
+
+        run = functools.partial(replicate, target_half_width=self.target_half_width, confidence=self.confidence,
+                                min_replications=self.min_replications, max_replications=self.max_replications,
+                                seed=self.seed, engine=self.engine, columnar=self.columnar, horizon=self.horizon,
+                                keep_results=True)
+        completed = {capacity: {} for capacity in self.capacities}
+        for (capacity, seed), mean in self.completed.items():
+            if capacity in completed:
+                completed[capacity][seed] = mean
+        jobs = [(run, capacity, completed[capacity]) for capacity in self.capacities]
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            if executor is None:
+                results = map(_replicate_job, jobs)
+            else:
+                results = executor.map(_replicate_job, jobs, chunksize=max(1, len(jobs) // (self.workers * 4)))
+            for capacity, summary in tqdm(zip(self.capacities, results), total=len(self.capacities)):
+                for seed, simulation_data in summary.pop('results'):
+                    self.runs += 1
+                    self.current = (capacity, seed)
+                    yield capacity, tag_seed(simulation_data, seed, self.columnar)
+                self.summaries[capacity] = summary
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+def _replicate_job(job):
+    # Module-level wrapper so the (replicate, capacity, completed) jobs can be sent to the worker processes
+    run, capacity, completed = job
+    return run(capacity, completed=completed)
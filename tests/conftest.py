@@ -0,0 +1,22 @@
+# conftest.py
+#
+# The modules sit side by side in the repository, but they import each other as laid out in the
+# project's src/ tree: src/Simulation holds the simulation modules, with the Airport and Passenger
+# packages inside it, and every module imports the simulation modules by their bare name (src and
+# src/Simulation are both on the path). These package aliases point the Airport and Passenger packages
+# at the repository root, so the tests import every module as the scripts do.
+
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+for name in ['Airport', 'Passenger']:
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [ROOT]
+        sys.modules[name] = package
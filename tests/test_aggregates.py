@@ -0,0 +1,100 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+import sinks
+import sweep
+from aggregates import Aggregate, AggregateStore
+from records import DURATION_COLUMNS, MISSING
+from sweep import run_sweep
+
+CAPACITIES = list(itertools.product([1, 3], [1, 2], [1, 4], [1, 2], [5, 25]))
+
+
+def sweep_rows(store=None):
+    frames = []
+    for _, data in run_sweep(CAPACITIES, workers=1, engine="kernel", seed=3, columnar=True):
+        if store is not None:
+            store.write_columns(data)
+        frames.append(data.to_pandas())
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_aggregates_match_pandas(tmp_path):
+    store = AggregateStore(str(tmp_path / "aggregates.sqlite"))
+    data = sweep_rows(store)
+    store.flush()
+    durations = data[DURATION_COLUMNS].astype(float)
+
+    expected = durations.describe().T
+    describe = store.describe()
+    for name, column in [('Count', 'count'), ('Mean', 'mean'), ('Std', 'std'), ('Min', 'min'), ('P25', '25%'),
+                         ('P50', '50%'), ('P75', '75%'), ('Max', 'max')]:
+        np.testing.assert_allclose(describe[name], expected[column], rtol=1e-12, err_msg=name)
+    np.testing.assert_allclose(describe[['P90', 'P99']], durations.quantile([0.9, 0.99]).T, rtol=1e-12)
+    np.testing.assert_allclose(store.correlation(), durations.corr(), rtol=1e-9)
+
+    for stage in ['Check-in Duration', 'Security Duration']:
+        expected = durations.groupby(stage)['Total Processing Time'].min().dropna()
+        pd.testing.assert_series_equal(store.min_total_by_duration(stage).loc[expected.index], expected,
+                                       check_names=False, check_index_type=False)
+
+    # A configuration on its own
+    configuration = str(CAPACITIES[5])
+    alone = durations[data['Simulation Parameters'] == configuration]
+    np.testing.assert_allclose(store.describe([configuration])['Mean'], alone.mean(), rtol=1e-12)
+
+
+def test_merged_aggregates_match_one_aggregate():
+    rng = np.random.default_rng(0)
+    durations = rng.integers(0, 200, (1000, len(DURATION_COLUMNS)))
+    durations[rng.random(durations.shape) < 0.2] = MISSING
+    whole = Aggregate()
+    whole.add(durations)
+    merged = Aggregate()
+    for part in np.array_split(durations, 7):
+        part_aggregate = Aggregate()
+        part_aggregate.add(part)
+        merged.merge(Aggregate.from_bytes(part_aggregate.to_bytes(), part_aggregate.rows))
+    for name in ['count', 'sums', 'squares', 'products', 'minimum', 'maximum', 'histogram', 'min_total']:
+        assert np.array_equal(getattr(merged, name), getattr(whole, name)), name
+    assert merged.rows == whole.rows
+
+
+def interrupted(generator, after):
+    # Stops a sweep like Ctrl-C after `after` configurations
+    def run(*args, **kwargs):
+        for i, item in enumerate(generator(*args, **kwargs)):
+            if i == after:
+                raise KeyboardInterrupt
+            yield item
+    return run
+
+
+def failing_close(sink):
+    # The buffered rows are lost, e.g. the disk is full
+    sink._file.close()
+    raise OSError("No space left on device")
+
+
+@pytest.mark.parametrize("failure", [KeyboardInterrupt, OSError])
+def test_resumed_sweep_merges_into_the_aggregates(tmp_path, monkeypatch, failure):
+    def run_main(output, aggregates, *options):
+        main.main(main.parse_args(["--engine", "kernel", "--workers", "1", "--output", str(tmp_path / output),
+                                   "--batch-size", "1000", "--aggregates", str(tmp_path / aggregates), *options]))
+        return AggregateStore(str(tmp_path / aggregates)).summary()
+
+    expected = run_main("full.csv", "full.sqlite")
+    journal = str(tmp_path / "journal.sqlite")
+    with monkeypatch.context() as patch:
+        # 100 rows per configuration, the last five are still buffered
+        patch.setattr(sweep, "run_sweep", interrupted(sweep.run_sweep, 255))
+        if failure is OSError:
+            patch.setattr(sinks.CSVSink, "close", failing_close)
+        with pytest.raises(failure):
+            run_main("resumed.csv", "resumed.sqlite", "--journal", journal)
+    resumed = run_main("resumed.csv", "resumed.sqlite", "--journal", journal)
+    pd.testing.assert_frame_equal(resumed, expected)
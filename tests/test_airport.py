@@ -0,0 +1,40 @@
+import simpy
+
+from Airport.airport import Airport
+from airport_simulation import SIMULATION_TIME, generate_schedule, simulate_schedule, run_simulation
+from streams import RandomStreams
+
+
+def test_from_capacity_maps_the_sweep_tuple():
+    airport = Airport.from_capacity(simpy.Environment(), (1, 2, 3, 4, 5))
+    assert airport.stations['check_in'].resource.capacity == 1
+    assert airport.stations['security'].resource.capacity == 2
+    assert airport.stations['passport'].resource.capacity == 3
+    assert airport.runways == 4
+    assert airport.stations['boarding'].resource.capacity == 5
+    assert airport.stations['disembarking'].resource.capacity == 5
+
+
+def test_passengers_queue_on_shared_stations():
+    # With a single check-in desk the passengers are checked in one after the other, so draining
+    # the airport takes at least the sum of their check-in times
+    capacity = (1, 4, 4, 4, 25)
+    streams = RandomStreams(0)
+    schedule = generate_schedule(capacity, streams.stream('schedule'), 5, 20)
+    env = simpy.Environment()
+    flights, _ = simulate_schedule(env, capacity, schedule, streams, horizon=None)
+    check_in = sum(passenger.check_in_time for _, _, passengers in flights for passenger in passengers)
+    assert env.now >= check_in > SIMULATION_TIME
+
+
+def test_unfinished_passengers_have_missing_durations():
+    rows = run_simulation(simpy.Environment(), (1, 1, 1, 1, 5), seed=0)
+    unfinished = [row for row in rows if row['Total Processing Time'] is None]
+    assert unfinished
+    for row in rows:
+        if row['Total Processing Time'] is not None:
+            stages = [row['Check-in Duration'], row['Security Duration'], row['Boarding Duration'],
+                      row['Disembark Duration']]
+            if row['Flight Type'] == "International":
+                stages.append(row['Passport Duration'])
+            assert row['Total Processing Time'] == sum(stages)
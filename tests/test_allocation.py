@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from airport_simulation import generate_schedule, SIMULATION_TIME
+from Airport.allocation import GateAllocator, RunwayAllocator, find_conflicts
+
+
+def test_preferred_gate_is_kept_while_free():
+    gates = GateAllocator(["A", "B", "C"])
+    assert gates.assign("f1", 0, 10, "B") == ("B", 0, 10)
+    # B is taken, the first free gate is used instead
+    assert gates.assign("f2", 5, 15, "B") == ("A", 5, 15)
+    # B is free again at its end time
+    assert gates.assign("f3", 10, 20, "B") == ("B", 10, 20)
+    assert gates.conflicts == []
+
+
+def test_flight_waits_for_the_first_free_gate():
+    gates = GateAllocator(["A", "B"], turnaround=5)
+    gates.assign("f1", 0, 30, "A")
+    gates.assign("f2", 0, 20, "B")
+    # B is free at 20 + 5, the flight keeps its 10 minutes at the gate
+    assert gates.assign("f3", 10, 20, "A") == ("B", 25, 35)
+    assert gates.conflicts == [("f3", "A", 15)]
+
+
+def test_allocate_finds_no_conflicts():
+    rng = random.Random(3)
+    requests = []
+    for i in range(300):
+        start = rng.uniform(0, 1000)
+        requests.append((f"f{i}", start, start + rng.uniform(10, 60), rng.choice("ABCDEFGH")))
+    bookings = GateAllocator(list("ABCDEFGH"), turnaround=2).allocate(requests)
+    assert len(bookings) == 300
+    assert find_conflicts([(gate, start, end, flight) for flight, (gate, start, end) in bookings.items()]) == []
+
+
+def test_assign_rejects_requests_out_of_order():
+    gates = GateAllocator(["A"])
+    gates.assign("f1", 10, 20)
+    with pytest.raises(ValueError):
+        gates.assign("f2", 5, 15)
+    with pytest.raises(ValueError):
+        GateAllocator([]).assign("f1", 0, 10)
+
+
+def test_find_conflicts():
+    bookings = [("A", 0, 10, "f1"), ("A", 10, 20, "f2"), ("A", 5, 30, "f3"), ("A", 25, 26, "f4"),
+                ("B", 0, 30, "f5"), ("B", 30, 40, "f6")]
+    # Back-to-back bookings do not overlap, f4 is compared with f3 that ends last
+    assert find_conflicts(bookings) == [("A", "f3", "f1"), ("A", "f2", "f3"), ("A", "f4", "f3")]
+
+
+def test_runway_slots_are_separated():
+    runways = RunwayAllocator(1, separation=2)
+    assert [runways.assign(time)[1] for time in [0, 1, 5, 5]] == [0, 2, 5, 7]
+    assert runways.delays == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_schedule_with_more_flights_than_gates_has_no_gate_conflicts(seed):
+    schedule = generate_schedule((1, 1, 1, 1, 5), random.Random(seed), num_flights=12)
+    bookings = [(flight['Gate'], *flight['Gate Times'], flight['Flight ID']) for flight in schedule]
+    assert find_conflicts(bookings) == []
+    # The flights that waited for a gate open when it is free, their passengers arrive from then on
+    assert sorted(start for _, start, _, _ in bookings) == [0] * 5 + [SIMULATION_TIME] * 5 + [2 * SIMULATION_TIME] * 2
+    for flight in schedule:
+        assert all(arrival >= flight['Gate Times'][0] for _, arrival in flight['Passengers'])
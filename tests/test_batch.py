@@ -0,0 +1,47 @@
+import itertools
+
+import pytest
+import simpy
+
+from airport_simulation import run_simulation
+from batch import run_simulation_batch, split_runs, mean_processing_times
+from sweep import run_sweep, run_configuration, mean_processing_time
+
+# Configurations with different gate counts, so the batch draws several schedules per seed
+CAPACITIES = list(itertools.product([1, 3], [1, 2], [1, 4], [1, 2], [5, 10, 25]))
+SEEDS = [0, 42]
+
+
+@pytest.mark.parametrize("horizon", [100, None])
+@pytest.mark.parametrize("engine", ["simpy", "kernel", "numpy"])
+def test_batch_rows_match_run_simulation(engine, horizon):
+    columns, runs = run_simulation_batch(CAPACITIES, SEEDS, engine, horizon=horizon)
+    assert [(capacity, seed) for capacity, seed, _, _ in runs] == [(capacity, seed) for seed in SEEDS
+                                                                   for capacity in CAPACITIES]
+    for capacity, seed, simulation_data in split_runs(columns, runs):
+        env = simpy.Environment() if engine == "simpy" else None
+        assert list(simulation_data.rows()) == run_simulation(env, capacity, engine=engine, seed=seed,
+                                                              horizon=horizon)
+
+
+def test_batch_means_match_the_runs():
+    columns, runs = run_simulation_batch(CAPACITIES, SEEDS, "kernel")
+    means = [mean_processing_time(simulation_data, columnar=True)
+             for _, _, simulation_data in split_runs(columns, runs)]
+    assert mean_processing_times(columns, runs) == means
+
+
+def test_batch_rejects_an_unknown_engine():
+    with pytest.raises(ValueError):
+        run_simulation_batch(CAPACITIES, SEEDS, "unknown")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_batched_sweep_matches_single_runs(columnar):
+    results = list(run_sweep(CAPACITIES, workers=1, chunksize=7, engine="kernel", seed=7, columnar=columnar))
+    assert [capacity for capacity, _ in results] == CAPACITIES
+    for capacity, simulation_data in results:
+        expected = run_configuration(capacity, "kernel", 7, columnar)
+        if columnar:
+            simulation_data, expected = list(simulation_data.rows()), list(expected.rows())
+        assert simulation_data == expected
@@ -0,0 +1,9 @@
+from benchmarks import bench_imports
+
+
+def test_failed_import_is_reported():
+    result = bench_imports({'records': 10.0, 'no_such_module': 10.0}, repeat=1)
+    assert result['records']['within_budget']
+    assert result['no_such_module'] == {'error': "ModuleNotFoundError: No module named 'no_such_module'",
+                                        'budget_seconds': 10.0, 'within_budget': False}
+    assert not result['within_budget']
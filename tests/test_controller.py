@@ -0,0 +1,52 @@
+import itertools
+import math
+
+import pytest
+import simpy
+
+from airport_simulation import run_simulation
+from controller import BoundExceeded
+from sweep import mean_processing_time
+
+CAPACITIES = list(itertools.product([1, 2, 4], [1, 3], [1, 2], [1, 2], [5, 25]))
+
+
+def simulate(capacity, engine, horizon, bound=None):
+    env = simpy.Environment() if engine == "simpy" else None
+    return run_simulation(env, capacity, engine=engine, seed=42, horizon=horizon, bound=bound)
+
+
+@pytest.mark.parametrize("horizon", [100, None])
+@pytest.mark.parametrize("engine", ["simpy", "kernel"])
+def test_no_configuration_is_wrongly_pruned(engine, horizon):
+    pruned = 0
+    for capacity in CAPACITIES:
+        rows = simulate(capacity, engine, horizon)
+        mean = mean_processing_time(rows)
+        if math.isinf(mean):
+            continue
+        # A bound equal to the mean must never prune, lower bounds must prune some configurations
+        for bound in [mean - 5, mean - 1, mean - 0.1, mean, mean + 1]:
+            try:
+                bounded = simulate(capacity, engine, horizon, bound)
+            except BoundExceeded as exceeded:
+                pruned += 1
+                assert mean > bound
+                assert bound < exceeded.lower_bound <= mean + 1e-9
+            else:
+                assert bounded == rows
+    assert pruned
+
+
+@pytest.mark.parametrize("engine", ["simpy", "kernel"])
+def test_drained_runs_have_no_missing_durations(engine):
+    for capacity in [(1, 1, 1, 1, 5), (4, 4, 4, 4, 25)]:
+        rows = simulate(capacity, engine, None)
+        assert all(row['Total Processing Time'] is not None for row in rows)
+        # Every passenger of the schedule has its row
+        assert len(rows) == len(simulate(capacity, engine, 100))
+
+
+def test_numpy_engine_rejects_a_bound():
+    with pytest.raises(ValueError):
+        run_simulation(None, (1, 1, 1, 1, 5), engine="numpy", seed=42, bound=20.0)
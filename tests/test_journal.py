@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pytest
+
+import main
+import sinks
+import sweep
+from psooptimizer import particle_swarm
+
+
+def run_main(tmp_path, output, *options):
+    main.main(main.parse_args(["--engine", "kernel", "--workers", "1", "--output", str(tmp_path / output),
+                               "--batch-size", "1000", *options]))
+    return (tmp_path / output).read_text()
+
+
+def interrupted(generator, after):
+    # Stops a sweep like Ctrl-C after `after` configurations
+    def run(*args, **kwargs):
+        for i, item in enumerate(generator(*args, **kwargs)):
+            if i == after:
+                raise KeyboardInterrupt
+            yield item
+    return run
+
+
+@pytest.mark.parametrize("options", [
+    [],
+    ["--adaptive", "--max-replications", "3"],
+    ["--target-half-width", "0.5", "--max-replications", "3"],
+])
+def test_resumed_sweep_matches_uninterrupted(tmp_path, monkeypatch, capsys, options):
+    expected = run_main(tmp_path, "full.csv", *options)
+
+    journal = str(tmp_path / "journal.sqlite")
+    with monkeypatch.context() as patch:
+        patch.setattr(sweep, "run_sweep", interrupted(sweep.run_sweep, 250))
+        patch.setattr(sweep.AdaptiveSweep, "__iter__", interrupted(sweep.AdaptiveSweep.__iter__, 250))
+        patch.setattr(sweep.ReplicatedSweep, "__iter__", interrupted(sweep.ReplicatedSweep.__iter__, 250))
+        with pytest.raises(KeyboardInterrupt):
+            run_main(tmp_path, "resumed.csv", "--journal", journal, *options)
+    capsys.readouterr()
+    assert run_main(tmp_path, "resumed.csv", "--journal", journal, *options) == expected
+    assert f"Resuming from {journal}: 250 simulations already done" in capsys.readouterr().out
+
+
+def test_simulations_are_not_journaled_when_the_output_fails(tmp_path, monkeypatch, capsys):
+    expected = run_main(tmp_path, "full.csv")
+
+    def failing_close(sink):
+        # The buffered rows are lost, e.g. the disk is full
+        sink._file.close()
+        raise OSError("No space left on device")
+
+    journal = str(tmp_path / "journal.sqlite")
+    with monkeypatch.context() as patch:
+        # 100 rows per configuration, the last five are still buffered
+        patch.setattr(sweep, "run_sweep", interrupted(sweep.run_sweep, 255))
+        patch.setattr(sinks.CSVSink, "close", failing_close)
+        with pytest.raises(OSError):
+            run_main(tmp_path, "resumed.csv", "--journal", journal)
+    capsys.readouterr()
+    assert run_main(tmp_path, "resumed.csv", "--journal", journal) == expected
+    # Only the simulations flushed before the failure are skipped
+    assert f"Resuming from {journal}: 250 simulations already done" in capsys.readouterr().out
+
+
+def test_journal_is_rejected_with_a_parquet_file(tmp_path):
+    with pytest.raises(SystemExit, match="--journal"):
+        run_main(tmp_path, "data.parquet", "--format", "parquet", "--journal", str(tmp_path / "journal.sqlite"))
+
+
+def test_resumed_swarm_matches_uninterrupted():
+    def evaluate(positions):
+        return np.sum((positions - 0.3) ** 2, axis=1)
+
+    expected = particle_swarm(evaluate, [-1, -1], [1, 1], swarmsize=10, maxiter=30, seed=0)
+
+    saved = {}
+
+    def checkpoint(state):
+        # Saved as JSON like RunJournal.save_state, then stopped at the tenth iteration
+        saved['state'] = json.loads(json.dumps(state))
+        if state['iteration'] == 10:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        particle_swarm(evaluate, [-1, -1], [1, 1], swarmsize=10, maxiter=30, seed=0, checkpoint=checkpoint)
+    resumed = particle_swarm(evaluate, [-1, -1], [1, 1], swarmsize=10, maxiter=30, seed=0, state=saved['state'])
+    assert resumed[1] == expected[1]
+    assert np.array_equal(resumed[0], expected[0])
@@ -0,0 +1,86 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+import pytest
+import simpy
+
+from airport_simulation import run_simulation
+from kernel import Kernel, Station, CountingEnvironment
+
+
+def tandem_kernel(capacities, arrivals, seed):
+    # (job, station, start, finish) of jobs going through kernel Stations one after the other
+    kernel = Kernel()
+    rng = random.Random(seed)
+    stations = [Station(kernel, capacity, (1, 3), rng, 'duration') for capacity in capacities]
+    finished = []
+
+    def forward(job):
+        if job.stage:
+            finished.append((job.name, job.stage - 1, kernel.now - job.duration, kernel.now))
+        if job.stage < len(stations):
+            job.stage += 1
+            stations[job.stage - 1].request((job, forward, kernel.now))
+
+    for name, arrival in enumerate(arrivals):
+        kernel.schedule(arrival, forward, SimpleNamespace(name=name, stage=0, duration=None))
+    kernel.run()
+    return finished
+
+
+def tandem_simpy(capacities, arrivals, seed):
+    # Same jobs on simpy.Resources, the service time is drawn once the server is granted as in processes.py
+    env = simpy.Environment()
+    rng = random.Random(seed)
+    resources = [simpy.Resource(env, capacity) for capacity in capacities]
+    finished = []
+
+    def job(name, arrival):
+        yield env.timeout(arrival)
+        for stage, resource in enumerate(resources):
+            with resource.request() as request:
+                yield request
+                duration = rng.randint(1, 3)
+                yield env.timeout(duration)
+            finished.append((name, stage, env.now - duration, env.now))
+
+    for name, arrival in enumerate(arrivals):
+        env.process(job(name, arrival))
+    env.run()
+    return finished
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("capacities", [(1, 1), (2, 1), (1, 2), (3, 2)])
+def test_stations_grant_servers_in_simpy_order(capacities, seed):
+    # Integer arrivals and service times, so jobs often reach a station while one of its servers is released
+    arrivals = random.Random(seed).choices(range(6), k=12)
+    assert tandem_kernel(capacities, arrivals, seed) == tandem_simpy(capacities, arrivals, seed)
+
+
+@pytest.mark.parametrize("seed", [0, 42])
+@pytest.mark.parametrize("capacity", list(itertools.product([1, 2, 4], [1, 3], [1, 2], [1, 2], [5, 25])))
+def test_kernel_rows_match_simpy(capacity, seed):
+    simpy_rows = run_simulation(simpy.Environment(), capacity, seed=seed)
+    kernel_rows = run_simulation(None, capacity, engine="kernel", seed=seed)
+    assert kernel_rows == simpy_rows
+
+
+def test_kernel_station_statistics_match_simpy():
+    capacity = (1, 2, 1, 2, 5)
+    _, simpy_statistics = run_simulation(simpy.Environment(), capacity, seed=42, monitor=True)
+    _, kernel_statistics = run_simulation(None, capacity, engine="kernel", seed=42, monitor=True)
+    assert kernel_statistics == simpy_statistics
+
+
+def test_counting_environment_counts_processed_events():
+    def process(env):
+        for _ in range(3):
+            yield env.timeout(10)
+
+    env = CountingEnvironment()
+    env.process(process(env))
+    env.run()
+    # Process start, three timeouts and the end of the process
+    assert env.events == 5
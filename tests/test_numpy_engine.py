@@ -0,0 +1,13 @@
+import pytest
+
+from numpy_engine import cross_check
+
+
+@pytest.mark.parametrize("capacity", [(1, 1, 1, 1, 5), (2, 3, 1, 2, 10), (4, 4, 4, 4, 25)])
+def test_numpy_engine_agrees_with_simpy(capacity):
+    report = cross_check(capacity, replications=100)
+    assert set(report) == {'mean', 'finished'}
+    for metric in report.values():
+        # The seeds are fixed, so the statistics are too, a real difference gives a z far above 4
+        assert abs(metric['z']) < 4
+        assert metric['numpy'] == pytest.approx(metric['simpy'], rel=0.05)
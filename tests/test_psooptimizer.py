@@ -0,0 +1,46 @@
+import sqlite3
+
+import numpy as np
+
+from psooptimizer import EvaluationCache, SwarmEvaluator, evaluate_capacity
+
+
+def test_cache_is_keyed_on_the_model(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = EvaluationCache(path)
+    cache.put_many({(1, 1, 1, 1, 5): 10.0}, seed=42)
+    cache.close()
+
+    cache = EvaluationCache(path, model="another model")
+    assert cache.get((1, 1, 1, 1, 5), 42) is None
+    assert cache.values(42) == {}
+    cache.close()
+
+    cache = EvaluationCache(path)
+    assert cache.get((1, 1, 1, 1, 5), 42) == 10.0
+    assert cache.get((1, 1, 1, 1, 5), 43) is None
+    cache.close()
+
+
+def test_cache_of_an_older_layout_is_emptied(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE evaluations (capacity TEXT, seed INTEGER, value REAL, "
+                           "PRIMARY KEY (capacity, seed))")
+        connection.execute("INSERT INTO evaluations VALUES ('(1, 1, 1, 1, 5)', 42, 10.0)")
+    connection.close()
+
+    cache = EvaluationCache(path)
+    assert cache.get((1, 1, 1, 1, 5), 42) is None
+    cache.close()
+
+
+def test_cached_evaluations_match_the_simulations():
+    capacities = [(1, 1, 1, 1, 5), (2, 3, 1, 2, 10), (4, 4, 4, 4, 25)]
+    cache = EvaluationCache(None)
+    evaluator = SwarmEvaluator(cache, seed=7, workers=1)
+    values = evaluator(np.array(capacities, dtype=float))
+    assert list(values) == [evaluate_capacity(capacity, 7) for capacity in capacities]
+    assert evaluator(np.array(capacities, dtype=float)).tolist() == values.tolist()
+    assert evaluator.simulations == len(capacities)
+    cache.close()
@@ -0,0 +1,27 @@
+import math
+
+import pytest
+
+from replication import t_quantile, summarize, replicate, replication_mean
+from sweep import run_configuration
+
+
+@pytest.mark.parametrize("dof, expected", [(1, 12.7062), (2, 4.3027), (3, 3.1824), (9, 2.2622), (100, 1.9840)])
+def test_t_quantile_matches_the_t_table(dof, expected):
+    assert t_quantile(0.95, dof) == pytest.approx(expected, abs=1e-4)
+
+
+def test_two_replications_give_the_exact_interval():
+    summary = summarize([10.0, 12.0])
+    assert summary['half_width'] == pytest.approx(12.7062 * math.sqrt(2 / 2), abs=1e-4)
+
+
+def test_replicate_stops_once_the_interval_is_narrow_enough():
+    summary = replicate((2, 2, 2, 2, 10), target_half_width=1.0, min_replications=2, max_replications=50,
+                        seed=5, engine="kernel")
+    assert summary['converged']
+    assert summary['half_width'] <= 1.0
+    means = [replication_mean(run_configuration((2, 2, 2, 2, 10), "kernel", 5 + i)) for i in range(summary['runs'])]
+    assert summary['mean'] == pytest.approx(sum(means) / len(means))
+    # One run fewer would not have been narrow enough
+    assert summarize(means[:-1])['half_width'] > 1.0
@@ -0,0 +1,39 @@
+import pytest
+
+from sinks import PartitionedParquetSink, read_partitioned
+from sweep import run_configuration, tag_seed
+
+pytest.importorskip("pyarrow")
+
+CAPACITIES = [(1, 1, 1, 1, 5), (2, 2, 2, 2, 10)]
+
+
+def write(path, batch_size, append=False):
+    with PartitionedParquetSink(str(path), batch_size=batch_size, append=append) as sink:
+        for capacity in CAPACITIES:
+            sink.write(run_configuration(capacity, "kernel", 42))
+    return sink.rows_written
+
+
+def test_rewritten_dataset_replaces_the_previous_run(tmp_path):
+    rows = write(tmp_path / "data", batch_size=50)
+    assert write(tmp_path / "data", batch_size=10000) == rows
+    assert len(read_partitioned(str(tmp_path / "data"))) == rows
+
+
+def test_appended_dataset_keeps_the_previous_run(tmp_path):
+    rows = write(tmp_path / "data", batch_size=50)
+    write(tmp_path / "data", batch_size=10000, append=True)
+    assert len(read_partitioned(str(tmp_path / "data"))) == 2 * rows
+    assert len(read_partitioned(str(tmp_path / "data"), CAPACITIES[0])) == 2 * len(
+        run_configuration(CAPACITIES[0], "kernel", 42))
+
+
+def test_seeds_of_64_bits_are_written(tmp_path):
+    seed = 2**40 + 1
+    data = tag_seed(run_configuration(CAPACITIES[0], "kernel", seed, columnar=True), seed, columnar=True)
+    data.extend(tag_seed(run_configuration(CAPACITIES[1], "kernel", 7, columnar=True), 7, columnar=True))
+    with PartitionedParquetSink(str(tmp_path / "data")) as sink:
+        sink.write_columns(data)
+    assert set(read_partitioned(str(tmp_path / "data"), CAPACITIES[0])['Seed']) == {seed}
+    assert set(read_partitioned(str(tmp_path / "data"), CAPACITIES[1])['Seed']) == {7}
@@ -0,0 +1,25 @@
+import simpy
+
+from arrivals import run_scenario
+from tracing import Tracer, BinarySink, RingBufferSink, DEBUG
+
+
+def trace(sink):
+    # A single runway for many flights, so flights wait for their slot and take off with a fractional delay
+    tracer = Tracer(sink, level=DEBUG)
+    run_scenario(simpy.Environment(), (4, 4, 4, 1, 25), passengers=3000, horizon=240, seed=3,
+                 passengers_per_flight=20, tracer=tracer)
+    tracer.close()
+
+
+def test_binary_trace_round_trips(tmp_path):
+    expected = RingBufferSink(size=None)
+    trace(expected)
+    trace(BinarySink(str(tmp_path / "trace.bin")))
+
+    events = BinarySink.read(str(tmp_path / "trace.bin"))
+    assert events == list(expected.events)
+    take_offs = [(value, detail) for _, _, event, _, value, detail in events if event == 'take_off']
+    assert take_offs and all(detail.startswith("Gate ") for _, detail in take_offs)
+    assert any(value != int(value) for value, _ in take_offs)
+    assert any(event == 'arrive' and value is None for _, _, event, _, value, _ in events)
@@ -0,0 +1,108 @@
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import workqueue
+from workqueue import WorkQueue, submit_sweep, work, run_job
+
+CAPACITIES = [(1, 1, 1, 1, 5), (2, 2, 2, 2, 10), (3, 1, 2, 1, 20)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Leases expire on the queue's clock, moved by hand
+    now = [1000.0]
+    monkeypatch.setattr(workqueue, "time", SimpleNamespace(time=lambda: now[0], sleep=lambda seconds: None))
+    return now
+
+
+def submit(path, jobs=1, max_attempts=3):
+    queue = WorkQueue(path, lease_seconds=60, max_attempts=max_attempts)
+    queue.submit("run", {'engine': "kernel", 'output': "unused"}, [(CAPACITIES[0], seed) for seed in range(jobs)])
+    return queue
+
+
+def test_expired_lease_is_reclaimed(tmp_path, clock):
+    queue = submit(str(tmp_path / "queue.sqlite"))
+    [job] = queue.lease("a")
+    assert queue.lease("b") == []
+
+    clock[0] += 61
+    [retried] = queue.lease("b")
+    assert retried['id'] == job['id']
+    # The first worker lost its lease, its late completion is ignored
+    assert not queue.complete(job['id'], "a")
+    assert queue.complete(job['id'], "b")
+    assert queue.counts() == {'done': 1}
+
+
+def test_expired_leases_stop_at_the_attempt_cap(tmp_path, clock):
+    queue = submit(str(tmp_path / "queue.sqlite"), max_attempts=2)
+    for worker in ["a", "b"]:
+        assert len(queue.lease(worker)) == 1
+        clock[0] += 61
+    assert queue.lease("c") == []
+    assert queue.counts() == {'failed': 1}
+    assert queue.failures() == [(CAPACITIES[0], 0, 'lease expired')]
+
+
+def test_failed_jobs_are_retried_up_to_the_attempt_cap(tmp_path, clock):
+    queue = submit(str(tmp_path / "queue.sqlite"), max_attempts=3)
+    for attempt in range(3):
+        [job] = queue.lease("a")
+        queue.fail(job['id'], "a", f"error {attempt}")
+    assert queue.lease("a") == []
+    assert queue.failures() == [(CAPACITIES[0], 0, 'error 2')]
+
+
+def lease_all(path, worker, barrier, results):
+    # Worker process leasing jobs one at a time until the queue is empty, the sleep stands for the job
+    queue = WorkQueue(path)
+    leased = []
+    barrier.wait()
+    while jobs := queue.lease(worker):
+        leased += [job['id'] for job in jobs]
+        time.sleep(0.001)
+    queue.close()
+    results.put(leased)
+
+
+def test_concurrent_workers_lease_every_job_once(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    submit(path, jobs=300).close()
+    workers = 8
+    # The workers start leasing at the same time
+    barrier = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=lease_all, args=(path, f"worker {i}", barrier, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    leased = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert sorted(job_id for jobs in leased for job_id in jobs) == list(range(1, 301))
+    assert sum(1 for jobs in leased if jobs) > 1
+
+
+def test_workers_write_every_job_once(tmp_path):
+    pytest.importorskip("pyarrow")
+    from sinks import read_partitioned
+
+    path = str(tmp_path / "queue.sqlite")
+    output = str(tmp_path / "data")
+    run, added = submit_sweep(path, CAPACITIES, output, replications=2, seed=5, engine="kernel")
+    assert added == 6
+    assert work(path, batch=4) == 6
+
+    # A job run again after a lost lease replaces its own files
+    run_job({'id': 1, 'run': run, 'parameters': {'engine': "kernel", 'output': output, 'prefix': "seed5"},
+             'capacity': CAPACITIES[0], 'seed': 5})
+
+    data = read_partitioned(output)
+    assert len(data) == 6 * 100
+    assert sorted(set(zip(data['Simulation Parameters'], data['Seed']))) == sorted(
+        (str(capacity), seed) for capacity in CAPACITIES for seed in [5, 6])
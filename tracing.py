@@ -0,0 +1,163 @@
+# tracing.py
+#
+# This file defines the event tracing used by the simulation processes.
+# Instead of formatting a print for every event, processes emit structured events
+# (time, level, event name, passenger, value) to a Tracer, which forwards them to a sink.
+# Callers check `tracer.enabled` (or `tracer.enabled_for(level)`) before emitting, so a
+# disabled tracer costs one attribute lookup per event and no string is ever built.
+# Sinks: NullSink (default), ConsoleSink (the original human-readable trace),
+# RingBufferSink (last N events in memory), JSONLSink and BinarySink (files).
+
+import collections
+import json
+import math
+import struct
+
+DEBUG = 10
+INFO = 20
+
+# Human-readable messages of the events, used by ConsoleSink
+MESSAGES = {
+    'arrive': '{passenger} arrives at the airport.',
+    'check_in': '{passenger} has completed check-in in {value} minutes.',
+    'security': '{passenger} has passed security check in {value} minutes.',
+    'passport': '{passenger} has passed passport control in {value} minutes.',
+    'boarding': '{passenger} has boarded the plane at gate {detail} in {value} minutes.',
+    'disembark': '{passenger} has disembarked in {value} minutes.',
+    'take_off': 'Flight {passenger} took off from gate {detail}, {value} minutes after its departure time.',
+}
+
+
+class TraceSink:
+    """Base class of the sinks, receives the events forwarded by a Tracer."""
+
+    def emit(self, time, level, event, passenger, value=None, detail=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSink(TraceSink):
+    """Sink that discards every event."""
+
+
+class ConsoleSink(TraceSink):
+    """Sink that prints the events in the original '[t=...]' format."""
+
+    def emit(self, time, level, event, passenger, value=None, detail=None):
+        message = MESSAGES.get(event, '{passenger} {event} {value}')
+        print(f'[t={time}] ' + message.format(passenger=passenger, event=event, value=value, detail=detail))
+
+
+class RingBufferSink(TraceSink):
+    def __init__(self, size=10000):
+        """Keep only the last `size` events in memory.
+
+        Args:
+            size (int): Maximum number of events kept
+        """
+        self.events = collections.deque(maxlen=size)
+
+    def emit(self, time, level, event, passenger, value=None, detail=None):
+        self.events.append((time, level, event, passenger, value, detail))
+
+
+class JSONLSink(TraceSink):
+    def __init__(self, path):
+        """Write one JSON object per event to a file.
+
+        Args:
+            path (str): Output path
+        """
+        self._file = open(path, 'w')
+
+    def emit(self, time, level, event, passenger, value=None, detail=None):
+        self._file.write(json.dumps({'t': time, 'level': level, 'event': event, 'passenger': passenger,
+                                     'value': value, 'detail': detail}) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class BinarySink(TraceSink):
+    # Record: time (double), level (uint8), event code (uint8), value (double), passenger (32 bytes, long
+    # enough for the flight of a take-off), detail (16 bytes). Values are stored as doubles since delays
+    # are not whole minutes, so integer durations are read back as floats.
+    RECORD = struct.Struct('<dBBd32s16s')
+    EVENTS = list(MESSAGES)
+
+    def __init__(self, path):
+        """Write fixed-size binary records to a file, see `read` to load them back.
+
+        Args:
+            path (str): Output path
+        """
+        self._file = open(path, 'wb')
+
+    def emit(self, time, level, event, passenger, value=None, detail=None):
+        code = self.EVENTS.index(event) if event in self.EVENTS else 255
+        self._file.write(self.RECORD.pack(time, level, code, math.nan if value is None else value,
+                                          str(passenger).encode()[:32],
+                                          b'' if detail is None else str(detail).encode()[:16]))
+
+    def close(self):
+        self._file.close()
+
+    @classmethod
+    def read(cls, path):
+        """Load the events of a binary trace.
+
+        Args:
+            path (str): Trace path
+
+        Returns:
+            list[tuple]: (time, level, event, passenger, value, detail) per event, as kept by RingBufferSink
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        events = []
+        for time, level, code, value, passenger, detail in cls.RECORD.iter_unpack(data):
+            event = cls.EVENTS[code] if code < len(cls.EVENTS) else None
+            detail = detail.rstrip(b'\0').decode()
+            events.append((time, level, event, passenger.rstrip(b'\0').decode(),
+                           None if math.isnan(value) else value, detail or None))
+        return events
+
+
+class Tracer:
+    def __init__(self, sink=None, level=INFO):
+        """Initialize the tracer.
+
+        Args:
+            sink (optional): Sink receiving the events, None disables tracing
+            level (int): Minimum level of the events forwarded to the sink
+        """
+        self.sink = sink if sink is not None else NullSink()
+        self.level = level
+        self.enabled = not isinstance(self.sink, NullSink)
+
+    def enabled_for(self, level):
+        """Returns whether events of a level reach the sink."""
+        return self.enabled and level >= self.level
+
+    def emit(self, time, event, passenger, value=None, detail=None, level=INFO):
+        """Forward an event to the sink. Callers should check `enabled` first.
+
+        Args:
+            time (float): Simulation time of the event
+            event (str): Event name, one of the keys of MESSAGES
+            passenger (str): Passenger name
+            value (int, optional): Duration or other value of the event
+            detail (str, optional): Extra information, e.g. the gate
+            level (int): Level of the event
+        """
+        if level >= self.level:
+            self.sink.emit(time, level, event, passenger, value, detail)
+
+    def close(self):
+        self.sink.close()
+
+
+# Shared disabled tracer, the default of every airport
+NULL_TRACER = Tracer()
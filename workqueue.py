@@ -0,0 +1,311 @@
+# workqueue.py
+#
+# This file defines a work queue to distribute the capacity sweep over several machines.
+# A coordinator submits (capacity, seed) jobs to a queue stored in an SQLite file, and any number
+# of worker processes, on any host that can open the file, lease jobs, simulate them and write
+# their rows to a partitioned Parquet dataset. A lease expires if its worker does not finish the
+# job in time (the worker crashed or was stopped), and the job is then handed to another worker,
+# up to a maximum number of attempts. Every job writes its own files, named after the job, so a
+# retried job overwrites the files of the failed attempt instead of duplicating its rows.
+# The rows carry the seed of their job in a 'Seed' column, so the replications of a configuration
+# can be told apart in the dataset.
+#
+# The queue relies on SQLite locking, so it has to live on a filesystem with working file locks
+# (a local disk, or a network filesystem that supports them).
+#
+# Usage:
+#   python workqueue.py submit --queue sweep.sqlite --output ./passenger_flight_data [--replications 3]
+#   python workqueue.py work --queue sweep.sqlite [--workers 8]      (on every host)
+#   python workqueue.py status --queue sweep.sqlite
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from sinks import parse_capacity
+
+
+class WorkQueue:
+    def __init__(self, path, lease_seconds=600, max_attempts=3):
+        """Open the queue, creating it if needed.
+
+        Args:
+            path (str): SQLite file of the queue
+            lease_seconds (float): Time a worker has to finish a leased job before it is retried
+            max_attempts (int): Leases of a job before it is marked as failed
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Transactions are managed explicitly, leases need BEGIN IMMEDIATE to be atomic across processes
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs (run TEXT PRIMARY KEY, parameters TEXT)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, run TEXT, capacity TEXT, seed INTEGER, "
+            "status TEXT DEFAULT 'pending', worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, "
+            "error TEXT, UNIQUE (run, capacity, seed))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)")
+
+    def submit(self, run, parameters, jobs):
+        """Add the jobs of a run, jobs already in the queue are kept as they are.
+
+        Args:
+            run (str): Run name
+            parameters (dict): Parameters shared by the jobs: 'engine' and 'output'
+            jobs (list[tuple]): (capacity, seed) of every simulation
+
+        Returns:
+            int: Number of new jobs
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?)", (run, json.dumps(parameters)))
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO jobs (run, capacity, seed) VALUES (?, ?, ?)",
+                [(run, str(tuple(capacity)), seed) for capacity, seed in jobs])
+            added = self.connection.total_changes - before
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, worker, count=1):
+        """Lease pending jobs, and jobs whose lease has expired.
+
+        Args:
+            worker (str): Name of the worker, recorded on the job
+            count (int): Maximum number of jobs
+
+        Returns:
+            list[dict]: Leased jobs with 'id', 'run', 'parameters', 'capacity' and 'seed'
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts are given up
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?", (now, self.max_attempts))
+            rows = self.connection.execute(
+                "SELECT jobs.id, jobs.run, runs.parameters, jobs.capacity, jobs.seed FROM jobs "
+                "JOIN runs ON runs.run = jobs.run "
+                "WHERE jobs.status = 'pending' OR (jobs.status = 'leased' AND jobs.lease_until < ?) "
+                "ORDER BY jobs.id LIMIT ?", (now, count)).fetchall()
+            self.connection.executemany(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?", [(worker, now + self.lease_seconds, row[0]) for row in rows])
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return [{'id': job_id, 'run': run, 'parameters': json.loads(parameters),
+                 'capacity': parse_capacity(capacity), 'seed': seed}
+                for job_id, run, parameters, capacity, seed in rows]
+
+    def complete(self, job_id, worker):
+        """Mark a leased job as done.
+
+        Args:
+            job_id (int): Job id
+            worker (str): Worker holding the lease
+
+        Returns:
+            bool: False if the lease was lost to another worker in the meantime
+        """
+        cursor = self.connection.execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+            (job_id, worker))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error):
+        """Give a leased job back after an error, it is retried until it runs out of attempts.
+
+        Args:
+            job_id (int): Job id
+            worker (str): Worker holding the lease
+            error (str): Error message, kept on the job
+        """
+        self.connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = NULL, error = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (self.max_attempts, error, job_id, worker))
+
+    def counts(self, run=None):
+        """Number of jobs in every status.
+
+        Args:
+            run (str, optional): Only count the jobs of this run
+
+        Returns:
+            dict: status -> number of jobs
+        """
+        query = "SELECT status, COUNT(*) FROM jobs" + (" WHERE run = ?" if run else "") + " GROUP BY status"
+        return dict(self.connection.execute(query, (run,) if run else ()).fetchall())
+
+    def failures(self, run=None):
+        """Failed jobs, as (capacity, seed, error) tuples."""
+        query = "SELECT capacity, seed, error FROM jobs WHERE status = 'failed'" + (" AND run = ?" if run else "")
+        return [(parse_capacity(capacity), seed, error)
+                for capacity, seed, error in self.connection.execute(query, (run,) if run else ())]
+
+    def close(self):
+        self.connection.close()
+
+
+def run_job(job):
+    """Simulate a leased job and write its rows, with the seed of the job, to the partitioned output of its run.
+
+    The files of the job are named after the run and the job id, so running a job again
+    overwrites its files.
+
+    Args:
+        job (dict): Job as returned by WorkQueue.lease
+
+    Returns:
+        int: Number of rows written
+    """
+    from sweep import run_configuration, tag_seed
+    from sinks import PartitionedParquetSink
+
+    parameters = job['parameters']
+    data = run_configuration(job['capacity'], engine=parameters.get('engine', "simpy"), seed=job['seed'],
+                             columnar=True)
+    data = tag_seed(data, job['seed'], columnar=True)
+    basename = f"{parameters.get('prefix', 'job')}-{job['id']}-"
+    with PartitionedParquetSink(parameters['output'], append=True, basename=basename) as sink:
+        sink.write_columns(data)
+    return len(data)
+
+
+def work(path, worker=None, lease_seconds=600, max_attempts=3, batch=4, poll_interval=5.0, wait=False):
+    """Lease and run jobs until the queue is empty.
+
+    Args:
+        path (str): SQLite file of the queue
+        worker (str, optional): Worker name, defaults to host:pid
+        lease_seconds (float): Lease duration, must be longer than a batch of jobs takes
+        max_attempts (int): Leases of a job before it is marked as failed
+        batch (int): Jobs leased at a time
+        poll_interval (float): Seconds between polls while other workers still hold leases
+        wait (bool): Keep polling for new jobs when the queue is empty
+
+    Returns:
+        int: Number of jobs completed by this worker
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(path, lease_seconds, max_attempts)
+    completed = 0
+    try:
+        while True:
+            jobs = queue.lease(worker, batch)
+            if not jobs:
+                counts = queue.counts()
+                # Leased jobs may still come back if their worker dies
+                if not wait and not counts.get('pending') and not counts.get('leased'):
+                    return completed
+                time.sleep(poll_interval)
+                continue
+            for job in jobs:
+                try:
+                    run_job(job)
+                except Exception:
+                    queue.fail(job['id'], worker, traceback.format_exc(limit=5))
+                else:
+                    completed += queue.complete(job['id'], worker)
+    finally:
+        queue.close()
+
+
+def _work(kwargs):
+    # Module-level wrapper so local workers can be started on a process pool
+    return work(**kwargs)
+
+
+def submit_sweep(path, capacities, output, replications=1, seed=42, engine="simpy", run=None):
+    """Coordinator side: queue every (capacity, replication) of a sweep.
+
+    Replication i of every configuration uses seed + i, as in AdaptiveSweep.
+
+    Args:
+        path (str): SQLite file of the queue
+        capacities (list[tuple]): capacity configurations to simulate
+        output (str): Directory of the partitioned Parquet output, shared by the workers
+        replications (int): Replications of every configuration
+        seed (int): Seed of the first replication
+        engine (str): simulation engine, "simpy", "kernel" or "numpy"
+        run (str, optional): Run name, derived from the parameters if None
+
+    Returns:
+        tuple: (run name, number of new jobs)
+    """
+    run = run or f"{engine}-{seed}-{os.path.abspath(output)}"
+    queue = WorkQueue(path)
+    try:
+        added = queue.submit(run, {'engine': engine, 'output': os.path.abspath(output), 'prefix': f"seed{seed}"},
+                             [(capacity, seed + i) for capacity in capacities for i in range(replications)])
+    finally:
+        queue.close()
+    return run, added
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed airport capacity sweep")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="queue the jobs of the capacity sweep")
+    submit.add_argument("--queue", required=True, help="SQLite file of the queue")
+    submit.add_argument("--output", required=True, help="partitioned Parquet output directory, shared by the workers")
+    submit.add_argument("--engine", choices=["simpy", "kernel", "numpy"], default="simpy")
+    submit.add_argument("--seed", type=int, default=42, help="seed of the first replication (default: 42)")
+    submit.add_argument("--replications", type=int, default=1, help="replications per configuration (default: 1)")
+
+    worker = commands.add_parser("work", help="run queued jobs until the queue is empty")
+    worker.add_argument("--queue", required=True, help="SQLite file of the queue")
+    worker.add_argument("--workers", type=int, default=1, help="worker processes on this host (default: 1)")
+    worker.add_argument("--lease", type=float, default=600, help="lease duration in seconds (default: 600)")
+    worker.add_argument("--max-attempts", type=int, default=3, help="attempts per job (default: 3)")
+    worker.add_argument("--batch", type=int, default=4, help="jobs leased at a time (default: 4)")
+    worker.add_argument("--wait", action="store_true", help="keep waiting for new jobs when the queue is empty")
+
+    status = commands.add_parser("status", help="show the number of jobs in every status")
+    status.add_argument("--queue", required=True, help="SQLite file of the queue")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "submit":
+        capacities = list(product([1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [5, 10, 20, 25]))
+        run, added = submit_sweep(args.queue, capacities, args.output, args.replications, args.seed, args.engine)
+        print(f"{added} jobs added to {run}")
+    elif args.command == "work":
+        kwargs = {'path': args.queue, 'lease_seconds': args.lease, 'max_attempts': args.max_attempts,
+                  'batch': args.batch, 'wait': args.wait}
+        if args.workers == 1:
+            completed = work(**kwargs)
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                completed = sum(executor.map(_work, [kwargs] * args.workers))
+        print(f"{completed} jobs completed")
+    else:
+        queue = WorkQueue(args.queue)
+        try:
+            print(queue.counts())
+            for capacity, seed, error in queue.failures():
+                print(f"failed {capacity} seed {seed}: {error.strip().splitlines()[-1] if error else ''}")
+        finally:
+            queue.close()
+
+
+if __name__ == '__main__':
+    main()